@@ -2,7 +2,28 @@
 
 import scenic.core.errors as _errors
 from scenic.core.errors import setDebuggingOptions
-from scenic.syntax.translator import scenarioFromFile, scenarioFromString
 
 _errors.showInternalBacktrace = False  # see comment in errors module
 del _errors
+
+# The compiler pulls in the parser and heavy geometry libraries, so we only import it
+# when one of its entry points is first used.
+_lazyAttributes = {
+    "scenarioFromFile": "scenic.syntax.translator",
+    "scenarioFromString": "scenic.syntax.translator",
+}
+
+
+def __getattr__(name):
+    module = _lazyAttributes.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazyAttributes))
@@ -13,6 +13,7 @@ import numpy
 import scenic
 from scenic.core.distributions import RejectionException
 import scenic.core.errors as errors
+from scenic.core.recording import TimeSeries
 from scenic.core.simulators import SimulationCreationError
 import scenic.syntax.translator as translator
 
@@ -65,6 +66,12 @@ mainOptions.add_argument(
 mainOptions.add_argument(
     "--2d", action="store_true", help="run Scenic in 2D compatibility mode"
 )
+mainOptions.add_argument(
+    "--requirement-profile",
+    help="file storing requirement-checking statistics, loaded before generating "
+    "scenes and updated afterward",
+    metavar="FILE",
+)
 
 # Simulation options
 simOpts = parser.add_argument_group("dynamic simulation options")
@@ -80,6 +87,38 @@ simOpts.add_argument(
     help="max # of rejected simulations before sampling a new scene (default 1)",
 )
 
+# Batch generation options
+batchOpts = parser.add_argument_group("batch generation and simulation farm options")
+batchOpts.add_argument(
+    "--batch",
+    type=int,
+    metavar="N",
+    help="generate N scenes without displaying them, writing them to the file"
+    " given by --output",
+)
+batchOpts.add_argument(
+    "-o",
+    "--output",
+    metavar="PATH",
+    help="file to write batch-generated scenes to: a .jsonl file gets one JSON"
+    " summary per line; any other file gets a binary shard of encoded scenes"
+    " (with --simulate, JSON results of the simulations are written instead)",
+)
+batchOpts.add_argument(
+    "--workers",
+    type=int,
+    default=1,
+    metavar="K",
+    help="number of worker processes for batch generation or, with --simulate,"
+    " for running simulations in parallel (default 1)",
+)
+batchOpts.add_argument(
+    "--save-replays",
+    metavar="PATH",
+    help="with --simulate and --output, also write the replay of each simulation"
+    " to a binary shard file",
+)
+
 # Interactive rendering options
 intOptions = parser.add_argument_group("static scene diagramming options")
 intOptions.add_argument(
@@ -134,6 +173,18 @@ debugOpts.add_argument(
     "--dump-python", help="dump Python equivalent of final AST", action="store_true"
 )
 debugOpts.add_argument("--no-pruning", help="disable pruning", action="store_true")
+debugOpts.add_argument(
+    "--pruning-workers",
+    help="number of threads to use for pruning (default 1)",
+    type=int,
+    metavar="N",
+)
+debugOpts.add_argument(
+    "--profile-generation",
+    action="store_true",
+    help="print a summary of where time was spent generating scenes"
+    " (sampling each object, checking each requirement, etc.) when exiting",
+)
 debugOpts.add_argument(
     "--gather-stats",
     type=int,
@@ -151,6 +202,29 @@ parser.add_argument("scenicFile", help="a Scenic file to run", metavar="FILE")
 
 # Parse arguments and set up configuration
 args = parser.parse_args()
+farm = args.simulate and (args.workers > 1 or args.output is not None)
+if farm:
+    if args.count <= 0:
+        parser.error("running simulations in parallel requires --count")
+    if args.output is None:
+        parser.error("running simulations in parallel requires --output")
+elif args.save_replays is not None:
+    parser.error("--save-replays requires --simulate and --output")
+if args.batch is not None:
+    if args.output is None:
+        parser.error("--batch requires --output")
+    if args.simulate or args.gather_stats is not None:
+        parser.error("--batch cannot be used with --simulate or --gather-stats")
+if args.output is not None and args.batch is None and not args.simulate:
+    parser.error("--output requires --batch or --simulate")
+if args.workers > 1 and args.batch is None and not args.simulate:
+    parser.error("--workers requires --batch or --simulate")
+if args.profile_generation and args.workers > 1:
+    parser.error("--profile-generation cannot be used with multiple workers")
+if args.requirement_profile and args.workers > 1:
+    parser.error("--requirement-profile cannot be used with multiple workers")
+if args.pruning_workers is not None and args.pruning_workers < 1:
+    parser.error("--pruning-workers must be at least 1")
 delay = args.delay
 mode2D = getattr(args, "2d")
 
@@ -181,6 +255,7 @@ translator.dumpScenicAST = args.dump_scenic_ast
 translator.dumpFinalAST = args.dump_ast
 translator.dumpASTPython = args.dump_python
 translator.usePruning = not args.no_pruning
+translator.pruningWorkers = args.pruning_workers
 if args.seed is not None:
     if args.verbosity >= 1:
         print(f"Using random seed = {args.seed}")
@@ -205,7 +280,12 @@ totalTime = time.time() - startTime
 if args.verbosity >= 1:
     print(f"Scenario constructed in {totalTime:.2f} seconds.")
 
-if args.simulate:
+if args.requirement_profile:
+    scenario.loadRequirementProfile(args.requirement_profile)
+if args.profile_generation:
+    scenario.enableProfiling()
+
+if args.simulate and not farm:
     simulator = errors.callBeginningScenicTrace(scenario.getSimulator)
 
 
@@ -245,7 +325,7 @@ def runSimulation(scene):
         print(f"  Ran simulation in {totalTime:.4g} seconds.")
     if simulation and args.show_records:
         for name, value in simulation.result.records.items():
-            if isinstance(value, list):
+            if isinstance(value, TimeSeries):
                 print(f'    Record "{name}": (time series)')
                 for step, subval in value:
                     print(f"      {step:4d}: {subval}")
@@ -255,7 +335,42 @@ def runSimulation(scene):
 
 
 try:
-    if args.gather_stats is None:
+    if args.batch is not None:
+        # Generate scenes headlessly, writing them to a file
+        from scenic.core.batch import generateToFile
+
+        stats = errors.callBeginningScenicTrace(
+            lambda: generateToFile(
+                scenario,
+                args.batch,
+                args.output,
+                workers=args.workers,
+                seed=args.seed,
+            )
+        )
+        if args.verbosity >= 1:
+            stats.report()
+
+    elif farm:
+        # Run simulations in a pool of worker processes
+        from scenic.core.batch import simulateToFile
+
+        stats = errors.callBeginningScenicTrace(
+            lambda: simulateToFile(
+                scenario,
+                args.count,
+                args.output,
+                workers=args.workers,
+                seed=args.seed,
+                replayPath=args.save_replays,
+                maxSteps=args.time,
+                maxSimsPerScene=args.max_sims_per_scene,
+            )
+        )
+        if args.verbosity >= 1:
+            stats.report()
+
+    elif args.gather_stats is None:
         # Generate scenes interactively until killed/count reached
         if not args.simulate:  # will need matplotlib to draw scene schematic
             import matplotlib
@@ -330,8 +445,12 @@ except KeyboardInterrupt:
     pass
 
 finally:
-    if args.simulate:
+    if args.simulate and not farm:
         simulator.destroy()
+    if args.requirement_profile:
+        scenario.saveRequirementProfile(args.requirement_profile)
+    if args.profile_generation:
+        scenario.generationStats.report()
 
 
 def dummy():  # for the 'scenic' entry point to call after importing this module
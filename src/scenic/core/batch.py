@@ -0,0 +1,512 @@
+"""Generating large batches of scenes and simulations using several worker processes.
+
+This module implements the batch and simulation farm modes of the :command:`scenic`
+command-line tool (see the ``--batch`` and ``--workers`` options), but can also be
+used directly. Scenes are generated in
+fixed-size chunks, each with its own random seed derived from a single base seed, so
+that the output for a given seed does not depend on the number of workers used.
+
+Scenes are written either as lines of JSON (one object per scene, summarizing the
+global parameters and the objects in the scene), or as a binary *shard* file
+containing the encodings of the scenes produced by `Scenario.sceneToBytes`. Shards
+can be read back with `readSceneShard`.
+"""
+
+import collections
+import collections.abc
+import contextlib
+import json
+import multiprocessing
+import multiprocessing.util
+import random
+import struct
+import sys
+import time
+
+import numpy
+
+from scenic.core.distributions import RejectionException
+from scenic.core.serialization import scenicToJSON
+from scenic.core.simulators import SimulationCreationError
+from scenic.core.vectors import Vector
+
+#: Number of scenes generated from each random seed.
+chunkSize = 8
+
+_shardMagic = b"SCNSHARD"
+_shardVersion = 1
+_shardHeader = struct.Struct("<8sH")
+_recordHeader = struct.Struct("<I")
+
+## Statistics
+
+
+class BatchStats:
+    """Statistics about the generation of a batch of scenes.
+
+    Attributes:
+        scenes (int): Number of scenes generated.
+        iterations (int): Total number of rejection sampling iterations used.
+        time (float): Total time taken, in seconds.
+        rejections (collections.Counter): Number of rejected samples, indexed by the
+          reason for rejection (e.g. the requirement which was violated).
+        workers (int): Number of worker processes used.
+    """
+
+    def __init__(self, workers=1):
+        self.scenes = 0
+        self.iterations = 0
+        self.time = 0
+        self.rejections = collections.Counter()
+        self.workers = workers
+
+    @property
+    def scenesPerSecond(self):
+        return self.scenes / self.time if self.time > 0 else float("nan")
+
+    @property
+    def iterationsPerSecond(self):
+        return self.iterations / self.time if self.time > 0 else float("nan")
+
+    def report(self, stream=None, maxReasons=10):
+        """Print a summary of these statistics."""
+        stream = sys.stdout if stream is None else stream
+        print(
+            f"Generated {self.scenes} scenes in {self.time:.2f} seconds"
+            f" using {self.workers} worker(s).",
+            file=stream,
+        )
+        print(f"  Throughput: {self.scenesPerSecond:.3g} scenes/s,", end=" ", file=stream)
+        print(f"{self.iterationsPerSecond:.3g} iterations/s.", file=stream)
+        if self.scenes > 0:
+            print(
+                f"  Average iterations/scene: {self.iterations / self.scenes:.3g}",
+                file=stream,
+            )
+        total = sum(self.rejections.values())
+        if total > 0:
+            print(f"  Rejections ({total} total):", file=stream)
+            for reason, count in self.rejections.most_common(maxReasons):
+                print(f"    {count:8d}  {reason}", file=stream)
+
+    def __repr__(self):
+        return (
+            f"<BatchStats: {self.scenes} scenes, {self.iterations} iterations, "
+            f"{self.time:.4g}s>"
+        )
+
+
+class SimulationBatchStats(BatchStats):
+    """Statistics about a batch of simulations run by `simulateToFile`.
+
+    In addition to the attributes of `BatchStats` (which here describe the
+    generation of the scenes simulated), this class has:
+
+    Attributes:
+        simulations (int): Number of successful simulations.
+        failedSimulations (int): Number of scenes whose simulations were all
+          rejected or could not be created.
+        steps (int): Total number of time steps simulated in successful simulations.
+        terminations (collections.Counter): Number of simulations ending with each
+          `TerminationType`, indexed by name.
+    """
+
+    def __init__(self, workers=1):
+        super().__init__(workers=workers)
+        self.simulations = 0
+        self.failedSimulations = 0
+        self.steps = 0
+        self.terminations = collections.Counter()
+
+    @property
+    def stepsPerSecond(self):
+        return self.steps / self.time if self.time > 0 else float("nan")
+
+    def report(self, stream=None, maxReasons=10):
+        stream = sys.stdout if stream is None else stream
+        print(
+            f"Ran {self.simulations} simulations ({self.failedSimulations} failed)"
+            f" in {self.time:.2f} seconds using {self.workers} worker(s).",
+            file=stream,
+        )
+        rate = self.simulations / self.time if self.time > 0 else float("nan")
+        print(
+            f"  Throughput: {rate:.3g} simulations/s, {self.stepsPerSecond:.3g} steps/s.",
+            file=stream,
+        )
+        for name, count in self.terminations.most_common():
+            print(f"    {count:8d}  {name}", file=stream)
+        super().report(stream=stream, maxReasons=maxReasons)
+
+    def __repr__(self):
+        return (
+            f"<SimulationBatchStats: {self.simulations} simulations, "
+            f"{self.steps} steps, {self.time:.4g}s>"
+        )
+
+
+## Encoding scenes
+
+
+def sceneToJSON(scene):
+    """Summarize a `Scene` as a JSON-compatible dictionary.
+
+    The summary includes the values of the global parameters and the class, position,
+    orientation, and dimensions of each object. Parameter values which cannot be
+    represented in JSON are converted to strings.
+    """
+    objects = []
+    for obj in scene.objects:
+        objects.append(
+            {
+                "class": type(obj).__name__,
+                "name": getattr(obj, "name", None),
+                "position": obj.position,
+                "orientation": [obj.yaw, obj.pitch, obj.roll],
+                "dimensions": [obj.width, obj.length, obj.height],
+            }
+        )
+    return {"params": dict(scene.params), "objects": objects}
+
+
+def _jsonDefault(value):
+    if isinstance(value, Vector):
+        return scenicToJSON(value)
+    if isinstance(value, numpy.generic):
+        return value.item()
+    if isinstance(value, collections.abc.Sequence):  # e.g. a TimeSeries
+        return list(value)
+    return str(value)
+
+
+def _encode(scenario, scene, format):
+    if format == "jsonl":
+        return (json.dumps(sceneToJSON(scene), default=_jsonDefault) + "\n").encode()
+    else:
+        data = scenario.sceneToBytes(scene)
+        return _recordHeader.pack(len(data)) + data
+
+
+def readSceneShard(scenario, path, **kwargs):
+    """Iterate over the scenes in a binary shard file written by `generateToFile`.
+
+    Args:
+        scenario (Scenario): The scenario the scenes were generated from.
+        path: Path to the shard file.
+        kwargs: Additional arguments to `Scenario.sceneFromBytes`.
+    """
+    for data in _readShard(path):
+        yield scenario.sceneFromBytes(data, **kwargs)
+
+
+def readReplayShard(path):
+    """Iterate over the replays in a shard file written by `simulateToFile`.
+
+    Each replay is a `bytes` object which can be passed to
+    `Scenario.simulationFromBytes`.
+    """
+    return _readShard(path)
+
+
+def _readShard(path):
+    with open(path, "rb") as f:
+        magic, version = _shardHeader.unpack(f.read(_shardHeader.size))
+        if magic != _shardMagic or version != _shardVersion:
+            raise ValueError(f"{path} is not a Scenic shard file")
+        while header := f.read(_recordHeader.size):
+            (length,) = _recordHeader.unpack(header)
+            yield f.read(length)
+
+
+## Worker pools
+
+# State of the current worker process
+_workerScenario = None
+_workerOptions = None
+_workerSimulator = None
+
+
+def _initWorker(scenario, options, scenarioFactory=None):
+    global _workerScenario, _workerOptions, _workerSimulator
+    if scenarioFactory is not None:
+        scenario = scenarioFactory()
+    _workerScenario = scenario
+    _workerOptions = options
+    _workerSimulator = None
+
+
+def _makeTasks(count, seed):
+    # Split the batch into chunks, each with its own seed.
+    counts = [min(chunkSize, count - i) for i in range(0, count, chunkSize)]
+    seeds = numpy.random.SeedSequence(seed).generate_state(len(counts))
+    return list(zip(counts, (int(s) for s in seeds)))
+
+
+def _seedChunk(seed):
+    random.seed(seed)
+    numpy.random.seed(seed)
+    return collections.Counter(_workerScenario.rejectionCounts)
+
+
+def _newRejections(before):
+    rejections = collections.Counter(_workerScenario.rejectionCounts)
+    rejections.subtract(before)
+    return +rejections
+
+
+@contextlib.contextmanager
+def _workerPool(scenario, options, workers, scenarioFactory):
+    """Context manager yielding a function which maps tasks to results in order.
+
+    The function runs the tasks in a pool of worker processes if **workers** is
+    greater than 1, and in the current process otherwise.
+    """
+    if workers <= 1:
+        _initWorker(scenario, options)
+        try:
+            yield map
+        finally:
+            _cleanupWorker()
+        return
+
+    if scenarioFactory is not None:
+        context = multiprocessing.get_context()
+        initargs = (None, options, scenarioFactory)
+    elif "fork" in multiprocessing.get_all_start_methods():
+        # Scenarios cannot in general be pickled, so fork the workers.
+        context = multiprocessing.get_context("fork")
+        initargs = (scenario, options)
+    else:
+        raise ValueError(
+            "using multiple workers requires a scenarioFactory on this platform"
+        )
+    pool = context.Pool(workers, initializer=_initWorker, initargs=initargs)
+    try:
+        yield pool.imap
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()  # let workers exit normally, destroying their simulators
+    finally:
+        pool.join()
+
+
+def _getSimulator():
+    global _workerSimulator
+    if _workerSimulator is None:
+        _workerSimulator = _workerScenario.getSimulator()
+        if multiprocessing.parent_process() is not None:
+            multiprocessing.util.Finalize(
+                _workerSimulator, _workerSimulator.destroy, exitpriority=0
+            )
+    return _workerSimulator
+
+
+def _cleanupWorker():
+    if _workerSimulator is not None:
+        _workerSimulator.destroy()
+    _initWorker(None, None)
+
+
+## Scene generation
+
+
+def _generateChunk(task):
+    count, seed = task
+    scenario = _workerScenario
+    format, maxIterations = _workerOptions
+    before = _seedChunk(seed)
+    records, iterations = [], 0
+    for _ in range(count):
+        scene, its = scenario.generate(maxIterations=maxIterations)
+        records.append(_encode(scenario, scene, format))
+        iterations += its
+    return records, iterations, _newRejections(before)
+
+
+def generateToFile(
+    scenario,
+    numScenes,
+    path,
+    workers=1,
+    seed=None,
+    format=None,
+    maxIterations=2000,
+    scenarioFactory=None,
+):
+    """Generate a batch of scenes and write them to a file.
+
+    Args:
+        scenario (Scenario): The scenario to sample from.
+        numScenes (int): Number of scenes to generate.
+        path: Path of the file to write.
+        workers (int): Number of worker processes to use. If 1, scenes are generated
+          in the current process.
+        seed (int): Base random seed. If `None`, a seed is chosen randomly.
+        format (str): Either ``"jsonl"`` to write one JSON object per line (see
+          `sceneToJSON`), or ``"binary"`` to write a shard of scenes encoded with
+          `Scenario.sceneToBytes`. By default, ``"jsonl"`` is used if **path** ends
+          with ``.jsonl`` and ``"binary"`` otherwise.
+        maxIterations (int): Maximum number of rejection sampling iterations for
+          each scene.
+        scenarioFactory: A picklable function which compiles the scenario, called in
+          each worker process. If `None`, worker processes are forked so that they
+          inherit the scenario; this is not possible on all platforms.
+
+    Returns:
+        A `BatchStats` object.
+
+    Raises:
+        `RejectionException`: if some scene could not be generated within
+          **maxIterations** iterations.
+    """
+    if format is None:
+        format = "jsonl" if str(path).endswith(".jsonl") else "binary"
+    if format not in ("jsonl", "binary"):
+        raise ValueError(f'unknown batch output format "{format}"')
+
+    tasks = _makeTasks(numScenes, seed)
+    stats = BatchStats(workers=workers)
+    startTime = time.monotonic()
+    options = (format, maxIterations)
+    with _workerPool(scenario, options, workers, scenarioFactory) as mapper:
+        with open(path, "wb") as f:
+            if format == "binary":
+                f.write(_shardHeader.pack(_shardMagic, _shardVersion))
+            for records, iterations, rejections in mapper(_generateChunk, tasks):
+                f.writelines(records)
+                stats.scenes += len(records)
+                stats.iterations += iterations
+                stats.rejections.update(rejections)
+    stats.time = time.monotonic() - startTime
+    return stats
+
+
+## Simulation farm
+
+
+def _simulateChunk(task):
+    count, seed = task
+    scenario = _workerScenario
+    maxSteps, maxIterations, maxSimsPerScene, maxFailures, saveReplays = _workerOptions
+    simulator = _getSimulator()
+    before = _seedChunk(seed)
+    results, replays, iterations, scenes, failures = [], [], 0, 0, 0
+    while len(results) < count:
+        scene, its = scenario.generate(maxIterations=maxIterations)
+        iterations += its
+        scenes += 1
+        try:
+            simulation = simulator.simulate(
+                scene,
+                maxSteps=maxSteps,
+                maxIterations=maxSimsPerScene,
+                enableReplay=saveReplays,
+                verbosity=0,
+            )
+        except SimulationCreationError:
+            simulation = None
+        if simulation is None:
+            failures += 1
+            if failures > maxFailures * count:
+                raise RejectionException(
+                    f"failed to run {count} simulations: {failures} scenes"
+                    " were rejected during simulation"
+                )
+            continue
+        result = simulation.result
+        results.append(
+            {
+                "terminationType": result.terminationType.name,
+                "terminationReason": result.terminationReason,
+                "steps": simulation.currentTime,
+                "records": result.records,
+            }
+        )
+        if saveReplays:
+            data = scenario.simulationToBytes(simulation)
+            replays.append(_recordHeader.pack(len(data)) + data)
+    lines = [
+        (json.dumps(result, default=_jsonDefault) + "\n").encode() for result in results
+    ]
+    # Only send back what the statistics need, not the records again
+    summaries = [(result["steps"], result["terminationType"]) for result in results]
+    return lines, replays, summaries, iterations, scenes, failures, _newRejections(before)
+
+
+def simulateToFile(
+    scenario,
+    numSimulations,
+    path,
+    workers=1,
+    seed=None,
+    replayPath=None,
+    maxSteps=None,
+    maxIterations=2000,
+    maxSimsPerScene=1,
+    maxFailures=100,
+    scenarioFactory=None,
+):
+    """Run a batch of simulations and write their results to a file.
+
+    Each worker process holds its own `Simulator` (obtained from
+    `Scenario.getSimulator`), generating scenes and running simulations from them
+    until the requested number of simulations have completed successfully.
+
+    Args:
+        scenario (Scenario): The scenario to sample from.
+        numSimulations (int): Number of successful simulations to run.
+        path: Path of a file to which to write the results, one JSON object per
+          line giving the termination type and reason, the number of time steps, and
+          the values of any :keyword:`record` statements.
+        workers (int): Number of worker processes to use. If 1, simulations are run
+          in the current process.
+        seed (int): Base random seed. If `None`, a seed is chosen randomly.
+        replayPath: If not `None`, path of a binary shard file to which to write the
+          replay of each simulation, encoded with `Scenario.simulationToBytes`.
+          Replays can be read back with `readReplayShard`.
+        maxSteps (int): Maximum number of time steps for each simulation.
+        maxIterations (int): Maximum number of rejection sampling iterations for
+          each scene.
+        maxSimsPerScene (int): Maximum number of rejected simulations before
+          sampling a new scene.
+        maxFailures (int): Maximum number of scenes whose simulations are all
+          rejected, per successful simulation requested.
+        scenarioFactory: As for `generateToFile`.
+
+    Returns:
+        A `SimulationBatchStats` object.
+
+    Raises:
+        `RejectionException`: if some scene could not be generated within
+          **maxIterations** iterations, or if more than **maxFailures** scenes per
+          simulation were rejected during simulation.
+    """
+    tasks = _makeTasks(numSimulations, seed)
+    stats = SimulationBatchStats(workers=workers)
+    startTime = time.monotonic()
+    saveReplays = replayPath is not None
+    options = (maxSteps, maxIterations, maxSimsPerScene, maxFailures, saveReplays)
+    with contextlib.ExitStack() as stack:
+        mapper = stack.enter_context(
+            _workerPool(scenario, options, workers, scenarioFactory)
+        )
+        f = stack.enter_context(open(path, "wb"))
+        if saveReplays:
+            replayFile = stack.enter_context(open(replayPath, "wb"))
+            replayFile.write(_shardHeader.pack(_shardMagic, _shardVersion))
+        for chunk in mapper(_simulateChunk, tasks):
+            lines, replays, summaries, iterations, scenes, failures, rejections = chunk
+            f.writelines(lines)
+            if saveReplays:
+                replayFile.writelines(replays)
+            stats.simulations += len(summaries)
+            stats.failedSimulations += failures
+            stats.steps += sum(steps for steps, _ in summaries)
+            stats.terminations.update(termination for _, termination in summaries)
+            stats.scenes += scenes
+            stats.iterations += iterations
+            stats.rejections.update(rejections)
+    stats.time = time.monotonic() - startTime
+    return stats
@@ -6,6 +6,7 @@ import itertools
 import math
 import numbers
 import random
+import time
 import typing
 import warnings
 
@@ -115,8 +116,13 @@ class Samplable(LazilyEvaluable):
         _conditioned: proxy object as described above; set using `conditionTo`.
         _dependencies: tuple of other samplables which must be sampled before this one;
             set by the initializer and subsequently immutable.
+        _samplingEpoch: counter incremented by each call to `sampleAll`; caches of
+            pre-drawn random values (e.g. `MeshSurfaceSampler`) must be discarded when
+            it changes, so that reseeding the PRNGs reproduces the same samples.
     """
 
+    _samplingEpoch = 0
+
     def __init__(self, dependencies):
         deps = []
         props = set()
@@ -128,16 +134,32 @@ class Samplable(LazilyEvaluable):
         self._conditioned = self  # version (partially) conditioned on requirements
 
     @staticmethod
-    def sampleAll(quantities):
+    def sampleAll(quantities, times=None):
         """Sample all the given Samplables, which may have dependencies in common.
 
         Reproducibility note: the order in which the quantities are given can affect the
         order in which calls to random are made, affecting the final result.
+
+        If **times** is given, it should be a list with one number for each quantity;
+        the time taken to sample each quantity, in seconds, is added to the
+        corresponding entry. This time includes sampling any dependencies of the
+        quantity which were not already sampled for an earlier quantity.
         """
+        Samplable._samplingEpoch += 1
         subsamples = DefaultIdentityDict()
-        for q in quantities:
+        if times is None:
+            for q in quantities:
+                if q not in subsamples:
+                    subsamples[q] = q.sample(subsamples) if needsSampling(q) else q
+            return subsamples
+
+        for i, q in enumerate(quantities):
             if q not in subsamples:
-                subsamples[q] = q.sample(subsamples) if needsSampling(q) else q
+                start = time.perf_counter()
+                try:
+                    subsamples[q] = q.sample(subsamples) if needsSampling(q) else q
+                finally:
+                    times[i] += time.perf_counter() - start
         return subsamples
 
     def sample(self, subsamples=None):
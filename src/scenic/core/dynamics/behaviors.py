@@ -3,17 +3,12 @@
 import functools
 import inspect
 import itertools
-import sys
-import warnings
 
 from scenic.core.distributions import Samplable, toDistribution
-import scenic.core.dynamics as dynamics
 from scenic.core.errors import InvalidScenarioError
 from scenic.core.type_support import CoercionFailure
-from scenic.core.utils import alarm
 
 from .invocables import Invocable
-from .utils import StuckBehaviorWarning
 
 
 class Behavior(Invocable, Samplable):
@@ -94,24 +89,23 @@ class Behavior(Invocable, Samplable):
         super()._step()
         assert self._runningIterator
 
-        def alarmHandler(signum, frame):
-            # NOTE: if using pytest-cov, sys.gettrace() set to CTracer(), but we still want timeout warnings enabled
-            if sys.gettrace() and "coverage" not in str(type(sys.gettrace())):
-                return  # skip the warning if we're in the debugger
-            warnings.warn(
-                f"the behavior {self} is taking a long time to take an action; "
-                "maybe you have an infinite loop with no take/wait statements?",
-                StuckBehaviorWarning,
-            )
-
-        timeout = dynamics.stuckBehaviorWarningTimeout
-        with veneer.executeInBehavior(self), alarm(timeout, alarmHandler):
+        watchdog = veneer.currentSimulation._watchdog
+        watchdog.watch(self)
+        with veneer.executeInBehavior(self):
             try:
                 actions = self._runningIterator.send(None)
             except StopIteration:
                 actions = ()  # behavior ended early
+            finally:
+                watchdog.unwatch()
         return actions
 
+    def _stuckWarningMessage(self):
+        return (
+            f"the behavior {self} is taking a long time to take an action; "
+            "maybe you have an infinite loop with no take/wait statements?"
+        )
+
     def _stop(self, reason=None):
         super()._stop(reason)
         self._agent = None
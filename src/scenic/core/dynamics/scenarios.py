@@ -10,7 +10,6 @@ import weakref
 import rv_ltl
 
 import scenic
-import scenic.core.dynamics as dynamics
 from scenic.core.errors import InvalidScenarioError, ScenicSyntaxError
 from scenic.core.lazy_eval import DelayedArgument, needsLazyEvaluation
 from scenic.core.requirements import (
@@ -18,13 +17,13 @@ from scenic.core.requirements import (
     PendingRequirement,
     RequirementType,
 )
-from scenic.core.utils import alarm, argsToString
+from scenic.core.utils import argsToString
 from scenic.core.workspaces import Workspace
 
 from .actions import _EndScenarioAction, _EndSimulationAction
 from .behaviors import Behavior, Monitor
 from .invocables import Invocable
-from .utils import RejectSimulationException, StuckBehaviorWarning
+from .utils import RejectSimulationException
 
 
 class DynamicScenario(Invocable):
@@ -240,18 +239,9 @@ class DynamicScenario(Invocable):
         if self._runningIterator is None:
             composeDone = True  # compose block ended in an earlier step
         else:
-
-            def alarmHandler(signum, frame):
-                if sys.gettrace():
-                    return  # skip the warning if we're in the debugger
-                warnings.warn(
-                    f"the compose block of scenario {self} is taking a long time; "
-                    'maybe you have an infinite loop with no "wait" statement?',
-                    StuckBehaviorWarning,
-                )
-
-            timeout = dynamics.stuckBehaviorWarningTimeout
-            with veneer.executeInScenario(self), alarm(timeout, alarmHandler):
+            watchdog = veneer.currentSimulation._watchdog
+            watchdog.watch(self)
+            with veneer.executeInScenario(self):
                 try:
                     result = self._runningIterator.send(None)
                     if isinstance(result, (_EndSimulationAction, _EndScenarioAction)):
@@ -259,6 +249,8 @@ class DynamicScenario(Invocable):
                 except StopIteration:
                     self._runningIterator = None
                     composeDone = True
+                finally:
+                    watchdog.unwatch()
 
         # If there is a compose block and it has finished, we're done
         if self._compose is not None and composeDone:
@@ -277,6 +269,12 @@ class DynamicScenario(Invocable):
         # Scenario will not terminate yet
         return None
 
+    def _stuckWarningMessage(self):
+        return (
+            f"the compose block of scenario {self} is taking a long time; "
+            'maybe you have an infinite loop with no "wait" statement?'
+        )
+
     def _stop(self, reason, quiet=False):
         """Stop the scenario's execution, for the given reason."""
         import scenic.syntax.veneer as veneer
@@ -1,5 +1,11 @@
 """Assorted utilities and classes used throughout the dynamics package."""
 
+import signal
+import sys
+import threading
+import time
+import warnings
+
 
 class RejectSimulationException(Exception):
     """Exception indicating a requirement was violated at runtime."""
@@ -19,3 +25,95 @@ class StuckBehaviorWarning(UserWarning):
     """
 
     pass
+
+
+class StuckBehaviorWatchdog:
+    """Watchdog issuing `StuckBehaviorWarning` for the duration of a simulation.
+
+    Rather than arming a separate alarm every time a behavior or compose block is
+    resumed, we use a single monitor thread for the whole simulation. Each step only
+    records the running behavior/scenario and when it was resumed using `watch`; the
+    monitor periodically checks whether any running step has been going for longer
+    than the timeout, and if so sends SIGALRM to the main thread. The warning is then issued
+    from the signal handler, so as with an ordinary alarm it points at the stuck code
+    (and can interrupt it if warnings are being turned into errors).
+
+    Args:
+        timeout: time in seconds after which to issue the warning; if zero or
+            negative, the watchdog does nothing.
+        resolution: number of times per **timeout** to check on the running step.
+    """
+
+    def __init__(self, timeout, resolution=4):
+        self.timeout = timeout
+        self.interval = timeout / resolution
+        # entries [task, time resumed, whether warned] for the running steps,
+        # innermost last
+        self._running = []
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start monitoring, if supported on this platform and thread."""
+        if (
+            self.timeout <= 0
+            or not hasattr(signal, "pthread_kill")  # not supported on Windows
+            or threading.current_thread() is not threading.main_thread()
+        ):
+            return
+        self._oldHandler = signal.signal(signal.SIGALRM, self._handler)
+        self._thread = threading.Thread(
+            target=self._monitor,
+            args=(threading.main_thread().ident,),
+            name="StuckBehaviorWatchdog",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop monitoring and restore any previous SIGALRM handler."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        signal.signal(signal.SIGALRM, self._oldHandler)
+
+    def watch(self, task):
+        """Record that the given behavior/scenario is now running.
+
+        Each call must be matched by a call to `unwatch` when the step finishes.
+        Steps may be nested (e.g. a sub-behavior stepped from inside a compose
+        block); the time of the enclosing step keeps running while nested steps
+        execute, so it is still reported if it never yields.
+        """
+        self._running.append([task, time.monotonic(), False])
+
+    def unwatch(self):
+        """Record that the innermost running behavior/scenario has yielded."""
+        self._running.pop()
+
+    def _stuckEntry(self):
+        # The outermost step has been running the longest, so check it first.
+        now = time.monotonic()
+        for entry in tuple(self._running):
+            if not entry[2] and now - entry[1] >= self.timeout:
+                return entry
+        return None
+
+    def _monitor(self, mainThread):
+        while not self._stopping.wait(self.interval):
+            if self._stuckEntry() is not None:
+                signal.pthread_kill(mainThread, signal.SIGALRM)
+
+    def _handler(self, signum, frame):
+        entry = self._stuckEntry()
+        if entry is None:
+            return
+        task = entry[0]
+        entry[2] = True
+        # NOTE: if using pytest-cov, sys.gettrace() set to CTracer(), but we still want
+        # timeout warnings enabled
+        if sys.gettrace() and "coverage" not in str(type(sys.gettrace())):
+            return  # skip the warning if we're in the debugger
+        warnings.warn(task._stuckWarningMessage(), StuckBehaviorWarning)
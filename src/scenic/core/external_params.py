@@ -88,14 +88,35 @@ in general may be approximated so that VerifAI can handle them -- see
 
 For more information on how to customize the sampler, see `VerifaiSampler`.
 
+Quasi-Monte Carlo Sampling
+==========================
+
+For coverage-driven test generation without installing VerifAI, Scenic also
+provides the `QMCSampler`, which uses the quasi-Monte Carlo engines in
+:mod:`scipy.stats.qmc` to sample scrambled `Sobol`_ or `Halton`_ sequences. It
+supports the external parameters `QMCRange`, `QMCDiscreteRange`, and `QMCOptions`,
+analogous to the VerifAI parameters above::
+
+    ego = new Object at (QMCRange(5, 15), QMCRange(0, 10))
+
+Each external parameter is one coordinate of a low-discrepancy sequence, so the
+space of parameter values is covered much more evenly than by independent
+uniform samples. The `QMCSampler` is used automatically when all external
+parameters are QMC parameters; see its documentation for how to configure the
+sequence and to save and resume progress through it.
+
 .. _VerifAI: https://github.com/BerkeleyLearnVerify/VerifAI
 
 .. _Halton: https://en.wikipedia.org/wiki/Halton_sequence
 
 .. _cross-entropy: https://en.wikipedia.org/wiki/Cross-entropy_method
 
+.. _Sobol: https://en.wikipedia.org/wiki/Sobol_sequence
+
 """
 
+import random
+
 from dotmap import DotMap
 import numpy
 
@@ -125,7 +146,8 @@ class ExternalSampler:
 
         The scenario may explicitly select an external sampler by assigning the
         :term:`global parameter` ``externalSampler`` to a subclass of `ExternalSampler`.
-        Otherwise, a `VerifaiSampler` is used by default.
+        Otherwise, a `QMCSampler` is used if all the parameters are instances of
+        `QMCParameter`, and a `VerifaiSampler` is used otherwise.
 
         Args:
             params (tuple): Tuple listing each `ExternalParameter`.
@@ -137,7 +159,11 @@ class ExternalSampler:
             An `ExternalSampler` configured for the given parameters.
         """
         if len(params) > 0:
-            externalSampler = globalParams.get("externalSampler", VerifaiSampler)
+            if all(isinstance(param, QMCParameter) for param in params):
+                default = QMCSampler
+            else:
+                default = VerifaiSampler
+            externalSampler = globalParams.get("externalSampler", default)
             if not issubclass(externalSampler, ExternalSampler):
                 raise InvalidScenarioError(
                     f"externalSampler type {externalSampler}"
@@ -270,6 +296,111 @@ class VerifaiSampler(ExternalSampler):
         return f"param{i}"
 
 
+class QMCSampler(ExternalSampler):
+    """An external sampler generating quasi-Monte Carlo (low-discrepancy) sequences.
+
+    Each sample is the next point of a Sobol or Halton sequence in the unit hypercube,
+    with one dimension per external parameter, generated using :mod:`scipy.stats.qmc`.
+    The sampler is passive, i.e. it ignores feedback.
+
+    The sampler can be configured using the following Scenic :term:`global parameters`:
+
+        * ``qmcSamplerType`` -- either ``'sobol'`` (the default) or ``'halton'``;
+        * ``qmcScramble`` -- whether to randomly scramble the sequence (default true);
+        * ``qmcSeed`` -- seed for the scrambling; by default, a seed is drawn from
+          Python's `random` module, so that sampling is deterministic if the Scenic
+          random seed is fixed;
+        * ``qmcBatchSize`` -- number of points to generate at a time (default 256;
+          for Sobol sequences this should be a power of 2);
+        * ``qmcCheckpoint`` -- a checkpoint from `checkpoint` to resume from.
+
+    The `QMCSampler` supports external parameters which are instances of `QMCParameter`.
+
+    Attributes:
+        index (int): number of points of the sequence consumed so far.
+    """
+
+    _engineNames = {"sobol": "Sobol", "halton": "Halton"}
+
+    def __init__(self, params, globalParams):
+        super().__init__(params, globalParams)
+        self.params = tuple(params)
+        for index, param in enumerate(self.params):
+            if not isinstance(param, QMCParameter):
+                raise RuntimeError(f"QMCSampler given parameter of wrong type: {param}")
+            param.sampler = self
+            param.index = index
+
+        self.samplerType = globalParams.get("qmcSamplerType", "sobol")
+        if self.samplerType not in self._engineNames:
+            raise RuntimeError(f'Unknown QMC sampler type "{self.samplerType}"')
+        self.scramble = bool(globalParams.get("qmcScramble", True))
+        seed = globalParams.get("qmcSeed")
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.batchSize = int(globalParams.get("qmcBatchSize", 256))
+        if self.batchSize < 1:
+            raise RuntimeError("qmcBatchSize must be positive")
+
+        self.cachedSample = None
+        self._resetEngine(0)
+        checkpoint = globalParams.get("qmcCheckpoint")
+        if checkpoint is not None:
+            self.restore(checkpoint)
+
+    def _resetEngine(self, index):
+        from scipy.stats import qmc
+
+        engineType = getattr(qmc, self._engineNames[self.samplerType])
+        self._engine = engineType(
+            len(self.params), scramble=self.scramble, seed=self.seed
+        )
+        if index > 0:
+            self._engine.fast_forward(index)
+        self.index = index
+        self._batch = []
+        self._batchPosition = 0
+
+    def nextSample(self, feedback):
+        if self._batchPosition >= len(self._batch):
+            self._batch = self._engine.random(self.batchSize).tolist()
+            self._batchPosition = 0
+        point = self._batch[self._batchPosition]
+        self._batchPosition += 1
+        self.index += 1
+        return point
+
+    def valueFor(self, param):
+        return param.fromUnit(self.cachedSample[param.index])
+
+    def checkpoint(self):
+        """Save the position of the sampler in its sequence.
+
+        Returns:
+            A `dict` which can be passed to `restore`, or used as the value of the
+            ``qmcCheckpoint`` global parameter, to continue the sequence from the
+            current point (e.g. in another process).
+        """
+        return dict(
+            samplerType=self.samplerType,
+            scramble=self.scramble,
+            seed=self.seed,
+            dimension=len(self.params),
+            index=self.index,
+        )
+
+    def restore(self, checkpoint):
+        """Resume the sequence from a checkpoint made by `checkpoint`."""
+        if checkpoint["dimension"] != len(self.params):
+            raise RuntimeError(
+                f"QMC checkpoint is for {checkpoint['dimension']} parameters, "
+                f"but the scenario has {len(self.params)}"
+            )
+        self.samplerType = checkpoint["samplerType"]
+        self.scramble = checkpoint["scramble"]
+        self.seed = checkpoint["seed"]
+        self._resetEngine(checkpoint["index"])
+
+
 class ExternalParameter(Distribution):
     """A value determined by external code rather than Scenic's internal sampler."""
 
@@ -379,3 +510,66 @@ class VerifaiOptions(Options):
     @staticmethod
     def makeSelector(n, weights):
         return VerifaiDiscreteRange(0, n, weights)
+
+
+class QMCParameter(ExternalParameter):
+    """An external parameter sampled using the `QMCSampler`.
+
+    Subclasses map the coordinate of the low-discrepancy sequence assigned to the
+    parameter, which lies in the unit interval, to a value using `fromUnit`.
+    """
+
+    def fromUnit(self, u):
+        """Map a point of the unit interval to a value of this parameter."""
+        raise NotImplementedError
+
+
+class QMCRange(QMCParameter):
+    """A :obj:`~scenic.core.distributions.Range` (real interval) sampled by QMC."""
+
+    _defaultValueType = float
+
+    def __init__(self, low, high):
+        super().__init__()
+        self.low = low
+        self.high = high
+
+    def fromUnit(self, u):
+        return self.low + u * (self.high - self.low)
+
+
+class QMCDiscreteRange(QMCParameter):
+    """A :obj:`~scenic.core.distributions.DiscreteRange` (integer interval) sampled by QMC."""
+
+    _defaultValueType = int
+
+    def __init__(self, low, high, weights=None):
+        super().__init__()
+        self.low = low
+        self.high = high
+        if weights is not None:
+            if len(weights) != (high - low + 1):
+                raise RuntimeError(
+                    f"QMCDiscreteRange created with {len(weights)} weights "
+                    f"for {high - low + 1} values"
+                )
+            cumulative = numpy.cumsum(weights, dtype=float)
+            self.cumulativeProbs = cumulative / cumulative[-1]
+        else:
+            self.cumulativeProbs = None
+
+    def fromUnit(self, u):
+        if self.cumulativeProbs is None:
+            offset = min(int(u * (self.high - self.low + 1)), self.high - self.low)
+        else:
+            offset = int(numpy.searchsorted(self.cumulativeProbs, u, side="right"))
+            offset = min(offset, self.high - self.low)
+        return self.low + offset
+
+
+class QMCOptions(Options):
+    """An :obj:`~scenic.core.distributions.Options` (discrete set) sampled by QMC."""
+
+    @staticmethod
+    def makeSelector(n, weights):
+        return QMCDiscreteRange(0, n, weights)
@@ -29,6 +29,8 @@ import shapely.affinity
 import trimesh
 
 from scenic.core.distributions import (
+    DiscreteRange,
+    Distribution,
     FunctionDistribution,
     MultiplexerDistribution,
     RandomControlFlowError,
@@ -995,6 +997,121 @@ class OrientedPoint(Point):
         return self.orientation
 
 
+## Scaled shapes
+
+
+class ScaledShapeCache:
+    """A bounded cache of the `MeshVolumeRegion` objects for scaled shapes.
+
+    Objects whose dimensions are random need a fresh copy of their shape scaled to
+    the sampled dimensions, together with derived data like the FCL model used for
+    collision checking. When the dimensions are drawn from a small set of values
+    (e.g. using `Options`), the same scaled shapes recur across samples and objects;
+    this cache allows them to be shared. (Objects whose dimensions are continuous
+    random values do not use the cache, since their scaled shapes almost never recur.)
+    Entries are keyed on the identity of the shape and the dimensions rounded to
+    **precision** decimal places, and the least recently used entries are evicted
+    once there are more than **maxsize** of them.
+
+    Args:
+        maxsize (int): Maximum number of scaled shapes to keep.
+        precision (int): Number of decimal places to which dimensions are rounded.
+    """
+
+    def __init__(self, maxsize=256, precision=9):
+        self.maxsize = maxsize
+        self.precision = precision
+        self._entries = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, shape, width, length, height):
+        """Get the region for the given shape scaled to the given dimensions."""
+        dims = (width, length, height)
+        key = (_ShapeKey(shape),) + tuple(
+            round(float(dim), self.precision) for dim in dims
+        )
+        region = self._entries.get(key)
+        if region is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return region
+        self.misses += 1
+        region = MeshVolumeRegion(
+            mesh=shape.mesh,
+            dimensions=dims,
+            centerMesh=False,
+            _internal=True,
+            _isConvex=shape.isConvex,
+        )
+        if self.maxsize > 0:
+            self._entries[key] = region
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return region
+
+    @property
+    def hitRate(self):
+        """Fraction of lookups which were served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"<ScaledShapeCache: {len(self)}/{self.maxsize} entries, "
+            f"{self.hits} hits, {self.misses} misses>"
+        )
+
+
+class _ShapeKey:
+    """Cache key comparing shapes by identity.
+
+    The key holds a reference to the shape, so that its id cannot be reused by
+    another shape while the key is in the cache.
+    """
+
+    __slots__ = ("shape",)
+
+    def __init__(self, shape):
+        self.shape = shape
+
+    def __hash__(self):
+        return id(self.shape)
+
+    def __eq__(self, other):
+        return self.shape is other.shape
+
+
+def _hasFiniteSupport(value):
+    """Whether the given value can only take finitely many values when sampled.
+
+    This is conservative: it may return False for some values with finite support.
+    """
+    if not needsSampling(value):
+        return True
+    if not isinstance(value, Distribution):
+        return False
+    value = value._conditioned
+    if isinstance(value, DiscreteRange):
+        return True
+    if value._deterministic:
+        # e.g. `Options`, whose value is determined by a `DiscreteRange` and the options
+        return all(_hasFiniteSupport(dep) for dep in value._dependencies)
+    return False
+
+
+#: The process-wide cache of scaled shapes used by `Object`.
+scaledShapeCache = ScaledShapeCache()
+
+
 ## Object
 
 
@@ -1336,13 +1453,23 @@ class Object(OrientedPoint):
 
         shape = self.shape
         scaledShape = self._scaledShape
+        dims = (self.width, self.length, self.height)
+        if (
+            scaledShape is None
+            and self._sampleParent is not None
+            and self._sampleParent._hasFiniteDimensions
+            and not any(needsSampling(v) for v in (shape,) + dims)
+        ):
+            # The dimensions were drawn from a finite set of values; try to reuse a
+            # previously-scaled shape.
+            scaledShape = scaledShapeCache.get(shape, *dims)
         if scaledShape:
             mesh = scaledShape.mesh
             dimensions = None  # mesh does not need to be scaled
             convex = scaledShape.isConvex
         else:
             mesh = shape.mesh
-            dimensions = (self.width, self.length, self.height)
+            dimensions = dims
             convex = shape.isConvex
         return MeshVolumeRegion(
             mesh=mesh,
@@ -1356,15 +1483,16 @@ class Object(OrientedPoint):
             _scaledShape=scaledShape,
         )
 
+    @cached_property
+    def _hasFiniteDimensions(self):
+        # Whether the shape and dimensions of samples of this object come from a
+        # finite set of values, so that their scaled shapes are worth caching.
+        values = (self.shape, self.width, self.length, self.height)
+        return all(_hasFiniteSupport(value) for value in values)
+
     @precomputed_property
     def _scaledShape(shape, width, length, height):
-        return MeshVolumeRegion(
-            mesh=shape.mesh,
-            dimensions=(width, length, height),
-            centerMesh=False,
-            _internal=True,
-            _isConvex=shape.isConvex,
-        )
+        return scaledShapeCache.get(shape, width, length, height)
 
     @property
     def _isConvex(self):
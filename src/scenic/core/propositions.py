@@ -8,24 +8,52 @@ import rv_ltl
 
 from scenic.core.errors import InvalidScenarioError
 from scenic.core.lazy_eval import needsLazyEvaluation
+from scenic.core.utils import cached_property
 
 
 class PropositionMonitor:
     def __init__(self, proposition: "PropositionNode") -> None:
         self._proposition = proposition
         self._monitor = proposition.ltl_node.create_monitor()
+        self._atomics = proposition._monitoredAtomics
+        # The nodes of the monitor tree, which all need to be updated at each step.
+        # We update them directly rather than through `rv_ltl.Monitor.update`, which
+        # re-flattens the tree and rebuilds its tables of atomics on every call.
+        # This relies on internals of rv_ltl, so if they are missing we fall back on
+        # the public API.
+        self._nodes = self._monitorNodes(self._monitor)
+        if self._nodes is None:
+            self._atomics = tuple(
+                (closure, ap.identifier) for closure, ap in self._atomics
+            )
+        # Values of the atomic propositions, keyed by their `rv_ltl.Atomic` instances
+        # (or their identifiers, if using the public API); reused from step to step.
+        self._state = {}
+
+    @staticmethod
+    def _monitorNodes(monitor):
+        flatten = getattr(monitor, "_flatten", None)
+        if flatten is None:
+            return None
+        nodes = tuple(dict.fromkeys(flatten()))
+        if not all(hasattr(node, "_update_internal") for node in nodes):
+            return None
+        return nodes
 
     def update(self):
-        atomic_propositions = self._proposition.atomics()
-        state = {}
-        for ap in atomic_propositions:
-            b = ap.closure()
-            if needsLazyEvaluation(b):
+        state = self._state
+        for closure, key in self._atomics:
+            b = closure()
+            if b is not True and b is not False and needsLazyEvaluation(b):
                 raise InvalidScenarioError(
                     f"value undefined outside of object definition"
                 )
-            state[str(ap.syntax_id)] = b
-        self._monitor.update(state)
+            state[key] = b
+        if self._nodes is None:
+            self._monitor.update(state)
+        else:
+            for node in self._nodes:
+                node._update_internal(state)
         return self._monitor.evaluate()
 
 
@@ -83,6 +111,11 @@ class PropositionNode:
     def atomics(self) -> List["Atomic"]:
         return list(filter(lambda n: isinstance(n, Atomic), self.flatten()))
 
+    @cached_property
+    def _monitoredAtomics(self):
+        """Closures and `rv_ltl` propositions of the atomics, for `PropositionMonitor`."""
+        return tuple((ap.closure, ap.ltl_node) for ap in self.atomics())
+
     def create_monitor(self) -> rv_ltl.Monitor:
         return PropositionMonitor(self)
 
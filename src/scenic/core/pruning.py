@@ -6,10 +6,14 @@ compilation (from `translator.constructScenarioFrom`).
 
 import builtins
 import collections
+import concurrent.futures
+import contextlib
 import math
+import sys
 import time
 
 import numpy
+import shapely
 import shapely.geometry
 import shapely.geos
 from trimesh.transformations import translation_matrix
@@ -51,6 +55,9 @@ from scenic.syntax.relations import DistanceRelation, RelativeHeadingRelation
 ### Constants
 PRUNING_PITCH = 0.15
 
+#: Default number of threads to use for per-object pruning work (see `prune`).
+PRUNING_WORKERS = 1
+
 
 ### Utilities
 def currentPropValue(obj, prop):
@@ -152,7 +159,58 @@ def matchPolygonalField(heading, position):
 ### Pruning procedures
 
 
-def prune(scenario, verbosity=1):
+class PruningStats:
+    """Statistics about the pruning of a scenario.
+
+    An instance of this class is stored in the ``pruningStats`` attribute of a
+    `Scenario` after it is pruned.
+
+    Attributes:
+        passTimes (dict): Maps the name of each pruning pass to the time it took,
+          in seconds.
+        pruned (list): For each object whose position was restricted, a triple
+          consisting of the name of the pass, the object, and the percentage of the
+          space pruned (or `None` if it could not be computed).
+        workers (int): The number of workers used for per-object pruning work.
+    """
+
+    def __init__(self, workers=1):
+        self.passTimes = {}
+        self.pruned = []
+        self.workers = workers
+
+    @property
+    def totalTime(self):
+        """Total time taken by all pruning passes, in seconds."""
+        return sum(self.passTimes.values())
+
+    @contextlib.contextmanager
+    def timing(self, name):
+        """Context manager recording the time taken by a pruning pass."""
+        startTime = time.monotonic()
+        try:
+            yield
+        finally:
+            self.passTimes[name] = time.monotonic() - startTime
+
+    def record(self, name, obj, percentage):
+        """Record that a pass restricted the position of an object."""
+        self.pruned.append((name, obj, percentage))
+
+    def report(self, stream=None):
+        """Print a summary of the pruning (done by `prune` in verbose mode)."""
+        stream = sys.stdout if stream is None else stream
+        print(f"  Pruned scenario in {self.totalTime:.4g} seconds.", file=stream)
+        for name, obj, percentage in self.pruned:
+            amount = "?" if percentage is None else f"{percentage:.1f}%"
+            print(f"    {name} pruning removed {amount} of space for {obj}.", file=stream)
+
+    def __repr__(self):
+        times = ", ".join(f"{name}: {t:.4g}s" for name, t in self.passTimes.items())
+        return f"<PruningStats: {len(self.pruned)} prunings; {times}>"
+
+
+def prune(scenario, verbosity=1, executor=None, workers=None):
     """Prune a `Scenario`, removing infeasible parts of the space.
 
     This function directly modifies the Distributions used in the Scenario,
@@ -163,29 +221,62 @@ def prune(scenario, verbosity=1):
 
         * Pruning based on containment (`pruneContainment`)
         * Pruning based on relative heading bounds (`pruneRelativeHeading`)
+        * Pruning based on visibility (`pruneVisibility`)
+
+    Args:
+        scenario: The `Scenario` to prune.
+        verbosity: Verbosity level; at 1 or above, a summary of the pruning is
+          printed (see `PruningStats.report`).
+        executor: An optional `concurrent.futures.Executor` used to run
+          independent per-object pruning work in parallel. If `None`, a thread pool
+          is used when **workers** is greater than 1. A process pool may also
+          be used, provided the regions involved can be pickled.
+        workers: The number of workers to use for per-object pruning work, or the
+          number of workers of **executor** if one is given (this is only used for
+          statistics). Defaults to `PRUNING_WORKERS`.
+
+    Returns:
+        A `PruningStats` object, which is also stored in the scenario's
+        ``pruningStats`` attribute.
     """
+    if workers is None:
+        workers = PRUNING_WORKERS
+    ownExecutor = executor is None and workers > 1
+    if ownExecutor:
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+    stats = PruningStats(workers=workers if executor else 1)
+
+    try:
+        with stats.timing("containment"):
+            pruneContainment(scenario, verbosity, executor=executor, stats=stats)
+        with stats.timing("relativeHeading"):
+            pruneRelativeHeading(scenario, verbosity, stats=stats)
+        with stats.timing("visibility"):
+            pruneVisibility(scenario, verbosity, stats=stats)
+    finally:
+        if ownExecutor:
+            executor.shutdown()
+
+    scenario.pruningStats = stats
     if verbosity >= 1:
-        print("  Pruning scenario...")
-        startTime = time.time()
-
-    pruneContainment(scenario, verbosity)
-    pruneRelativeHeading(scenario, verbosity)
-    pruneVisibility(scenario, verbosity)
-
-    if verbosity >= 1:
-        totalTime = time.time() - startTime
-        print(f"  Pruned scenario in {totalTime:.4g} seconds.")
+        stats.report()
+    return stats
 
 
 ## Pruning based on containment
-def pruneContainment(scenario, verbosity):
+def pruneContainment(scenario, verbosity, executor=None, stats=None):
     """Prune based on the requirement that individual Objects fit within their container.
 
     Specifically, if O is positioned uniformly (with a possible offset) in region B and
     has container C, then we can instead pick a position uniformly in their intersection.
     If we can also lower bound the radius of O, then we can first erode C by that distance
     minus that maximum offset distance.
+
+    The erosion and intersection for each object are independent, and if an
+    **executor** is given they are computed in parallel.
     """
+    # Find the regions to intersect for each object.
+    tasks = []
     for obj in scenario.objects:
         # Extract the base region and container region, while doing minor checks.
         base, offset, _ = matchInRegion(obj.position)
@@ -230,71 +321,42 @@ def pruneContainment(scenario, verbosity):
             # For most regions, use full object inradius.
             minRadius, _ = supportInterval(obj.inradius)
 
-        # Erode the container if possible and productive
-        if (
-            maxDistance is not None
-            and minRadius is not None
-            and (maxErosion := minRadius - maxDistance) > 0
-        ):
-            if hasattr(container, "buffer"):
-                # We can do an exact erosion
-                container = container.buffer(-maxErosion)
-            elif isinstance(container, MeshVolumeRegion):
-                current_pitch = PRUNING_PITCH
-                eroded_container = None
-
-                while eroded_container is None:
-                    # We can attempt to erode a voxel approximation of the MeshVolumeRegion.
-                    eroded_container = container._erodeOverapproximate(
-                        maxErosion, PRUNING_PITCH
-                    )
-
-                    if isinstance(eroded_container, VoxelRegion):
-                        eroded_container = eroded_container.mesh
-
-                    current_pitch = min(2 * current_pitch, 1)
-
-                # Now check if this erosion is valid and useful, i.e. do we have less volume
-                # to sample from. If so, replace the original container.
-                if (
-                    eroded_container is not None
-                    and eroded_container.size < container.size
-                ):
-                    container = eroded_container
-
-        # Restrict the base region to the possibly eroded container, unless
-        # they're the same in which case we're done
-        if base is container:
-            continue
+        if maxDistance is not None and minRadius is not None:
+            maxErosion = minRadius - maxDistance
+        else:
+            maxErosion = 0
 
-        newBase = base.intersect(container)
-        newBase.orientation = base.orientation
+        tasks.append((obj, base, offset, container, maxErosion))
 
-        # Check if base was a volume and newBase is a surface,
-        # in which case the mesh operation might be undefined and we abort.
-        if isinstance(base, MeshVolumeRegion) and isinstance(newBase, MeshSurfaceRegion):
+    # Compute the restricted base regions, possibly in parallel.
+    if executor is None:
+        results = [
+            _restrictToContainer(base, container, maxErosion)
+            for _, base, _, container, maxErosion in tasks
+        ]
+    else:
+        futures = [
+            executor.submit(_restrictToContainer, base, container, maxErosion)
+            for _, base, _, container, maxErosion in tasks
+        ]
+        results = (future.result() for future in futures)
+
+    # Condition objects to their restricted positions, in order.
+    for (obj, base, offset, _, _), (newBase, percentage_pruned) in zip(tasks, results):
+        if newBase is None:
             continue
+        newBase.orientation = base.orientation
 
         # Check newBase properties
         if isinstance(newBase, EmptyRegion):
             raise InvalidScenarioError(f"Object {obj} does not fit in container")
 
-        percentage_pruned = percentagePruned(base, newBase)
-
-        if percentage_pruned is None:
-            if verbosity >= 1:
-                print(
-                    f"    Region containment constraint pruning attempted but could not compute percentage for {base} and {newBase}."
-                )
-        else:
-            if percentage_pruned <= 0.001:
-                # We didn't really prune anything, don't bother setting new position
-                continue
+        if percentage_pruned is not None and percentage_pruned <= 0.001:
+            # We didn't really prune anything, don't bother setting new position
+            continue
 
-            if verbosity >= 1:
-                print(
-                    f"    Region containment constraint pruned {percentage_pruned:.1f}% of space."
-                )
+        if stats is not None:
+            stats.record("containment", obj, percentage_pruned)
 
         # Condition object to pruned position
         newPos = regions.Region.uniformPointIn(newBase)
@@ -305,8 +367,57 @@ def pruneContainment(scenario, verbosity):
         obj.position.conditionTo(newPos)
 
 
+def _restrictToContainer(base, container, maxErosion):
+    """Intersect a base region with a container, eroded by up to maxErosion.
+
+    Returns the new base region (or `None` if the base cannot be usefully
+    restricted) together with the percentage of the space pruned.
+    """
+    # Erode the container if possible and productive
+    if maxErosion > 0:
+        if hasattr(container, "buffer"):
+            # We can do an exact erosion
+            container = container.buffer(-maxErosion)
+        elif isinstance(container, MeshVolumeRegion):
+            current_pitch = PRUNING_PITCH
+            eroded_container = None
+
+            while eroded_container is None:
+                # We can attempt to erode a voxel approximation of the MeshVolumeRegion.
+                eroded_container = container._erodeOverapproximate(
+                    maxErosion, PRUNING_PITCH
+                )
+
+                if isinstance(eroded_container, VoxelRegion):
+                    eroded_container = eroded_container.mesh
+
+                current_pitch = min(2 * current_pitch, 1)
+
+            # Now check if this erosion is valid and useful, i.e. do we have less volume
+            # to sample from. If so, replace the original container.
+            if eroded_container is not None and eroded_container.size < container.size:
+                container = eroded_container
+
+    # Restrict the base region to the possibly eroded container, unless
+    # they're the same in which case we're done
+    if base is container:
+        return None, None
+
+    newBase = base.intersect(container)
+
+    # Check if base was a volume and newBase is a surface,
+    # in which case the mesh operation might be undefined and we abort.
+    if isinstance(base, MeshVolumeRegion) and isinstance(newBase, MeshSurfaceRegion):
+        return None, None
+
+    if isinstance(newBase, EmptyRegion):
+        return newBase, None
+
+    return newBase, percentagePruned(base, newBase)
+
+
 ## Pruning based on orientation
-def pruneRelativeHeading(scenario, verbosity):
+def pruneRelativeHeading(scenario, verbosity, stats=None):
     """Prune based on requirements bounding the relative heading of an Object.
 
     Specifically, if an object O is:
@@ -374,11 +485,6 @@ def pruneRelativeHeading(scenario, verbosity):
                     pruned = newBasePoly & feasible
                 except shapely.geos.TopologicalError:  # TODO how can we prevent these??
                     pruned = newBasePoly & feasible.buffer(0.1, cap_style=2)
-                if verbosity >= 1:
-                    percent = 100 * (1.0 - (pruned.area / newBasePoly.area))
-                    print(
-                        f"    Relative heading constraint pruned {percent:.1f}% of space."
-                    )
                 newBasePoly = pruned
 
         if newBasePoly is not basePoly:
@@ -388,9 +494,13 @@ def pruneRelativeHeading(scenario, verbosity):
             newPos = regions.Region.uniformPointIn(newBase)
             obj.position.conditionTo(newPos)
 
+            if stats is not None:
+                percent = 100 * (1.0 - (newBasePoly.area / basePoly.area))
+                stats.record("relativeHeading", obj, percent)
+
 
 # Pruning based on visibility
-def pruneVisibility(scenario, verbosity):
+def pruneVisibility(scenario, verbosity, stats=None):
     ego = scenario.egoObject
 
     for obj in scenario.objects:
@@ -451,10 +561,6 @@ def pruneVisibility(scenario, verbosity):
         if obj.requireVisible and obj is not ego:
             # We can restrict the base region to the buffered visible region
             # of the ego.
-            if verbosity >= 1:
-                print(
-                    f"    Pruning restricted base region of {obj} to visible region of ego."
-                )
             candidateBase = currBase.intersect(bufferHelper(ego.visibleRegion))
             candidateDist = regions.Region.uniformPointIn(candidateBase)
 
@@ -475,10 +581,6 @@ def pruneVisibility(scenario, verbosity):
         if obj._observingEntity:
             # We can restrict the base region to the buffered visible region
             # of the observing entity.
-            if verbosity >= 1:
-                print(
-                    f"    Pruning restricted base region of {obj} to visible region of {obj._observingEntity}."
-                )
             candidateBase = currBase.intersect(
                 bufferHelper(obj._observingEntity.visibleRegion)
             )
@@ -500,18 +602,12 @@ def pruneVisibility(scenario, verbosity):
 
         percentage_pruned = percentagePruned(base, currBase)
 
-        if percentage_pruned is None:
-            if verbosity >= 1:
-                print(
-                    f"    Visibility pruning attempted but could not compute percentage for {base} and {currBase}."
-                )
-        else:
-            if percentage_pruned <= 0.001:
-                # We didn't really prune anything, skip conditioning
-                continue
+        if percentage_pruned is not None and percentage_pruned <= 0.001:
+            # We didn't really prune anything, skip conditioning
+            continue
 
-            if verbosity >= 1:
-                print(f"    Visibility pruning pruned {percentage_pruned:.1f}% of space.")
+        if stats is not None:
+            stats.record("visibility", obj, percentage_pruned)
 
         # Condition position value to pruned position
         obj.position.conditionTo(currPos)
@@ -577,9 +673,13 @@ def feasibleRHPolygon(
         return None
     polygons = []
     expanded = [(poly.buffer(maxDist), heading) for poly, heading in tField.cells]
+    # Index the expanded cells so we only consider nearby pairs of cells, since fields
+    # like the roadDirection of a large road network can have many thousands of cells.
+    expandedTree = shapely.STRtree([cell for cell, heading in expanded])
     for baseCell, baseHeading in field.cells:
         # TODO skip cells not contained in base region?
-        for expandedTargetCell, targetHeading in expanded:
+        for index in sorted(expandedTree.query(baseCell)):
+            expandedTargetCell, targetHeading = expanded[index]
             lower, upper = relativeHeadingRange(
                 baseHeading, offsetL, offsetR, targetHeading, tOffsetL, tOffsetR
             )
@@ -587,7 +687,8 @@ def feasibleRHPolygon(
                 intersection = baseCell & expandedTargetCell
                 if not intersection.is_empty:
                     assert isinstance(
-                        intersection, shapely.geometry.Polygon
+                        intersection,
+                        (shapely.geometry.Polygon, shapely.geometry.MultiPolygon),
                     ), intersection
                     polygons.append(intersection)
     return polygonUnion(polygons)
@@ -0,0 +1,408 @@
+"""Columnar storage for simulation trajectories and time-series records.
+
+Recording the state of a simulation at every time step as Python objects (tuples of
+`Vector` objects, ``(time, value)`` pairs, etc.) creates a large number of small
+objects for long simulations with many objects. The classes in this module instead
+store numeric data in preallocated NumPy arrays which grow geometrically, while still
+presenting the same read-only sequence interface as the lists they replace.
+
+Storage which grows beyond `spillThreshold` bytes is moved into a memory-mapped file
+in `spillDirectory`, so that very long simulations need not keep their entire
+history in RAM.
+"""
+
+import collections.abc
+import os
+import tempfile
+import weakref
+
+import numpy
+
+from scenic.core.vectors import Vector
+
+## Global parameters
+
+#: Size in bytes beyond which an array is moved to a memory-mapped file, or `None`
+#: to always keep arrays in memory.
+spillThreshold = None
+
+#: Directory in which to create memory-mapped files (by default, the system's
+#: temporary directory).
+spillDirectory = None
+
+## Growable arrays
+
+
+class GrowableArray:
+    """An array of fixed-shape rows which can be appended to efficiently.
+
+    Capacity is doubled whenever the array fills up, so that appending is amortized
+    constant time. The array may be moved to a memory-mapped file (see `spill`).
+
+    Args:
+        rowShape (tuple): Shape of each row.
+        dtype: NumPy dtype of the array.
+        capacity (int): Number of rows to preallocate.
+    """
+
+    def __init__(self, rowShape=(), dtype=float, capacity=16):
+        self._array = numpy.empty((capacity,) + tuple(rowShape), dtype=dtype)
+        self._length = 0
+        self._path = None
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def array(self):
+        """A view of the filled part of the array."""
+        return self._array[: self._length]
+
+    @property
+    def spilled(self):
+        """Whether the array is stored in a memory-mapped file."""
+        return self._path is not None
+
+    @property
+    def nbytes(self):
+        return self._array.nbytes
+
+    def append(self, row):
+        """Append a row, raising `ValueError`/`TypeError` if it does not fit the dtype.
+
+        If the row cannot be converted, the array is left unchanged.
+        """
+        if self._length == len(self._array):
+            self._resize(max(2 * len(self._array), 16))
+        self._array[self._length] = row
+        self._length += 1
+
+    def widen(self, width, fill):
+        """Enlarge the second axis of the array to the given size."""
+        oldWidth = self._array.shape[1]
+        if width <= oldWidth:
+            return
+        newWidth = max(width, 2 * oldWidth)
+        shape = (len(self._array), newWidth) + self._array.shape[2:]
+        new = self._allocate(shape)
+        new[: self._length, :oldWidth] = self._array[: self._length]
+        new[: self._length, oldWidth:] = fill
+        self._replace(new, copy=False)
+
+    def spill(self, directory=None):
+        """Move the array into a memory-mapped file in the given directory.
+
+        The file is deleted when this object is garbage collected.
+        """
+        if self.spilled:
+            return
+        self._replace(self._allocate(self._array.shape, spill=True, directory=directory))
+
+    def _resize(self, capacity):
+        shape = (capacity,) + self._array.shape[1:]
+        self._replace(self._allocate(shape))
+
+    def _allocate(self, shape, spill=None, directory=None):
+        if spill is None:
+            itemBytes = self._array.itemsize * int(numpy.prod(shape))
+            spill = self.spilled or (
+                spillThreshold is not None and itemBytes > spillThreshold
+            )
+        if not spill:
+            return numpy.empty(shape, dtype=self._array.dtype)
+        if directory is None:
+            directory = spillDirectory
+        fd, path = tempfile.mkstemp(suffix=".npy", prefix="scenic-", dir=directory)
+        os.close(fd)
+        new = numpy.lib.format.open_memmap(
+            path, mode="w+", dtype=self._array.dtype, shape=shape
+        )
+        weakref.finalize(new, _removeFile, path)
+        new._scenicPath = path
+        return new
+
+    def _replace(self, new, copy=True):
+        if copy:
+            new[: self._length] = self._array[: self._length]
+        self._array = new
+        self._path = getattr(new, "_scenicPath", None)
+
+    def __getstate__(self):
+        # Memory-mapped files are not portable across processes, so pickle the
+        # filled part of the array directly.
+        return {"_array": numpy.array(self.array), "_length": self._length, "_path": None}
+
+
+def _removeFile(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+## Sequence views
+
+
+class _ColumnarSequence(collections.abc.Sequence):
+    """Common code for list-compatible views of columnar data.
+
+    Subclasses store items in `GrowableArray` objects when possible, falling back to
+    an ordinary list of items when some item cannot be represented columnarly.
+
+    These sequences compare equal to lists and tuples with the same items. Once
+    `frozen <freeze>`, they can no longer be appended to and become hashable, with
+    the same hash as the corresponding tuple.
+
+    Since items are stored as arrays, indexing builds a new item (e.g. new `Vector`
+    objects) on every access. Iterating converts the arrays in bulk, and is therefore
+    much faster than indexing each item in turn; code processing long sequences should
+    use iteration or the underlying NumPy arrays.
+    """
+
+    def __init__(self, items=()):
+        self._fallback = None
+        self._frozen = False
+        for item in items:
+            self.append(item)
+
+    @property
+    def columnar(self):
+        """Whether the items are stored in NumPy arrays."""
+        return self._fallback is None
+
+    def __len__(self):
+        if self._fallback is not None:
+            return len(self._fallback)
+        return self._columnarLength()
+
+    def __getitem__(self, index):
+        if self._fallback is not None:
+            return self._fallback[index]
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self._item(index)
+
+    def __iter__(self):
+        if self._fallback is not None:
+            return iter(self._fallback)
+        return self._iterColumnar()
+
+    @property
+    def frozen(self):
+        """Whether the sequence is frozen, i.e. read-only and hashable."""
+        return self._frozen
+
+    def freeze(self):
+        """Make the sequence read-only, so that it can be hashed."""
+        self._frozen = True
+
+    def append(self, item):
+        if self._frozen:
+            raise TypeError(f"cannot append to a frozen {type(self).__name__}")
+        if self._fallback is None and not self._appendColumnar(item):
+            self._fallback = list(self)
+            self._clearColumnar()
+        if self._fallback is not None:
+            self._fallback.append(item)
+
+    def spill(self, directory=None):
+        """Move the underlying arrays into memory-mapped files."""
+        for array in self._arrays():
+            array.spill(directory)
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __hash__(self):
+        if not self._frozen:
+            raise TypeError(f"unhashable type: unfrozen {type(self).__name__}")
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def _maybeSpill(self):
+        if spillThreshold is None:
+            return
+        if sum(array.nbytes for array in self._arrays()) > spillThreshold:
+            self.spill()
+
+
+class TimeSeries(_ColumnarSequence):
+    """A list-compatible sequence of ``(time, value)`` pairs.
+
+    Values which are `int`, `float`, `bool`, or `Vector` (with all values in a
+    series having the same type) are stored in NumPy arrays; the times and values
+    are then available as arrays via the `times` and `values` properties.
+    """
+
+    _kinds = {
+        bool: ((), numpy.bool_, bool),
+        int: ((), numpy.int64, int),
+        float: ((), numpy.float64, float),
+        Vector: ((3,), numpy.float64, lambda row: Vector(*row.tolist())),
+    }
+
+    def __init__(self, items=()):
+        self._times = self._values = None
+        self._kind = None
+        super().__init__(items)
+
+    @property
+    def times(self):
+        """The times of the series, as a NumPy array."""
+        if self._fallback is not None:
+            return numpy.array([time for time, _ in self._fallback])
+        if self._times is None:
+            return numpy.empty(0, dtype=numpy.int64)
+        return self._times.array
+
+    @property
+    def values(self):
+        """The values of the series, as a NumPy array if possible.
+
+        If the values cannot be stored columnarly, this is a list.
+        """
+        if self._fallback is not None:
+            return [value for _, value in self._fallback]
+        if self._values is None:
+            return numpy.empty(0)
+        return self._values.array
+
+    def _columnarLength(self):
+        return 0 if self._times is None else len(self._times)
+
+    def _item(self, index):
+        time = self._times.array[index].item()
+        value = self._values.array[index]
+        return (time, self._kinds[self._kind][2](value))
+
+    def _iterColumnar(self):
+        if self._times is None:
+            return iter(())
+        convert = self._kinds[self._kind][2]
+        values = self._values.array
+        if self._kind is not Vector:
+            return zip(self._times.array.tolist(), map(convert, values.tolist()))
+        return zip(self._times.array.tolist(), (Vector(*row) for row in values.tolist()))
+
+    def _appendColumnar(self, item):
+        time, value = item
+        kind = type(value)
+        if type(time) is not int or kind not in self._kinds:
+            return False
+        if self._kind is None:
+            shape, dtype, _ = self._kinds[kind]
+            self._times = GrowableArray((), numpy.int64)
+            self._values = GrowableArray(shape, dtype)
+            self._kind = kind
+        elif kind is not self._kind:
+            return False
+        try:
+            self._values.append(value.coordinates if kind is Vector else value)
+        except (OverflowError, TypeError, ValueError):
+            return False
+        self._times.append(time)
+        self._maybeSpill()
+        return True
+
+    def _clearColumnar(self):
+        self._times = self._values = None
+
+    def _arrays(self):
+        return () if self._times is None else (self._times, self._values)
+
+
+class Trajectory(_ColumnarSequence):
+    """A list-compatible sequence of simulation states.
+
+    States which are tuples of `Vector` objects (as produced by the default
+    implementation of `Simulation.currentState`) are stored in a single NumPy array
+    of shape ``(steps, objects, 3)``, available via the `positions` property. States
+    may contain different numbers of objects, as when objects are created during a
+    simulation; missing entries are filled with NaN. Other kinds of states are
+    stored as an ordinary list.
+    """
+
+    def __init__(self, items=()):
+        self._positions = self._counts = None
+        self._width = 0
+        super().__init__(items)
+
+    @property
+    def positions(self):
+        """The positions of all objects at each step, as a NumPy array.
+
+        Raises:
+            TypeError: if the states are not tuples of vectors.
+        """
+        if self._fallback is not None:
+            raise TypeError("trajectory does not consist of object positions")
+        if self._positions is None:
+            return numpy.empty((0, 0, 3))
+        return self._positions.array[:, : self._width]
+
+    @property
+    def counts(self):
+        """The number of objects at each step, as a NumPy array."""
+        if self._fallback is not None:
+            return numpy.array([len(state) for state in self._fallback])
+        if self._counts is None:
+            return numpy.empty(0, dtype=numpy.int64)
+        return self._counts.array
+
+    def _columnarLength(self):
+        return 0 if self._counts is None else len(self._counts)
+
+    def _item(self, index):
+        count = self._counts.array[index]
+        rows = self._positions.array[index, :count].tolist()
+        return tuple(Vector(*row) for row in rows)
+
+    def _iterColumnar(self):
+        if self._counts is None:
+            return iter(())
+        counts = self._counts.array.tolist()
+        rows = self._positions.array[:, : self._width].tolist()
+        return (
+            tuple(Vector(*row) for row in state[:count])
+            for state, count in zip(rows, counts)
+        )
+
+    def _appendColumnar(self, state):
+        if type(state) is not tuple or not all(type(v) is Vector for v in state):
+            return False
+        try:
+            rows = numpy.array([v.coordinates for v in state], dtype=numpy.float64)
+        except (TypeError, ValueError):
+            return False
+        count = len(state)
+        if self._positions is None:
+            self._positions = GrowableArray((max(count, 1), 3), numpy.float64)
+            self._counts = GrowableArray((), numpy.int64)
+        positions = self._positions
+        positions.widen(count, numpy.nan)
+        width = positions._array.shape[1]
+        if count < width:
+            rows = numpy.concatenate(
+                (rows.reshape(count, 3), numpy.full((width - count, 3), numpy.nan))
+            )
+        positions.append(rows)
+        self._counts.append(count)
+        self._width = max(self._width, count)
+        self._maybeSpill()
+        return True
+
+    def _clearColumnar(self):
+        self._positions = self._counts = None
+        self._width = 0
+
+    def _arrays(self):
+        return () if self._counts is None else (self._positions, self._counts)
@@ -8,10 +8,14 @@ Manipulations of meshes is done using the
 """
 
 from abc import ABC, abstractmethod
+import hashlib
 import itertools
 import math
+import os
 import random
+import tempfile
 import warnings
+import zipfile
 
 import fcl
 import numpy
@@ -58,6 +62,9 @@ from scenic.core.geometry import (
 from scenic.core.lazy_eval import isLazy, valueInContext
 from scenic.core.type_support import toOrientation, toScalar, toVector
 from scenic.core.utils import (
+    MeshProximityIndex,
+    MeshSurfaceSampler,
+    MeshVolumeSampler,
     cached,
     cached_method,
     cached_property,
@@ -72,6 +79,11 @@ from scenic.core.vectors import (
     VectorField,
 )
 
+#: Directory in which to cache the voxelized regions computed during pruning, so
+#: that they can be reused across runs and processes; or `None` to disable the
+#: cache. Defaults to the value of the ``SCENIC_VOXEL_CACHE`` environment variable.
+voxelCacheDirectory = os.environ.get("SCENIC_VOXEL_CACHE")
+
 ###################################################################################################
 # Abstract Classes and Utilities
 ###################################################################################################
@@ -1006,6 +1018,10 @@ class MeshRegion(Region):
     def isConvex(self):
         return self.mesh.is_convex
 
+    @cached_property
+    def _proximityIndex(self):
+        return MeshProximityIndex(self.mesh)
+
     @property
     def AABB(self):
         return (
@@ -1094,6 +1110,8 @@ class MeshRegion(Region):
         state = self.__dict__.copy()
         # Make copy of mesh to clear non-picklable cache
         state["_mesh"] = self._mesh.copy()
+        state.pop("_cached__surfaceSampler", None)  # cheap to recompute
+        state.pop("_cached__proximityIndex", None)  # contains FCL objects
         return state
 
 
@@ -1304,10 +1322,30 @@ class MeshVolumeRegion(MeshRegion):
     @distributionFunction
     def containsPoint(self, point):
         """Check if this region's volume contains a point."""
-        return self.distanceTo(point) <= self.tolerance
+        point = toVector(point, f"Could not convert {point} to vector.")
+        return bool(self.containsPoints([point.coordinates])[0])
+
+    def containsPoints(self, points):
+        """Check which of the given points are contained in this region's volume.
+
+        Args:
+            points: An array of shape ``(N, 3)``.
+
+        Returns:
+            A boolean array of length ``N``.
+        """
+        index = self._proximityIndex
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        contained = index.containsPoints(points)
+        # Points outside the mesh but within the tolerance also count.
+        outside = numpy.flatnonzero(~contained)
+        if len(outside) > 0:
+            distances = index.distancesTo(points[outside])
+            contained[outside] = distances <= self.tolerance
+        return contained
 
     def _containsPointExact(self, point):
-        return self.mesh.contains([point])[0]
+        return self._proximityIndex.containsPoints([point])[0]
 
     @distributionFunction
     def containsObject(self, obj):
@@ -1329,13 +1367,13 @@ class MeshVolumeRegion(MeshRegion):
         # If this region is convex, first check if we contain all corners of the object's bounding box.
         # If so, return True. Otherwise, check if all points are contained and return that value.
         if self.isConvex:
-            pq = trimesh.proximity.ProximityQuery(self.mesh)
-            bb_distances = pq.signed_distance(obj.boundingBox.mesh.vertices)
+            pq = self._proximityIndex
+            bb_distances = pq.signedDistances(obj.boundingBox.mesh.vertices)
 
             if numpy.all(bb_distances > 0):
                 return True
 
-            vertex_distances = pq.signed_distance(obj.occupiedSpace.mesh.vertices)
+            vertex_distances = pq.signedDistances(obj.occupiedSpace.mesh.vertices)
 
             return numpy.all(vertex_distances > 0)
 
@@ -1375,8 +1413,8 @@ class MeshVolumeRegion(MeshRegion):
             )
 
             # Compute the minimum distance from the region to this point.
-            pq = trimesh.proximity.ProximityQuery(self.mesh)
-            region_distance = abs(pq.signed_distance([obj_candidate_point])[0])
+            pq = self._proximityIndex
+            region_distance = pq.distancesTo([obj_candidate_point])[0]
 
             if region_distance > obj_circumradius:
                 return True
@@ -1726,37 +1764,56 @@ class MeshVolumeRegion(MeshRegion):
         return super().difference(other)
 
     def uniformPointInner(self):
-        # TODO: Look into tetrahedralization, perhaps to be turned on when a heuristic
-        # is met. Currently using Trimesh's rejection sampling.
-        sample = trimesh.sample.volume_mesh(self.mesh, self.num_samples)
+        return Vector(*self.uniformPoints(1)[0])
+
+    def uniformPoints(self, count):
+        """Sample points uniformly from this region.
+
+        Uses a cached tetrahedral decomposition of the mesh (see `MeshVolumeSampler`).
+
+        Returns:
+            An array of shape ``(count, 3)``.
 
-        if len(sample) == 0:
+        Raises:
+            RejectionException: if the mesh is not star-shaped and too many candidate
+                points were rejected.
+        """
+        points = self._volumeSampler.sample(count)
+        if len(points) < count:
             raise RejectionException("Rejection sampling MeshVolumeRegion failed.")
-        else:
-            return Vector(*sample[0])
+        return points
+
+    @cached_property
+    def _volumeSampler(self):
+        return MeshVolumeSampler(self.mesh)
 
     @distributionFunction
     def distanceTo(self, point):
         """Get the minimum distance from this region to the specified point."""
         point = toVector(point, f"Could not convert {point} to vector.")
+        return float(self.distancesTo([point.coordinates])[0])
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-
-        dist = pq.signed_distance([point.coordinates])[0]
+    def distancesTo(self, points):
+        """Get the minimum distances from this region to the given points.
 
-        # Positive distance indicates being contained in the mesh.
-        if dist > 0:
-            dist = 0
+        Args:
+            points: An array of shape ``(N, 3)``.
 
-        return abs(dist)
+        Returns:
+            An array of length ``N``, which is zero for points inside the region.
+        """
+        index = self._proximityIndex
+        distances = index.distancesTo(points)
+        distances[index.containsPoints(points)] = 0
+        return distances
 
     @cached_property
     @distributionFunction
     def inradius(self):
         center_point = self.mesh.bounding_box.center_mass
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-        region_distance = pq.signed_distance([center_point])[0]
+        pq = self._proximityIndex
+        region_distance = pq.signedDistances([center_point])[0]
 
         if region_distance < 0:
             return 0
@@ -1793,7 +1850,6 @@ class MeshVolumeRegion(MeshRegion):
         # with connectivity 3 is. To simplify, we just erode one fewer time than
         # needed.
         target_pitch = pitch * max(self.mesh.extents)
-        voxelized_mesh = self.voxelized(target_pitch, lazy=True)
 
         # Erode the voxel region. Erosion is done with a rank 3 structuring unit with
         # connectivity 3 (a 3x3x3 cube of voxels). Each erosion pass can erode by at
@@ -1802,7 +1858,7 @@ class MeshVolumeRegion(MeshRegion):
         # than maxErosion. We also subtract 1 iteration for the reasons above.
         iterations = math.floor(maxErosion / math.hypot(*([target_pitch] * 3))) - 1
 
-        eroded_mesh = voxelized_mesh.dilation(iterations=-iterations)
+        eroded_mesh = self._voxelMorphology(target_pitch, -iterations)
 
         return eroded_mesh
 
@@ -1827,7 +1883,6 @@ class MeshVolumeRegion(MeshRegion):
             # with connectivity 3 is. To simplify, we just dilate one additional time
             # than needed.
             target_pitch = pitch * max(self.mesh.extents)
-            voxelized_mesh = self.voxelized(target_pitch, lazy=True)
 
             # Dilate the voxel region. Dilation is done with a rank 3 structuring unit with
             # connectivity 3 (a 3x3x3 cube of voxels). Each dilation pass must dilate by at
@@ -1835,10 +1890,61 @@ class MeshVolumeRegion(MeshRegion):
             # guarantee dilating at least minBuffer. We also add 1 iteration for the reasons above.
             iterations = math.ceil(minBuffer / pitch) + 1
 
-            dilated_mesh = voxelized_mesh.dilation(iterations=iterations)
+            dilated_mesh = self._voxelMorphology(target_pitch, iterations)
 
             return dilated_mesh
 
+    def _voxelMorphology(self, pitch, iterations):
+        """Voxelize this mesh and then dilate it (or erode it, if iterations < 0).
+
+        If `voxelCacheDirectory` is set, results are cached there in files named by
+        a hash of the mesh and parameters, so that they can be shared between runs.
+        """
+        directory = voxelCacheDirectory
+        if directory is None:
+            return self.voxelized(pitch, lazy=True).dilation(iterations=iterations)
+
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(b"scenic-voxels-v1")
+        hasher.update(numpy.ascontiguousarray(self.mesh.vertices, dtype="<f8"))
+        hasher.update(numpy.ascontiguousarray(self.mesh.faces, dtype="<i8"))
+        hasher.update(numpy.array([pitch, iterations], dtype="<f8"))
+        path = os.path.join(directory, hasher.hexdigest() + ".npz")
+
+        try:
+            with numpy.load(path) as data:
+                matrix, transform = data["matrix"], data["transform"]
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            pass
+        else:
+            if not matrix.any():
+                return nowhere
+            encoding = trimesh.voxel.encoding.DenseEncoding(matrix)
+            grid = trimesh.voxel.VoxelGrid(encoding, transform=transform)
+            return VoxelRegion(voxelGrid=grid, lazy=True)
+
+        result = self.voxelized(pitch, lazy=True).dilation(iterations=iterations)
+        if isinstance(result, VoxelRegion):
+            matrix = result.voxelGrid.matrix
+            transform = result.voxelGrid.transform
+        else:
+            matrix, transform = numpy.zeros((0, 0, 0), dtype=bool), numpy.eye(4)
+
+        # Write to a temporary file first so other processes never see partial data.
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmpPath = tempfile.mkstemp(suffix=".npz", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    numpy.savez_compressed(f, matrix=matrix, transform=transform)
+                os.replace(tmpPath, path)
+            except BaseException:
+                os.remove(tmpPath)
+                raise
+        except OSError as e:
+            warnings.warn(f"unable to write voxel cache file {path}: {e}")
+        return result
+
     @cached_method
     def getSurfaceRegion(self):
         """Return a region equivalent to this one, except as a MeshSurfaceRegion"""
@@ -1906,8 +2012,7 @@ class MeshVolumeRegion(MeshRegion):
 
         # Compute inradius and circumradius w.r.t. the point
         point = self._interiorPoint
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-        inradius = abs(pq.signed_distance([point])[0])
+        inradius = self._proximityIndex.distancesTo([point])[0]
         circumradius = numpy.max(numpy.linalg.norm(self.mesh.vertices - point, axis=1))
         return inradius, circumradius
 
@@ -1943,6 +2048,8 @@ class MeshVolumeRegion(MeshRegion):
     def __getstate__(self):
         state = self.__dict__.copy()
         state.pop("_cached__fclData", None)  # remove non-picklable FCL objects
+        state.pop("_cached__volumeSampler", None)  # cheap to recompute
+        state.pop("_cached__proximityIndex", None)
         return state
 
 
@@ -2064,18 +2171,48 @@ class MeshSurfaceRegion(MeshRegion):
         raise NotImplementedError
 
     def uniformPointInner(self):
-        return Vector(*trimesh.sample.sample_surface(self.mesh, 1)[0][0])
+        point = self._surfaceSampler.next(Samplable._samplingEpoch)
+        return Vector(*point)
+
+    def uniformPoints(self, count):
+        """Sample points uniformly from this region.
+
+        Returns:
+            An array of shape ``(count, 3)``.
+        """
+        return self._surfaceSampler.sample(count)
+
+    @cached_property
+    def _surfaceSampler(self):
+        return MeshSurfaceSampler(self.mesh)
 
     @distributionFunction
     def distanceTo(self, point):
         """Get the minimum distance from this object to the specified point."""
         point = toVector(point, f"Could not convert {point} to vector.")
+        return float(self.distancesTo([point.coordinates])[0])
+
+    def containsPoints(self, points):
+        """Check which of the given points lie on this region's surface.
+
+        Args:
+            points: An array of shape ``(N, 3)``.
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
+        Returns:
+            A boolean array of length ``N``.
+        """
+        return self.distancesTo(points) < self.tolerance
 
-        dist = abs(pq.signed_distance([point.coordinates])[0])
+    def distancesTo(self, points):
+        """Get the minimum distances from this region to the given points.
 
-        return dist
+        Args:
+            points: An array of shape ``(N, 3)``.
+
+        Returns:
+            An array of length ``N``.
+        """
+        return self._proximityIndex.distancesTo(points)
 
     @property
     def dimensionality(self):
@@ -2097,8 +2234,7 @@ class MeshSurfaceRegion(MeshRegion):
         If ``pos`` is not within ``self.tolerance`` of the surface of the mesh, a
         ``RejectionException`` is raised.
         """
-        prox_query = trimesh.proximity.ProximityQuery(self.mesh)
-        _, distance, triangle_id = prox_query.on_surface([pos.coordinates])
+        _, distance, triangle_id = self._proximityIndex.closestPoints([pos.coordinates])
         if distance > self.tolerance:
             raise RejectionException(
                 "Attempted to get flat orientation of a mesh away from a surface."
@@ -2255,27 +2391,176 @@ class VoxelRegion(Region):
     def kdTree(self):
         return scipy.spatial.KDTree(self.voxel_points)
 
+    @cached_property
+    def _matrix(self):
+        return numpy.asarray(self.voxelGrid.matrix, dtype=bool)
+
+    @cached_property
+    def _inverseTransform(self):
+        return numpy.linalg.inv(self.voxelGrid.transform)
+
+    @cached_property
+    def _distanceTransform(self):
+        # For each empty voxel, the index of the nearest filled voxel.
+        return scipy.ndimage.distance_transform_edt(
+            ~self._matrix,
+            sampling=self.scale,
+            return_distances=False,
+            return_indices=True,
+        )
+
+    @cached_property
+    def _clearance(self):
+        # For each filled voxel, the distance from its center to the center of the
+        # nearest empty voxel (treating everything outside the grid as empty).
+        padded = numpy.pad(self._matrix, 1)
+        distances = scipy.ndimage.distance_transform_edt(padded, sampling=self.scale)
+        return distances[1:-1, 1:-1, 1:-1]
+
+    def _toIndexSpace(self, points):
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        inverse = self._inverseTransform
+        return points @ inverse[:3, :3].T + inverse[:3, 3]
+
     def containsPoint(self, point):
         point = toVector(point)
+        return bool(self.containsPoints([point.coordinates])[0])
 
-        # Find closest voxel point
-        _, index = self.kdTree.query(point)
-        closest_point = self.voxel_points[index]
+    def containsPoints(self, points):
+        """Check which of the given points are contained in this region.
 
-        # Check voxel containment
-        voxel_low = closest_point - self.scale / 2
-        voxel_high = closest_point + self.scale / 2
+        Points are located in the voxel grid by direct index arithmetic, so this
+        takes constant time per point.
 
-        return numpy.all(voxel_low <= point) & numpy.all(point <= voxel_high)
+        Args:
+            points: An array of shape ``(N, 3)``.
+
+        Returns:
+            A boolean array of length ``N``.
+        """
+        coords = self._toIndexSpace(points)
+        matrix = self._matrix
+        shape = numpy.array(matrix.shape)
+        # A point on the boundary between two voxels lies in both of them.
+        low = numpy.ceil(coords - 0.5 - 1e-9).astype(int)
+        high = numpy.floor(coords + 0.5 + 1e-9).astype(int)
+        contained = numpy.zeros(len(coords), dtype=bool)
+        for corner in itertools.product((low, high), repeat=3):
+            indices = numpy.stack([c[:, i] for i, c in enumerate(corner)], axis=1)
+            valid = numpy.all((indices >= 0) & (indices < shape), axis=1)
+            hits = numpy.zeros(len(coords), dtype=bool)
+            hits[valid] = matrix[tuple(indices[valid].T)]
+            contained |= hits
+        return contained
 
     def containsObject(self, obj):
-        raise NotImplementedError
+        space = obj.occupiedSpace
+        low, high = numpy.array(space.AABB[0]), numpy.array(space.AABB[1])
+        corners = numpy.array(list(itertools.product(*zip(low, high))))
+        coords = self._toIndexSpace(corners)
+        matrix = self._matrix
+        shape = numpy.array(matrix.shape)
+        lowIndex = numpy.floor(coords.min(axis=0) + 0.5 + 1e-9).astype(int)
+        highIndex = numpy.ceil(coords.max(axis=0) - 0.5 - 1e-9).astype(int)
+
+        # Everything outside the grid is outside the region.
+        if numpy.any(lowIndex < 0) or numpy.any(highIndex >= shape):
+            return False
+
+        # Fast path: the object's bounding sphere is clear of all empty voxels.
+        center = numpy.array(obj.position)
+        centerIndex = numpy.round(self._toIndexSpace([center])[0]).astype(int)
+        if numpy.all(centerIndex >= 0) and numpy.all(centerIndex < shape):
+            if matrix[tuple(centerIndex)]:
+                clearance = self._clearance[tuple(centerIndex)]
+                clearance -= numpy.linalg.norm(self.scale)
+                radius = numpy.max(
+                    numpy.linalg.norm(space.mesh.vertices - center, axis=1)
+                )
+                if clearance >= radius:
+                    return True
+
+        # Otherwise, check the object against the empty voxels it might overlap.
+        window = tuple(slice(l, h + 1) for l, h in zip(lowIndex, highIndex))
+        empty = numpy.argwhere(~matrix[window]) + lowIndex
+        if len(empty) == 0:
+            return True
+        centers = self.voxelGrid.indices_to_points(empty)
+        if numpy.any(space.containsPoints(centers)):
+            return False
+        # Shrink the empty voxels slightly so that touching faces don't count.
+        size = self.scale * (1 - 1e-6)
+        boxes = trimesh.util.concatenate(
+            [
+                trimesh.creation.box(size, transform=translation_matrix(center))
+                for center in centers
+            ]
+        )
+        boxModel = fcl.BVHModel()
+        boxModel.beginModel(num_tri_=len(boxes.faces), num_vertices_=len(boxes.vertices))
+        boxModel.addSubModel(verts=boxes.vertices, triangles=boxes.faces)
+        boxModel.endModel()
+        request = fcl.CollisionRequest()
+        result = fcl.CollisionResult()
+        fcl.collide(
+            fcl.CollisionObject(*space._fclData),
+            fcl.CollisionObject(boxModel),
+            request,
+            result,
+        )
+        return not result.is_collision
 
     def containsRegionInner(self, reg):
         raise NotImplementedError
 
     def distanceTo(self, point):
-        raise NotImplementedError
+        """Get the distance from this region to the specified point.
+
+        For points inside the voxel grid this uses a precomputed distance transform;
+        the result may overestimate the true distance by up to the size of a voxel.
+        """
+        point = toVector(point)
+        return float(self.distancesTo([point.coordinates])[0])
+
+    def distancesTo(self, points):
+        """Get the distances from this region to the given points.
+
+        See `distanceTo` for details.
+
+        Args:
+            points: An array of shape ``(N, 3)``.
+
+        Returns:
+            An array of length ``N``.
+        """
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        contained = self.containsPoints(points)
+        distances = numpy.zeros(len(points))
+        if numpy.all(contained):
+            return distances
+
+        # Find a nearby filled voxel for each point not in the region, using the
+        # distance transform inside the grid and the k-d tree outside it.
+        shape = numpy.array(self._matrix.shape)
+        indices = numpy.round(self._toIndexSpace(points)).astype(int)
+        inGrid = numpy.all((indices >= 0) & (indices < shape), axis=1)
+        nearest = numpy.empty((len(points), 3))
+        grid = ~contained & inGrid
+        if numpy.any(grid):
+            nearestIndices = self._distanceTransform[
+                (slice(None),) + tuple(indices[grid].T)
+            ]
+            nearest[grid] = self.voxelGrid.indices_to_points(nearestIndices.T)
+        outside = ~contained & ~inGrid
+        if numpy.any(outside):
+            _, nearestIndices = self.kdTree.query(points[outside])
+            nearest[outside] = self.voxel_points[nearestIndices]
+
+        # Compute the distance to the box of each nearby voxel.
+        offsets = numpy.abs(points - nearest) - self.scale / 2
+        boxDistances = numpy.linalg.norm(numpy.maximum(offsets, 0), axis=1)
+        distances[~contained] = boxDistances[~contained]
+        return distances
 
     def projectVector(self, point, onDirection):
         raise NotImplementedError
@@ -2528,6 +2813,18 @@ class PolygonalFootprintRegion(Region):
         point = toVector(point)
         return shapely.intersects_xy(self.polygons, point.x, point.y)
 
+    def containsPoints(self, points):
+        """Check which of the given points are contained in the polygonal footprint.
+
+        Args:
+            points: An array of shape ``(N, 2)`` or ``(N, 3)``.
+
+        Returns:
+            A boolean array of length ``N``.
+        """
+        points = numpy.asarray(points, dtype=float)
+        return shapely.intersects_xy(self.polygons, points[:, 0], points[:, 1])
+
     def containsObject(self, obj):
         """Checks if an object is contained in the polygonal footprint.
 
@@ -3101,6 +3398,32 @@ class PolygonalRegion(Region):
         dist2D = shapely.distance(self.polygons, makeShapelyPoint(point))
         return math.hypot(dist2D, point[2] - self.z)
 
+    def containsPoints(self, points):
+        """Check which of the given points are contained in this region.
+
+        Like `containsPoint`, this ignores the z coordinate of the points.
+
+        Args:
+            points: An array of shape ``(N, 2)`` or ``(N, 3)``.
+
+        Returns:
+            A boolean array of length ``N``.
+        """
+        return self.footprint.containsPoints(points)
+
+    def distancesTo(self, points):
+        """Get the minimum distances from this region to the given points.
+
+        Args:
+            points: An array of shape ``(N, 3)``.
+
+        Returns:
+            An array of length ``N``.
+        """
+        points = numpy.asarray(points, dtype=float)
+        dist2D = shapely.distance(self.polygons, shapely.points(points[:, :2]))
+        return numpy.hypot(dist2D, points[:, 2] - self.z)
+
     @cached_property
     @distributionFunction
     def inradius(self):
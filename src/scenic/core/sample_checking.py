@@ -1,7 +1,10 @@
 """The SampleChecker class and it's implementations."""
 
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import Counter, deque
+import heapq
+import json
+import os
 import time
 
 from scenic.core.distributions import RejectionException
@@ -11,10 +14,19 @@ from scenic.core.requirements import BlanketCollisionRequirement, IntersectionRe
 class SampleChecker(ABC):
     def __init__(self):
         self.requirements = None
+        self.stats = None
 
     def setRequirements(self, requirements):
         assert self.requirements is None
         self.requirements = tuple(requirements)
+        self.keys = requirementKeys(self.requirements)
+
+    def setStats(self, stats):
+        """Record each evaluation of a requirement in the given `GenerationStats`.
+
+        Passing `None` stops recording.
+        """
+        self.stats = stats
 
     @abstractmethod
     def checkRequirementsInner(self, sample):
@@ -27,6 +39,19 @@ class SampleChecker(ABC):
         except RejectionException as e:
             return e
 
+    def loadProfile(self, profile):
+        """Seed the checker with statistics learned in previous runs.
+
+        Args:
+            profile (dict): statistics as returned by `profile`, keyed by the
+                identifiers from `requirementKeys`.
+        """
+        pass
+
+    def profile(self):
+        """Return the statistics learned about the requirements, for `loadProfile`."""
+        return {}
+
 
 class BasicChecker(SampleChecker):
     """Basic requirement checker.
@@ -56,17 +81,35 @@ class BasicChecker(SampleChecker):
         super().setRequirements(target_reqs)
 
     def checkRequirementsInner(self, sample):
+        if self.stats is not None:
+            return self.checkRequirementsProfiled(sample)
+
         for req in self.requirements:
             if req.active and req.falsifiedBy(sample):
                 return req.violationMsg
 
         return None
 
+    def checkRequirementsProfiled(self, sample):
+        for req, key in zip(self.requirements, self.keys):
+            if not req.active:
+                continue
+            start = time.perf_counter()
+            rejected = req.falsifiedBy(sample)
+            self.stats.recordRequirement(key, rejected, time.perf_counter() - start)
+            if rejected:
+                return req.violationMsg
+
+        return None
+
 
 class WeightedAcceptanceChecker(SampleChecker):
     """Picks the requirement with the lowest time-weighted acceptance chance.
 
-    Incentivizes exploration by initializing all buffer values to 0.
+    Incentivizes exploration by initializing all buffer values to 0, unless the
+    checker is seeded with statistics from a previous run using `loadProfile`.
+    The requirements are kept in a heap ordered by cost, so that checking a sample
+    only reorders the requirements actually evaluated.
 
     Args:
         bufferSize: Max samples to use when calculating time-weighted
@@ -86,27 +129,60 @@ class WeightedAcceptanceChecker(SampleChecker):
         self.bufferSums = {req: (0, 0) for req in self.requirements}
         for req in self.requirements:
             self.buffers[req].extend([(0, 0)] * self.bufferSize)
+        self._informed = set()  # indices of requirements with evaluations/profile data
+        self._mandatory = tuple(req for req in self.requirements if not req.optional)
+        self._rebuildHeap()
+
+    def _rebuildHeap(self):
+        # Entries are (cost, index, requirement); the index breaks ties in the
+        # original order of the requirements.
+        self._heap = [
+            (self.getRequirementCost(req), index, req)
+            for index, req in enumerate(self.requirements)
+        ]
+        heapq.heapify(self._heap)
 
     def checkRequirementsInner(self, sample):
-        for req in self.sortedRequirements():
-            # Evaluate the requirement with timing info.
-            start = time.perf_counter()
-            rejected = req.falsifiedBy(sample)
-            # Create metrics (Accepted, Time Taken)
-            metrics = (int(not rejected), time.perf_counter() - start)
-
-            self.updateMetrics(req, metrics)
-
-            if rejected:
-                return req.violationMsg
-
-        return None
+        # Requirements are popped off the heap as they are evaluated, then pushed back
+        # with their updated costs once the sample has been accepted or rejected.
+        heap = self._heap
+        popped = []
+        # Optional requirements are useless once all mandatory ones have been checked.
+        remaining = sum(1 for req in self._mandatory if req.active)
+        try:
+            while remaining > 0:
+                entry = heapq.heappop(heap)
+                popped.append(entry)
+                req = entry[2]
+                if not req.active:
+                    continue
+                if not req.optional:
+                    remaining -= 1
+
+                # Evaluate the requirement with timing info.
+                start = time.perf_counter()
+                rejected = req.falsifiedBy(sample)
+                elapsed = time.perf_counter() - start
+                # Create metrics (Accepted, Time Taken)
+                metrics = (int(not rejected), elapsed)
+
+                self.updateMetrics(req, metrics)
+                self._informed.add(entry[1])
+                if self.stats is not None:
+                    self.stats.recordRequirement(self.keys[entry[1]], rejected, elapsed)
+
+                if rejected:
+                    return req.violationMsg
+
+            return None
+        finally:
+            for _, index, req in popped:
+                heapq.heappush(heap, (self.getRequirementCost(req), index, req))
 
     def sortedRequirements(self):
         """Return the list of requirements in sorted order"""
-        # Extract and sort active requirements
-        reqs = [req for req in self.requirements if req.active]
-        reqs.sort(key=self.getRequirementCost)
+        # Extract active requirements in heap order
+        reqs = [req for _, _, req in sorted(self._heap) if req.active]
 
         # Remove any optional requirements at the end of the list, since they're useless
         while reqs and reqs[-1].optional:
@@ -131,6 +207,36 @@ class WeightedAcceptanceChecker(SampleChecker):
         sum_time += new_time - old_time
         self.bufferSums[req] = (sum_acc, sum_time)
 
+    def loadProfile(self, profile):
+        for index, (req, key) in enumerate(zip(self.requirements, self.keys)):
+            stats = profile.get(key)
+            if stats is None:
+                continue
+            acceptance, runtime = stats
+            self.buffers[req] = deque([(acceptance, runtime)] * self.bufferSize)
+            self.bufferSums[req] = (
+                acceptance * self.bufferSize,
+                runtime * self.bufferSize,
+            )
+            self._informed.add(index)
+        self._rebuildHeap()
+
+    def profile(self):
+        """Return the acceptance rate and mean runtime of each requirement.
+
+        Requirements which have never been evaluated (and were not seeded by
+        `loadProfile`) are omitted.
+        """
+        profile = {}
+        for index in sorted(self._informed):
+            req = self.requirements[index]
+            sum_acc, sum_time = self.bufferSums[req]
+            profile[self.keys[index]] = (
+                sum_acc / self.bufferSize,
+                sum_time / self.bufferSize,
+            )
+        return profile
+
     def getRequirementCost(self, req):
         # Expected cost of a requirement is average runtime divided by rejection probability;
         # if estimated rejection probability is zero, break ties using runtime.
@@ -141,3 +247,56 @@ class WeightedAcceptanceChecker(SampleChecker):
             return (runtime / rej_prob, 0)
         else:
             return (float("inf"), runtime)
+
+
+## Requirement profiles
+
+
+def requirementKeys(requirements):
+    """Return identifiers for requirements which are stable across runs.
+
+    User-defined requirements are identified by their line number, and built-in
+    requirements by their type; the index of each requirement among those with the
+    same line number or type distinguishes requirements created in loops, between
+    pairs of objects, etc.
+    """
+    keys = []
+    counts = Counter()
+    for req in requirements:
+        line = getattr(req, "line", None)
+        base = type(req).__name__ if line is None else f"line {line}"
+        keys.append(f"{base} #{counts[base]}")
+        counts[base] += 1
+    return keys
+
+
+def readProfile(path, astHash):
+    """Read the requirement profile for a scenario from a profile file.
+
+    Profile files are JSON objects mapping the (hex) hash of the AST of each scenario
+    to its profile, as returned by `SampleChecker.profile`.
+
+    Returns:
+        The profile for the scenario, or `None` if the file does not exist or has no
+        profile for it.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as inFile:
+        profiles = json.load(inFile)
+    return profiles.get(astHash.hex())
+
+
+def writeProfile(path, astHash, profile):
+    """Save the requirement profile for a scenario, keeping those for other scenarios."""
+    profiles = {}
+    if os.path.exists(path):
+        with open(path) as inFile:
+            profiles = json.load(inFile)
+    profiles[astHash.hex()] = profile
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially-written profile.
+    tempPath = f"{path}.tmp{os.getpid()}"
+    with open(tempPath, "w") as outFile:
+        json.dump(profiles, outFile, indent=1, sort_keys=True)
+    os.replace(tempPath, path)
@@ -1,5 +1,6 @@
 """Scenario and scene objects."""
 
+import collections
 import dataclasses
 import io
 import itertools
@@ -36,7 +37,12 @@ from scenic.core.requirements import (
     NonVisibilityRequirement,
     VisibilityRequirement,
 )
-from scenic.core.sample_checking import BasicChecker, WeightedAcceptanceChecker
+from scenic.core.sample_checking import (
+    BasicChecker,
+    WeightedAcceptanceChecker,
+    readProfile,
+    writeProfile,
+)
 from scenic.core.serialization import Serializer, dumpAsScenicCode
 from scenic.core.vectors import Vector
 
@@ -249,6 +255,127 @@ class Scene(_ScenarioPickleMixin):
         plt.show(block=block)
 
 
+class GenerationStats:
+    """Statistics about the generation of scenes from a `Scenario`.
+
+    These are only collected while profiling is enabled using
+    `Scenario.enableProfiling`.
+
+    Attributes:
+        scenes (int): Number of scenes generated.
+        iterations (int): Total number of rejection sampling iterations used.
+        time (float): Total time spent generating scenes, in seconds.
+        samplingTime (float): Time spent sampling the scenario's random values.
+        samplingRejections (int): Number of samples rejected during sampling, before
+          any requirements were checked (e.g. because a random value could not be
+          sampled from an empty region).
+        requirements (dict): Maps an identifier for each requirement (its line
+          number, or its type for built-in requirements, together with an index) to
+          a `RequirementStats` object.
+        pruningStats: The `PruningStats` of the scenario, or `None` if it was not
+          pruned.
+    """
+
+    def __init__(self, dependencyNames, pruningStats=None):
+        self.scenes = 0
+        self.iterations = 0
+        self.time = 0
+        self.samplingTime = 0
+        self.samplingRejections = 0
+        self.requirements = collections.defaultdict(RequirementStats)
+        self.pruningStats = pruningStats
+        self._dependencyNames = tuple(dependencyNames)
+        self._dependencyTimes = [0.0] * len(self._dependencyNames)
+
+    @property
+    def dependencyTimes(self):
+        """Time spent sampling each top-level dependency of the scenario, in seconds.
+
+        The dependencies are the objects, global parameters, etc. of the scenario.
+        Random values shared by several dependencies are counted toward the first
+        one sampled.
+        """
+        times = collections.Counter()
+        for name, t in zip(self._dependencyNames, self._dependencyTimes):
+            times[name] += t
+        return dict(times)
+
+    @property
+    def checkingTime(self):
+        """Total time spent checking requirements, in seconds."""
+        return sum(stats.time for stats in self.requirements.values())
+
+    def recordRequirement(self, key, rejected, elapsed):
+        """Record an evaluation of a requirement."""
+        stats = self.requirements[key]
+        stats.evaluations += 1
+        stats.rejections += bool(rejected)
+        stats.time += elapsed
+
+    def report(self, stream=None, maxEntries=10):
+        """Print a summary of these statistics."""
+        stream = sys.stdout if stream is None else stream
+        print(
+            f"Generated {self.scenes} scenes in {self.time:.4g} seconds"
+            f" ({self.iterations} iterations).",
+            file=stream,
+        )
+        print(
+            f"  Sampling: {self.samplingTime:.4g} seconds,"
+            f" {self.samplingRejections} rejections.",
+            file=stream,
+        )
+        times = collections.Counter(self.dependencyTimes)
+        for name, t in times.most_common(maxEntries):
+            if t == 0:  # e.g. dependencies already sampled as part of others
+                break
+            print(f"    {t:10.4g}s  {name}", file=stream)
+        print(f"  Checking requirements: {self.checkingTime:.4g} seconds.", file=stream)
+        byTime = sorted(self.requirements.items(), key=lambda item: -item[1].time)
+        for key, stats in byTime[:maxEntries]:
+            print(
+                f"    {stats.time:10.4g}s  {key}: rejected {stats.rejections}"
+                f" of {stats.evaluations} evaluations",
+                file=stream,
+            )
+        if self.pruningStats is not None:
+            pruned = self.pruningStats.pruned
+            print(
+                f"  Pruning: {self.pruningStats.totalTime:.4g} seconds,"
+                f" restricted {len(pruned)} positions.",
+                file=stream,
+            )
+            for name, obj, percentage in pruned[:maxEntries]:
+                amount = "?" if percentage is None else f"{percentage:.3g}%"
+                print(f"    {amount:>10}  of {obj} by {name}", file=stream)
+
+    def __repr__(self):
+        return (
+            f"<GenerationStats: {self.scenes} scenes, {self.iterations} iterations, "
+            f"{self.time:.4g}s>"
+        )
+
+
+@dataclasses.dataclass
+class RequirementStats:
+    """Statistics about the evaluations of a requirement during scene generation.
+
+    Attributes:
+        evaluations (int): Number of times the requirement was checked.
+        rejections (int): Number of times the requirement rejected the sample.
+        time (float): Total time spent checking the requirement, in seconds.
+    """
+
+    evaluations: int = 0
+    rejections: int = 0
+    time: float = 0
+
+    @property
+    def rejectionRate(self):
+        """Fraction of the evaluations of the requirement which rejected the sample."""
+        return self.rejections / self.evaluations if self.evaluations else float("nan")
+
+
 class Scenario(_ScenarioPickleMixin):
     """Scenario()
 
@@ -293,6 +420,10 @@ class Scenario(_ScenarioPickleMixin):
         self.dynamicScenario = dynamicScenario
         self.astHash = astHash
         self.compileOptions = compileOptions
+        self.pruningStats = None  # set by pruning.prune
+        self.generationStats = None  # set by enableProfiling
+        # number of rejected samples, indexed by reason for rejection
+        self.rejectionCounts = collections.Counter()
 
         staticReqs, alwaysReqs, terminationConds = [], [], []
         self.requirements = tuple(dynamicScenario._requirements)  # TODO clean up
@@ -323,6 +454,74 @@ class Scenario(_ScenarioPickleMixin):
     def setSampleChecker(self, checker):
         self.checker = checker
         self.checker.setRequirements(self.defaultRequirements + self.userRequirements)
+        self.checker.setStats(self.generationStats)
+
+    def enableProfiling(self):
+        """Start collecting statistics about where time is spent generating scenes.
+
+        Profiling adds some overhead to scene generation, so it is disabled by default.
+
+        Returns:
+            A new `GenerationStats` object, also stored in the ``generationStats``
+            attribute of the scenario, which is updated as scenes are generated
+            until `disableProfiling` is called.
+        """
+        stats = GenerationStats(self._dependencyNames(), pruningStats=self.pruningStats)
+        self.generationStats = stats
+        self.checker.setStats(stats)
+        return stats
+
+    def disableProfiling(self):
+        """Stop collecting statistics started by `enableProfiling`."""
+        self.generationStats = None
+        self.checker.setStats(None)
+
+    def _dependencyNames(self):
+        # Names for the elements of self.dependencies, in the same order.
+        names = []
+        counts = collections.Counter()
+        for instance in self._instances:
+            base = type(instance).__name__
+            suffix = " (ego)" if instance is self.egoObject else ""
+            names.append(f"{base} #{counts[base]}{suffix}")
+            counts[base] += 1
+        for name, value in self.params.items():
+            if isinstance(value, Samplable):
+                names.append(f'param "{name}"')
+        behaviorNames = []
+        for modName, namespace in self.behaviorNamespaces.items():
+            for name, value in namespace.items():
+                if isinstance(value, Samplable):
+                    behaviorNames.append(f"{modName}.{name}")
+        # everything else comes from the requirements
+        numRequirementDeps = len(self.dependencies) - len(names) - len(behaviorNames)
+        names.extend(["requirements"] * numRequirementDeps)
+        names.extend(behaviorNames)
+        assert len(names) == len(self.dependencies)
+        return names
+
+    def loadRequirementProfile(self, path):
+        """Seed the sample checker with requirement statistics from a profile file.
+
+        The checker uses the statistics (e.g. how often each requirement rejects and
+        how expensive it is to check) to decide in which order to check requirements.
+        Loading a profile saved by `saveRequirementProfile` after a previous run
+        means the checker does not need to learn them again. Profiles are keyed by
+        the hash of the scenario's AST, so one file can store profiles for several
+        scenarios; if the file has no profile for this scenario, this method has no
+        effect.
+        """
+        profile = readProfile(path, self.astHash)
+        if profile is not None:
+            self.checker.loadProfile(profile)
+
+    def saveRequirementProfile(self, path):
+        """Save the statistics learned by the sample checker to a profile file.
+
+        See `loadRequirementProfile`. Profiles for other scenarios already in the
+        file are preserved.
+        """
+        writeProfile(path, self.astHash, self.checker.profile())
 
     def containerOfObject(self, obj):
         if hasattr(obj, "regionContainedIn") and obj.regionContainedIn is not None:
@@ -441,6 +640,18 @@ class Scenario(_ScenarioPickleMixin):
         return scenes, totalIterations
 
     def _generateInner(self, maxIterations, verbosity, feedback):
+        stats = self.generationStats
+        if stats is None:
+            return self._generateScene(maxIterations, verbosity, feedback)
+        startTime = time.perf_counter()
+        try:
+            result = self._generateScene(maxIterations, verbosity, feedback)
+        finally:
+            stats.time += time.perf_counter() - startTime
+        stats.scenes += 1
+        return result
+
+    def _generateScene(self, maxIterations, verbosity, feedback):
         # choose which custom requirements will be enforced for this sample
         for req in self.userRequirements:
             if random.random() <= req.prob:
@@ -449,10 +660,12 @@ class Scenario(_ScenarioPickleMixin):
                 req.active = False
 
         # do rejection sampling until requirements are satisfied
+        stats = self.generationStats
         rejection = True
         iterations = 0
         while rejection is not None:
             if iterations > 0:  # rejected the last sample
+                self.rejectionCounts[str(rejection)] += 1
                 if verbosity >= 2:
                     print(f"  Rejected sample {iterations} because of {rejection}")
                 if self.externalSampler is not None:
@@ -462,11 +675,18 @@ class Scenario(_ScenarioPickleMixin):
                     f"failed to generate scenario in {iterations} iterations"
                 )
             iterations += 1
+            if stats is not None:
+                stats.iterations += 1
             try:
                 if self.externalSampler is not None:
                     self.externalSampler.sample(feedback)
-                sample = Samplable.sampleAll(self.dependencies)
+                if stats is None:
+                    sample = Samplable.sampleAll(self.dependencies)
+                else:
+                    sample = self._sampleProfiled(stats)
             except RejectionException as e:
+                if stats is not None:
+                    stats.samplingRejections += 1
                 optionallyDebugRejection(e)
                 rejection = e
                 continue
@@ -491,6 +711,13 @@ class Scenario(_ScenarioPickleMixin):
         scene = self._makeSceneFromSample(sample)
         return scene, iterations
 
+    def _sampleProfiled(self, stats):
+        startTime = time.perf_counter()
+        try:
+            return Samplable.sampleAll(self.dependencies, times=stats._dependencyTimes)
+        finally:
+            stats.samplingTime += time.perf_counter() - startTime
+
     def generateDefaultRequirements(self):
         requirements = []
 
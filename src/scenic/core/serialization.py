@@ -7,9 +7,11 @@ For high-level serialization APIs, see `Scenario.sceneToBytes`,
 
 import io
 import math
+import os
 import pickle
 import struct
 import types
+import zlib
 
 from scenic.core.distributions import Samplable, needsSampling
 from scenic.core.utils import DefaultIdentityDict
@@ -364,3 +366,273 @@ def readStr(stream):
 
 
 Serializer.addCodec(str, writeStr, readStr)
+
+
+## Streaming replays
+
+
+class ReplayWriter(io.BufferedIOBase):
+    """Binary stream writing `Simulation` replay data to a file in compressed chunks.
+
+    Replay data is buffered in memory until the current time step ends with at least
+    **chunkSize** bytes buffered; the buffer is then compressed and written to the
+    file as a length-prefixed chunk labeled with the time step at which it begins.
+    When the stream is closed, an index of the chunks is appended so that
+    `ReplayReader` can seek to the chunk containing a given time step.
+
+    Args:
+        file: Path or :term:`binary file` (open for writing) to write to.
+        chunkSize (int): Minimum size in bytes of the uncompressed data in each chunk.
+        compressionLevel (int): Level passed to `zlib.compress`.
+    """
+
+    def __init__(self, file, chunkSize=1 << 16, compressionLevel=6):
+        if isinstance(file, (str, os.PathLike)):
+            self.file = open(file, "wb")
+            self._ownsFile = True
+        else:
+            self.file = file
+            self._ownsFile = False
+        self.chunkSize = chunkSize
+        self.compressionLevel = compressionLevel
+        self._startPosition = self.file.tell() if self.file.seekable() else None
+        self.file.write(_replayMagic + struct.pack("<H", _replayContainerVersion))
+        self._offset = len(_replayMagic) + 2
+        self._buffer = bytearray()
+        self._chunkStep = 0
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed ReplayWriter")
+        self._buffer += data
+        return len(data)
+
+    def beginStep(self, step):
+        """Mark the beginning of the given time step.
+
+        If enough data has been buffered, it is written out as a chunk, and the next
+        chunk will begin at this step.
+        """
+        if len(self._buffer) >= self.chunkSize:
+            self._writeChunk()
+        if not self._buffer:
+            self._chunkStep = step
+
+    def _writeChunk(self):
+        raw = bytes(self._buffer)
+        data = zlib.compress(raw, self.compressionLevel)
+        header = struct.pack("<cIII", b"C", self._chunkStep, len(raw), len(data))
+        self.file.write(header)
+        self.file.write(data)
+        self.chunks.append((self._chunkStep, self._offset))
+        self._offset += len(header) + len(data)
+        self._buffer.clear()
+
+    def discard(self):
+        """Close the stream, removing everything written to the file if possible.
+
+        If the file is not seekable, the chunks already written are left in place
+        (without an index).
+        """
+        if self.closed:
+            return
+        if self._startPosition is not None:
+            self.file.seek(self._startPosition)
+            self.file.truncate()
+        if self._ownsFile:
+            self.file.close()
+        super().close()
+
+    def flush(self):
+        """Flush the underlying file.
+
+        Buffered data is only written out at time step boundaries, so that chunks
+        always begin at the start of a time step.
+        """
+        if not self.file.closed:
+            self.file.flush()
+
+    def close(self):
+        """Write out any buffered data and the chunk index, then close the stream.
+
+        The underlying file is closed only if it was opened by this stream.
+        """
+        if self.closed:
+            return
+        if self._buffer:
+            self._writeChunk()
+        index = [struct.pack("<cI", b"I", len(self.chunks))]
+        index.extend(struct.pack("<IQ", step, offset) for step, offset in self.chunks)
+        index.append(struct.pack("<Q", self._offset) + _replayIndexMagic)
+        self.file.write(b"".join(index))
+        self.file.flush()
+        if self._ownsFile:
+            self.file.close()
+        super().close()
+
+
+class ReplayReader(io.BufferedIOBase):
+    """Binary stream reading `Simulation` replay data written by `ReplayWriter`.
+
+    Chunks are decompressed one at a time as the data is read, so that the whole
+    replay need not be loaded into memory. Instances may be passed as the **replay**
+    argument of `Simulator.simulate`.
+
+    Args:
+        file: Path or :term:`binary file` (open for reading) to read from.
+    """
+
+    def __init__(self, file):
+        if isinstance(file, (str, os.PathLike)):
+            self.file = open(file, "rb")
+            self._ownsFile = True
+        else:
+            self.file = file
+            self._ownsFile = False
+        header = self.file.read(len(_replayMagic) + 2)
+        if len(header) != len(_replayMagic) + 2 or not header.startswith(_replayMagic):
+            raise SerializationError("not a streamed replay")
+        version = struct.unpack("<H", header[len(_replayMagic) :])[0]
+        if version != _replayContainerVersion:
+            raise SerializationError("cannot read replay from a different Scenic version")
+        self._base = self.file.tell() - len(header)
+        self._chunk = memoryview(b"")
+        self._position = 0
+        self._exhausted = False
+        self._chunks = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError("read from closed ReplayReader")
+        if size is None or size < 0:
+            size = math.inf
+        pieces = []
+        while size > 0:
+            available = len(self._chunk) - self._position
+            if available == 0:
+                if not self._nextChunk():
+                    break
+                continue
+            n = int(min(size, available))
+            pieces.append(self._chunk[self._position : self._position + n])
+            self._position += n
+            size -= n
+        return b"".join(pieces)
+
+    def read1(self, size=-1):
+        return self.read(size)
+
+    def _readChunkHeader(self):
+        header = self.file.read(13)
+        if len(header) < 13 or header[:1] != b"C":
+            return None
+        return struct.unpack("<III", header[1:])
+
+    def _nextChunk(self):
+        if self._exhausted:
+            return False
+        header = self._readChunkHeader()
+        if header is None:
+            self._exhausted = True
+            return False
+        step, rawLength, length = header
+        data = self.file.read(length)
+        try:
+            raw = zlib.decompress(data)
+        except zlib.error as e:
+            raise SerializationError("replay is corrupted") from e
+        if len(raw) != rawLength:
+            raise SerializationError("replay is corrupted")
+        self._chunk = memoryview(raw)
+        self._position = 0
+        return True
+
+    @property
+    def chunks(self):
+        """List of pairs ``(step, offset)`` giving the time step at which each chunk
+        begins and its offset in the file.
+
+        This reads the index written by `ReplayWriter.close` if present, and otherwise
+        scans the file. It requires the underlying file to be seekable.
+        """
+        if self._chunks is None:
+            position = self.file.tell()
+            try:
+                self._chunks = self._readIndex()
+            finally:
+                self.file.seek(position)
+        return self._chunks
+
+    def _readIndex(self):
+        trailerLength = 8 + len(_replayIndexMagic)
+        end = self.file.seek(0, io.SEEK_END)
+        if end - self._base >= trailerLength:
+            self.file.seek(end - trailerLength)
+            trailer = self.file.read(trailerLength)
+            if trailer.endswith(_replayIndexMagic):
+                indexOffset = struct.unpack("<Q", trailer[:8])[0]
+                self.file.seek(self._base + indexOffset)
+                tag, count = struct.unpack("<cI", self.file.read(5))
+                if tag != b"I":
+                    raise SerializationError("replay is corrupted")
+                entries = self.file.read(12 * count)
+                return [struct.unpack_from("<IQ", entries, 12 * i) for i in range(count)]
+        # No index (e.g. the writer was never closed): scan the chunk headers.
+        chunks = []
+        offset = len(_replayMagic) + 2
+        self.file.seek(self._base + offset)
+        while (header := self._readChunkHeader()) is not None:
+            step, _, length = header
+            chunks.append((step, offset))
+            offset += 13 + length
+            self.file.seek(self._base + offset)
+        return chunks
+
+    def rewind(self):
+        """Return to the start of the replay.
+
+        This requires the underlying file to be seekable.
+        """
+        self.file.seek(self._base + len(_replayMagic) + 2)
+        self._chunk = memoryview(b"")
+        self._position = 0
+        self._exhausted = False
+
+    def seekStep(self, step):
+        """Position the stream at the start of the chunk containing the given step.
+
+        Returns:
+            The time step at which the chunk begins (which may be earlier than
+            **step**, since chunks can span several steps).
+        """
+        candidates = [chunk for chunk in self.chunks if chunk[0] <= step]
+        if not candidates:
+            raise ValueError(f"replay has no data for time step {step}")
+        chunkStep, offset = candidates[-1]
+        self.file.seek(self._base + offset)
+        self._chunk = memoryview(b"")
+        self._position = 0
+        self._exhausted = False
+        return chunkStep
+
+    def close(self):
+        if self.closed:
+            return
+        if self._ownsFile:
+            self.file.close()
+        super().close()
+
+
+_replayMagic = b"SCNREPLY"
+_replayIndexMagic = b"SCNINDEX"
+_replayContainerVersion = 1
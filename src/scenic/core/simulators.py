@@ -15,12 +15,15 @@ from collections import defaultdict
 import enum
 import math
 import numbers
+import os
 import time
 import types
 
 from scenic.core.distributions import RejectionException
+import scenic.core.dynamics as dynamics
 from scenic.core.dynamics import GuardViolation, RejectSimulationException
 from scenic.core.dynamics.actions import Action, _EndScenarioAction, _EndSimulationAction
+from scenic.core.dynamics.utils import StuckBehaviorWatchdog
 import scenic.core.errors as errors
 from scenic.core.errors import InvalidScenarioError, optionallyDebugRejection
 from scenic.core.object_types import (
@@ -29,8 +32,9 @@ from scenic.core.object_types import (
     enableDynamicProxyFor,
     setDynamicProxyFor,
 )
+from scenic.core.recording import TimeSeries, Trajectory
 from scenic.core.requirements import RequirementType
-from scenic.core.serialization import Serializer
+from scenic.core.serialization import ReplayReader, ReplayWriter, Serializer
 from scenic.core.vectors import Vector
 
 
@@ -84,6 +88,7 @@ class Simulator(abc.ABC):
         raiseGuardViolations=False,
         replay=None,
         enableReplay=True,
+        replayFile=None,
         enableDivergenceCheck=False,
         divergenceTolerance=0,
         continueAfterDivergence=False,
@@ -112,10 +117,17 @@ class Simulator(abc.ABC):
                 we will then replay the saved simulation rather than randomly generating
                 one as usual. If **maxSteps** is larger than that of the original
                 simulation, then once the replay is exhausted the simulation will continue
-                to run in the usual randomized manner.
+                to run in the usual randomized manner. Replays saved with **replayFile**
+                can be passed as a `ReplayReader` (or the path of the file). Streams
+                are rewound before each retried simulation, so they must be seekable
+                unless **maxIterations** is 1.
             enableReplay (bool): Whether to save data from the simulation so that it can
                 be serialized for later replay using `Scenario.simulationToBytes` or
                 `Simulation.getReplay`. Enabled by default as the overhead is generally low.
+            replayFile: If not `None`, a path or :term:`binary file` to which the replay
+                data should be streamed in compressed chunks as the simulation runs,
+                instead of being kept in memory (see `ReplayWriter`). Requires
+                **enableReplay**. The replay can be read back with `ReplayReader`.
             enableDivergenceCheck (bool): Whether to save the values of every
                 :term:`dynamic property` at each time step, so that when the simulation is
                 replayed, nondeterminism in the simulator (or replaying the simulation in
@@ -171,10 +183,13 @@ class Simulator(abc.ABC):
             verbosity = errors.verbosityLevel
 
         # Repeatedly run simulations until we find one satisfying the requirements
+        rewindReplay = self._replayRewinder(replay, maxIterations)
         iterations = 0
         simulation = None
         while not simulation and (maxIterations is None or iterations < maxIterations):
             iterations += 1
+            if iterations > 1:
+                rewindReplay()
             simulation = self._runSingleSimulation(
                 scene,
                 maxSteps,
@@ -184,6 +199,7 @@ class Simulator(abc.ABC):
                 raiseGuardViolations=raiseGuardViolations,
                 replay=replay,
                 enableReplay=enableReplay,
+                replayFile=replayFile,
                 enableDivergenceCheck=enableDivergenceCheck,
                 divergenceTolerance=divergenceTolerance,
                 continueAfterDivergence=continueAfterDivergence,
@@ -191,6 +207,31 @@ class Simulator(abc.ABC):
             )
         return simulation
 
+    @staticmethod
+    def _replayRewinder(replay, maxIterations):
+        # Return a function restoring the replay to its start before a rejected
+        # simulation is retried. Replays given as bytes or paths are read from the
+        # start on each attempt anyway; streams must be seekable if there can be
+        # retries, so we check that before running any simulations.
+        if not replay or isinstance(replay, (bytes, bytearray, str, os.PathLike)):
+            return lambda: None
+        if isinstance(replay, ReplayReader):
+            seekable = replay.file.seekable()
+            rewind = replay.rewind
+        else:
+            seekable = replay.seekable()
+            if seekable:
+                start = replay.tell()
+                rewind = lambda: replay.seek(start)
+        if not seekable:
+            if maxIterations != 1:
+                raise ValueError(
+                    "replay stream is not seekable, so rejected simulations cannot be "
+                    "retried; use maxIterations=1 or pass the replay as bytes or a path"
+                )
+            return lambda: None
+        return rewind
+
     def replay(self, scene, replay, **kwargs):
         """Replay a simulation.
 
@@ -325,6 +366,7 @@ class Simulation(abc.ABC):
         timestep,
         replay=None,
         enableReplay=True,
+        replayFile=None,
         allowPickle=False,
         enableDivergenceCheck=False,
         divergenceTolerance=0,
@@ -335,8 +377,8 @@ class Simulation(abc.ABC):
         self.result = None
         self.scene = scene
         self.objects = []
-        self.trajectory = []
-        self.records = defaultdict(list)
+        self.trajectory = Trajectory()
+        self.records = defaultdict(TimeSeries)
         self.currentTime = 0
         self.timestep = 1 if timestep is None else float(timestep)
         self.verbosity = verbosity
@@ -346,10 +388,15 @@ class Simulation(abc.ABC):
         self.actionSequence = []
 
         # Prepare to save or load a replay.
-        self.initializeReplay(replay, enableReplay, enableDivergenceCheck, allowPickle)
+        self.initializeReplay(
+            replay, enableReplay, enableDivergenceCheck, allowPickle, replayFile
+        )
         self.divergenceTolerance = divergenceTolerance
         self.continueAfterDivergence = continueAfterDivergence
 
+        # Watch for behaviors/scenarios which take too long to yield.
+        self._watchdog = StuckBehaviorWatchdog(dynamics.stuckBehaviorWarningTimeout)
+
         # Do the actual setup and execution of the simulation inside a try-finally
         # statement so that we roll back global state even if an error occurs.
         try:
@@ -357,6 +404,7 @@ class Simulation(abc.ABC):
             import scenic.syntax.veneer as veneer
 
             veneer.beginSimulation(self)
+            self._watchdog.start()
             dynamicScenario = self.scene.dynamicScenario
 
             # Create objects and perform simulator-specific initialization.
@@ -397,6 +445,7 @@ class Simulation(abc.ABC):
             e.simulation = self
             raise
         finally:
+            self._watchdog.stop()
             self.destroy()
             for obj in self.objects:
                 disableDynamicProxyFor(obj)
@@ -409,6 +458,7 @@ class Simulation(abc.ABC):
             for scenario in tuple(reversed(veneer.runningScenarios)):
                 scenario._stop("exception", quiet=True)
             veneer.endSimulation(self)
+            self._closeReplayStreams()
 
     def _run(self, dynamicScenario, maxSteps):
         assert self.currentTime == 0
@@ -416,6 +466,8 @@ class Simulation(abc.ABC):
         while True:
             if self.verbosity >= 3:
                 print(f"    Time step {self.currentTime}:")
+            if self._replayWriter:
+                self._replayWriter.beginStep(self.currentTime)
 
             # Run compose blocks of compositional scenarios
             # (and check if any requirements defined therein fail)
@@ -523,16 +575,25 @@ class Simulation(abc.ABC):
         for obj in self.scene.objects:
             self._createObject(obj)
 
-    def initializeReplay(self, replay, enableReplay, enableDivergenceCheck, allowPickle):
+    def initializeReplay(
+        self, replay, enableReplay, enableDivergenceCheck, allowPickle, replayFile=None
+    ):
+        self._replayReader = self._replayWriter = self._replayIn = None
         if replay:
             self.replaying = True
+            if isinstance(replay, (str, os.PathLike)):
+                replay = self._replayReader = ReplayReader(replay)
             self._replayIn = Serializer(replay, allowPickle=allowPickle, detectEnd=True)
             flags = ReplayMode(self._replayIn.readReplayHeader())
             self._checkDivergence = ReplayMode.checkDivergence in flags
         else:
             self.replaying = False
         if enableReplay:
-            self._replayOut = Serializer(allowPickle=allowPickle)
+            if replayFile is not None:
+                self._replayWriter = ReplayWriter(replayFile)
+                self._replayOut = Serializer(self._replayWriter, allowPickle=allowPickle)
+            else:
+                self._replayOut = Serializer(allowPickle=allowPickle)
             flags = 0
             if enableDivergenceCheck:
                 flags |= ReplayMode.checkDivergence
@@ -541,8 +602,25 @@ class Simulation(abc.ABC):
                 self._writeDivergenceData = False
             self._replayOut.writeReplayHeader(flags)
         else:
+            if replayFile is not None:
+                raise RuntimeError("cannot stream replay without replay support enabled")
             self._replayOut = None
 
+    def _closeReplayStreams(self):
+        if self._replayIn:
+            # Detach the buffered reader wrapping the replay so that it does not close
+            # a caller-supplied stream when garbage-collected (the stream may be
+            # rewound to retry the simulation).
+            self._replayIn.stream.detach()
+        if self._replayReader:
+            self._replayReader.close()
+        if self._replayWriter:
+            if self.result is None:
+                # The simulation was rejected or failed; don't leave a partial replay.
+                self._replayWriter.discard()
+            else:
+                self._replayWriter.close()
+
     def _createObject(self, obj):
         if self.verbosity >= 3:
             print(f"      Creating object {obj}")
@@ -813,6 +891,10 @@ class Simulation(abc.ABC):
         """
         if not self._replayOut:
             raise RuntimeError("cannot save replay without replay support enabled")
+        if self._replayWriter:
+            raise RuntimeError(
+                "replay was streamed to a file; use ReplayReader to read it"
+            )
         return self._replayOut.getBytes()
 
 
@@ -902,8 +984,10 @@ class SimulationResult:
     """Result of running a simulation.
 
     Attributes:
-        trajectory: A tuple giving for each time step the simulation's 'state': by
-            default the positions of every object. See `Simulation.currentState`.
+        trajectory (`Trajectory`): A sequence giving for each time step the
+            simulation's 'state': by default the positions of every object. See
+            `Simulation.currentState`. When the states are tuples of positions, they
+            are also available as a single NumPy array via ``trajectory.positions``.
         finalState: The last 'state' of the simulation, as above.
         actions: A tuple giving for each time step a dict specifying for each agent the
             (possibly-empty) tuple of actions it took at that time step.
@@ -911,14 +995,33 @@ class SimulationResult:
         terminationReason (str): A human-readable string giving the reason why the
             simulation ended, possibly including debugging info.
         records (dict): For each :keyword:`record` statement, the value or time series of
-            values its expression took during the simulation.
+            values its expression took during the simulation. Time series are
+            `TimeSeries` objects, sequences of ``(time, value)`` pairs which also
+            provide the times and values as NumPy arrays when possible.
+
+    .. versionchanged:: 3.1
+
+        **trajectory** and the time series in **records** are now stored in columnar
+        form; see :mod:`scenic.core.recording`. The trajectory was previously a
+        tuple and time series were lists. Both still compare equal to tuples and
+        lists with the same items, and the trajectory and time series are hashable
+        (like tuples), but they are not instances of `tuple` or `list`: code using
+        ``isinstance(value, list)`` to detect time series should check for
+        `TimeSeries` (or `collections.abc.Sequence`) instead, and code which needs
+        an actual list or tuple can convert them with ``list(...)``/``tuple(...)``.
     """
 
     def __init__(self, trajectory, actions, terminationType, terminationReason, records):
-        self.trajectory = tuple(trajectory)
+        if not isinstance(trajectory, Trajectory):
+            trajectory = Trajectory(trajectory)
+        trajectory.freeze()
+        self.trajectory = trajectory
         assert self.trajectory
         self.finalState = self.trajectory[-1]
         self.actions = tuple(actions)
         self.terminationType = terminationType
         self.terminationReason = str(terminationReason)
         self.records = dict(records)
+        for value in self.records.values():
+            if isinstance(value, TimeSeries):
+                value.freeze()
@@ -15,7 +15,6 @@ import warnings
 import weakref
 
 import numpy
-import trimesh
 
 sqrt2 = math.sqrt(2)
 
@@ -137,6 +136,8 @@ def unifyMesh(mesh, verbose=False):
     """
     assert mesh.is_volume
 
+    import trimesh  # slow import not needed until meshes are manipulated
+
     # No need to unify a mesh with less than 2 bodies
     if mesh.body_count < 2:
         return mesh
@@ -349,6 +350,277 @@ def findMeshInteriorPoint(mesh, num_samples=None):
     return surfacePt  # pragma: no cover
 
 
+class MeshVolumeSampler:
+    """Exact uniform sampler for the volume of a closed mesh.
+
+    The mesh is decomposed into the tetrahedra joining each face to a common apex (the
+    centroid of the mesh). If the mesh is star-shaped with respect to the apex, these
+    tetrahedra tile its volume, and a uniform point is drawn by picking a tetrahedron
+    with probability proportional to its volume (by binary search in a table of
+    cumulative volumes) and then a uniform point inside it.
+
+    Otherwise some of the tetrahedra have negative signed volume. We then draw points
+    from the positive tetrahedra as above, accepting each with probability
+    :math:`(p-n)/p`, where :math:`p` and :math:`n` are the numbers of positive and
+    negative tetrahedra containing the point. Since :math:`p-n` is the winding number
+    of the mesh around the point, the accepted points are exactly uniform.
+
+    Args:
+        mesh: A `trimesh.Trimesh` which is a well-defined volume.
+    """
+
+    def __init__(self, mesh):
+        self.apex = mesh.center_mass
+        edges = mesh.triangles - self.apex
+        volumes = numpy.einsum(
+            "ij,ij->i", edges[:, 0], numpy.cross(edges[:, 1], edges[:, 2])
+        )
+        volumes /= 6
+        epsilon = 1e-12 * numpy.max(mesh.extents) ** 3
+        positive = volumes > epsilon
+        negative = volumes < -epsilon
+        self._edges = edges[positive]
+        self._cumulativeVolumes = numpy.cumsum(volumes[positive])
+        self.volume = numpy.sum(volumes)
+        self.exact = not numpy.any(negative)
+        if not self.exact:
+            # Inverses of the edge matrices, for computing barycentric coordinates
+            self._positiveInverses = numpy.linalg.inv(edges[positive].transpose(0, 2, 1))
+            self._negativeInverses = numpy.linalg.inv(edges[negative].transpose(0, 2, 1))
+
+    @property
+    def acceptanceRate(self):
+        """Probability that a point drawn from the positive tetrahedra is accepted."""
+        if self.exact:
+            return 1
+        return max(0, self.volume / self._cumulativeVolumes[-1])
+
+    def sample(self, count, maxIterations=100):
+        """Sample up to **count** points uniformly from the volume of the mesh.
+
+        Fewer points are returned only if the mesh is not star-shaped and
+        **maxIterations** batches of candidate points were not enough to accept
+        **count** of them. Random numbers are drawn from `numpy.random`.
+
+        Returns:
+            An array of shape ``(k, 3)`` with ``k <= count``.
+        """
+        if self.exact:
+            return self._candidates(count)
+        if self.acceptanceRate <= 0:
+            return numpy.empty((0, 3))
+        accepted = []
+        remaining = count
+        for _ in range(maxIterations):
+            if remaining <= 0:
+                break
+            candidates = self._candidates(
+                math.ceil(1.1 * remaining / self.acceptanceRate)
+            )
+            offsets = candidates - self.apex
+            p = self._containingCount(self._positiveInverses, offsets)
+            n = self._containingCount(self._negativeInverses, offsets)
+            keep = numpy.random.random(len(candidates)) * p < p - n
+            points = candidates[keep][:remaining]
+            accepted.append(points)
+            remaining -= len(points)
+        return numpy.concatenate(accepted) if accepted else numpy.empty((0, 3))
+
+    def _candidates(self, count):
+        cumulative = self._cumulativeVolumes
+        targets = numpy.random.random(count) * cumulative[-1]
+        indices = numpy.searchsorted(cumulative, targets, side="right")
+        indices = numpy.minimum(indices, len(cumulative) - 1)
+        # Normalized exponential variates are uniform barycentric coordinates
+        weights = numpy.random.exponential(size=(count, 4))
+        weights /= numpy.sum(weights, axis=1, keepdims=True)
+        return self.apex + numpy.einsum(
+            "ij,ijk->ik", weights[:, 1:], self._edges[indices]
+        )
+
+    @staticmethod
+    def _containingCount(inverses, offsets, tolerance=1e-9):
+        counts = numpy.zeros(len(offsets), dtype=int)
+        if len(inverses) == 0:
+            return counts
+        # Process the points in batches to bound the size of the intermediate arrays.
+        batchSize = max(1, 1_000_000 // len(inverses))
+        for start in range(0, len(offsets), batchSize):
+            batch = offsets[start : start + batchSize]
+            coords = numpy.einsum("nij,mj->mni", inverses, batch)
+            inside = numpy.all(coords >= -tolerance, axis=2)
+            inside &= numpy.sum(coords, axis=2) <= 1 + tolerance
+            counts[start : start + batchSize] = numpy.sum(inside, axis=1)
+        return counts
+
+
+class MeshSurfaceSampler:
+    """Uniform sampler for the surface of a mesh.
+
+    Faces are chosen with probability proportional to their area by binary search in
+    a precomputed table of cumulative areas. For drawing single points, `next` hands
+    out points from a buffer which is refilled in batches (growing geometrically up to
+    **maxBufferSize**). The buffer is discarded whenever the given epoch changes,
+    so that as long as the epoch changes whenever the PRNGs may have been reseeded
+    (see `Samplable._samplingEpoch`), the points drawn depend only on the seed.
+
+    Args:
+        mesh: A `trimesh.Trimesh`.
+        minBufferSize (int): Size of the first batch drawn in each epoch.
+        maxBufferSize (int): Maximum size of a batch.
+    """
+
+    def __init__(self, mesh, minBufferSize=8, maxBufferSize=1024):
+        triangles = mesh.triangles
+        self._origins = triangles[:, 0]
+        self._edges = triangles[:, 1:] - triangles[:, :1]
+        self._cumulativeAreas = numpy.cumsum(mesh.area_faces)
+        self.minBufferSize = minBufferSize
+        self.maxBufferSize = maxBufferSize
+        self._buffer = numpy.empty((0, 3))
+        self._bufferIndex = 0
+        self._bufferSize = minBufferSize
+        self._epoch = None
+
+    def sample(self, count):
+        """Sample **count** points uniformly from the surface of the mesh.
+
+        Random numbers are drawn from `numpy.random`.
+
+        Returns:
+            An array of shape ``(count, 3)``.
+        """
+        cumulative = self._cumulativeAreas
+        targets = numpy.random.random(count) * cumulative[-1]
+        faces = numpy.searchsorted(cumulative, targets, side="right")
+        faces = numpy.minimum(faces, len(cumulative) - 1)
+        coords = numpy.random.random((count, 2))
+        # Reflect points in the far half of the parallelogram back into the triangle
+        outside = numpy.sum(coords, axis=1) > 1
+        coords[outside] = 1 - coords[outside]
+        offsets = numpy.einsum("ij,ijk->ik", coords, self._edges[faces])
+        return self._origins[faces] + offsets
+
+    def next(self, epoch=None):
+        """Return a single uniformly-random point on the surface of the mesh."""
+        if epoch != self._epoch:
+            self._epoch = epoch
+            self._buffer = self._buffer[:0]
+            self._bufferIndex = 0
+            self._bufferSize = self.minBufferSize
+        if self._bufferIndex >= len(self._buffer):
+            self._buffer = self.sample(self._bufferSize)
+            self._bufferIndex = 0
+            self._bufferSize = min(2 * self._bufferSize, self.maxBufferSize)
+        point = self._buffer[self._bufferIndex]
+        self._bufferIndex += 1
+        return point
+
+
+class MeshProximityIndex:
+    """Cached acceleration structure for proximity and containment queries on a mesh.
+
+    Closest-point queries use a bounding volume hierarchy over the triangles of the
+    mesh (an FCL ``BVHModel``), which is built once and then reused. Containment is
+    decided by the generalized winding number of the mesh around each point, which
+    (unlike ray tests) is robust to grazing rays and small defects. All query methods
+    take arrays of points with shape ``(N, 3)``.
+
+    Args:
+        mesh: A `trimesh.Trimesh`.
+    """
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.bounds = mesh.bounds
+        # Triangle vertices, stored coordinate-major for the winding number kernel
+        triangles = mesh.triangles
+        self._corners = tuple(
+            numpy.ascontiguousarray(triangles[:, i].T) for i in range(3)
+        )
+        self._bvh = None
+
+    def closestPoints(self, points):
+        """Find the closest points on the surface of the mesh.
+
+        Returns:
+            A tuple ``(closest, distances, triangles)`` of arrays giving the closest
+            points, their distances, and the indices of the triangles they lie on.
+        """
+        import fcl
+        import trimesh
+
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        if self._bvh is None:
+            geom = fcl.BVHModel()
+            geom.beginModel(len(self.mesh.vertices), len(self.mesh.faces))
+            geom.addSubModel(self.mesh.vertices, self.mesh.faces)
+            geom.endModel()
+            self._bvh = fcl.CollisionObject(geom, fcl.Transform())
+        closest = numpy.empty_like(points)
+        distances = numpy.empty(len(points))
+        triangles = numpy.empty(len(points), dtype=numpy.int64)
+        request = fcl.DistanceRequest(enable_nearest_points=True)
+        probe = fcl.Sphere(0)
+        for i, point in enumerate(points):
+            result = fcl.DistanceResult()
+            target = fcl.CollisionObject(probe, fcl.Transform(point))
+            distances[i] = fcl.distance(self._bvh, target, request, result)
+            closest[i] = result.nearest_points[0]
+            triangles[i] = result.b1
+        # FCL does not report nearest points for points lying exactly on the surface.
+        onSurface = distances <= 0
+        if numpy.any(onSurface):
+            fallback = trimesh.proximity.closest_point(self.mesh, points[onSurface])
+            closest[onSurface], distances[onSurface], triangles[onSurface] = fallback
+        return closest, distances, triangles
+
+    def distancesTo(self, points):
+        """Compute the distances from the points to the surface of the mesh."""
+        return self.closestPoints(points)[1]
+
+    def windingNumbers(self, points):
+        """Compute the generalized winding number of the mesh around each point."""
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        numbers = numpy.zeros(len(points))
+        # Points outside the bounding box have winding number zero.
+        inBox = numpy.all((points >= self.bounds[0]) & (points <= self.bounds[1]), axis=1)
+        A, B, C = self._corners
+        for i in numpy.flatnonzero(inBox):
+            # Sum the solid angles of the triangles as seen from the point
+            # (using the formula of Van Oosterom and Strackee).
+            point = points[i, :, numpy.newaxis]
+            a, b, c = A - point, B - point, C - point
+            la = numpy.sqrt(numpy.sum(a * a, axis=0))
+            lb = numpy.sqrt(numpy.sum(b * b, axis=0))
+            lc = numpy.sqrt(numpy.sum(c * c, axis=0))
+            det = (
+                a[0] * (b[1] * c[2] - b[2] * c[1])
+                + a[1] * (b[2] * c[0] - b[0] * c[2])
+                + a[2] * (b[0] * c[1] - b[1] * c[0])
+            )
+            denominator = (
+                la * lb * lc
+                + numpy.sum(a * b, axis=0) * lc
+                + numpy.sum(b * c, axis=0) * la
+                + numpy.sum(c * a, axis=0) * lb
+            )
+            numbers[i] = numpy.sum(numpy.arctan2(det, denominator)) / (2 * math.pi)
+        return numbers
+
+    def containsPoints(self, points):
+        """Check which points lie inside the mesh, which must be a closed volume."""
+        return self.windingNumbers(points) >= 0.5
+
+    def signedDistances(self, points):
+        """Compute distances to the surface, positive for points inside the mesh.
+
+        This uses the same sign convention as `trimesh.proximity.signed_distance`.
+        """
+        distances = self.distancesTo(points)
+        return numpy.where(self.containsPoints(points), distances, -distances)
+
+
 class DefaultIdentityDict:
     """Dictionary which is the identity map by default.
 
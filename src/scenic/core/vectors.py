@@ -40,6 +40,7 @@ from scenic.core.type_support import (
     canCoerceType,
     coerceToFloat,
     toOrientation,
+    toVector,
 )
 from scenic.core.utils import argsToString, cached_property
 
@@ -112,6 +113,21 @@ class VectorMethodDistribution(VectorDistribution):
         return f"{self.object!r}.{self.method.__name__}({args})"
 
 
+## Fast paths for constant vectors
+
+#: Types of coordinates for which `Vector` skips the `Samplable` machinery.
+_plainNumberTypes = frozenset((int, float, numpy.float64, numpy.int64))
+
+
+def _isConstantOperand(arg):
+    # Cheap conservative test for operands which are definitely not lazy.
+    ty = type(arg)
+    return ty in _plainNumberTypes or (ty is Vector and not arg._isLazy)
+
+
+## Operator decorators
+
+
 def scalarOperator(method):
     """Decorator for vector operators that yield scalars."""
     op = method.__name__
@@ -119,6 +135,8 @@ def scalarOperator(method):
 
     @functools.wraps(method)
     def helper(self, *args, **kwargs):
+        if not kwargs and all(map(_isConstantOperand, args)):  # fast path
+            return method(self, *args)
         if any(needsSampling(arg) for arg in itertools.chain(args, kwargs.values())):
             return MethodDistribution(method, self, args, kwargs)
         else:
@@ -151,6 +169,11 @@ def vectorOperator(method, preservesZero=False, zeroIdentity=False):
 
     @functools.wraps(method)
     def helper(self, *args):
+        # Fast path for constant operands, where simplifying the expression forest
+        # (as below) would not change the result.
+        if not self._isLazy and all(map(_isConstantOperand, args)):
+            return method(self, *args)
+
         # If this operator preserves the zero vector, and we can tell that self
         # is zero, simplify the expression forest.
         if (
@@ -212,8 +235,78 @@ def vectorDistributionMethod(method):
     return helper
 
 
+## Quaternion arithmetic
+#
+# Quaternions are tuples of floats of the form (x, y, z, w), the same convention as
+# SciPy. Plain Python arithmetic is much faster than NumPy or SciPy for single
+# quaternions.
+
+
+def _quatMultiply(a, b):
+    ax, ay, az, aw = a
+    bx, by, bz, bw = b
+    return (
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    )
+
+
+def _quatFromHeading(heading):
+    half = heading / 2
+    return (0.0, 0.0, math.sin(half), math.cos(half))
+
+
+def _quatFromEuler(yaw, pitch, roll):
+    # Intrinsic Z-X-Y rotation, i.e. the product Rz(yaw) * Rx(pitch) * Ry(roll).
+    sy, cy = math.sin(yaw / 2), math.cos(yaw / 2)
+    sp, cp = math.sin(pitch / 2), math.cos(pitch / 2)
+    sr, cr = math.sin(roll / 2), math.cos(roll / 2)
+    return (
+        cy * sp * cr - sy * cp * sr,
+        cy * cp * sr + sy * sp * cr,
+        sy * cp * cr + cy * sp * sr,
+        cy * cp * cr - sy * sp * sr,
+    )
+
+
+def _quatToEuler(quat):
+    # Inverse of `_quatFromEuler`. This is the algorithm of Bernardes & Viollet (2022)
+    # used by SciPy, specialized to the intrinsic Z-X-Y sequence, so the angles match
+    # those of `Rotation.as_euler` up to floating-point rounding (but unlike SciPy, we
+    # do not warn about gimbal lock).
+    x, y, z, w = quat
+    a, b, c, d = w - x, y - z, x + w, -y - z
+    halfSum = math.atan2(b, a)
+    halfDiff = math.atan2(d, c)
+    pitch = 2 * math.atan2(math.hypot(c, d), math.hypot(a, b))
+    if abs(pitch) <= 1e-7:
+        # Gimbal lock: only yaw + roll (or yaw - roll) is determined, so following
+        # SciPy we set the roll to zero.
+        yaw, roll = -2 * halfSum, 0.0
+    elif abs(pitch - math.pi) <= 1e-7:
+        yaw, roll = -2 * halfDiff, 0.0
+    else:
+        yaw, roll = -(halfSum + halfDiff), halfSum - halfDiff
+    pitch -= math.pi / 2
+    return tuple(
+        angle if -math.pi <= angle <= math.pi else (angle + math.pi) % math.tau - math.pi
+        for angle in (yaw, pitch, roll)
+    )
+
+
+#: Maximum number of orientations cached by `Orientation._fromHeading`.
+headingCacheSize = 1024
+
+
 class Orientation:
-    """An orientation in 3D space."""
+    """An orientation in 3D space.
+
+    Orientations are stored as unit quaternions, and most operations on them are
+    implemented directly on the quaternions. An equivalent SciPy `Rotation` is
+    available from `getRotation` for bulk operations such as rotating many points.
+    """
 
     def __init__(self, rotation):
         if not isinstance(rotation, Rotation):
@@ -221,14 +314,35 @@ class Orientation:
                 "Orientation's 'rotation' parameter must be a SciPy rotation."
                 " Perhaps you want to use a factory method?"
             )
-        self.r = rotation
-        self.q = rotation.as_quat()
+        self._quat = tuple(rotation.as_quat().tolist())
+        self._cached_r = rotation
+
+    def __setstate__(self, state):
+        state = dict(state)
+        state.pop("_cached_q", None)  # recomputed as a read-only array
+        if "_quat" not in state:
+            # Orientations pickled by Scenic 3.0 stored the quaternion as a NumPy
+            # array in the ``q`` attribute, alongside a Rotation in ``r``.
+            quat = state.pop("q")
+            state.pop("r", None)
+            state["_quat"] = tuple(numpy.asarray(quat, dtype=float).tolist())
+        self.__dict__.update(state)
+
+    @classmethod
+    def _fromQuat(cls, quat) -> Orientation:
+        # Fast constructor from a unit quaternion given as a tuple of floats.
+        orientation = cls.__new__(cls)
+        orientation._quat = quat
+        return orientation
 
     @classmethod
     def fromQuaternion(cls, quaternion) -> Orientation:
         """Create an `Orientation` from a quaternion (of the form (x,y,z,w))"""
-        r = Rotation.from_quat(quaternion)
-        return cls(r)
+        x, y, z, w = (float(c) for c in quaternion)
+        norm = math.sqrt(x * x + y * y + z * z + w * w)
+        if norm == 0 or not math.isfinite(norm):
+            raise ValueError("Found zero norm quaternions in `quat`.")
+        return cls._fromQuat((x / norm, y / norm, z / norm, w / norm))
 
     @classmethod
     @distributionFunction
@@ -239,30 +353,54 @@ class Orientation:
     @classmethod
     def _fromEuler(cls, yaw, pitch, roll) -> Orientation:
         # Inner version of `fromEuler` which doesn't accept distributions.
-        r = Rotation.from_euler("ZXY", [yaw, pitch, roll], degrees=False)
-        return cls(r)
+        if pitch == 0 and roll == 0:
+            return cls._fromHeading(yaw)
+        return cls._fromQuat(_quatFromEuler(float(yaw), float(pitch), float(roll)))
 
     @classmethod
     def _fromHeading(cls, heading) -> Orientation:
-        # This method is faster than `from_euler` if we only have 1 angle.
-        r = Rotation.from_rotvec([0, 0, heading], degrees=False)
-        return cls(r)
+        # Orientations are immutable, so we can share them between calls with
+        # the same heading (which are common, e.g. for axis-aligned objects).
+        if cls is Orientation:
+            return _cachedHeadingOrientation(heading)
+        return cls._fromQuat(_quatFromHeading(float(heading)))
+
+    @classmethod
+    def _fromHeadings(cls, headings):
+        # Batch version of `_fromHeading`, returning a list of orientations.
+        return [
+            cls._fromQuat(_quatFromHeading(h)) for h in numpy.asarray(headings).tolist()
+        ]
+
+    @cached_property
+    def q(self):
+        """The quaternion representing this orientation, as a NumPy array (x,y,z,w).
+
+        The array is read-only, since orientations are immutable (and may be shared).
+        """
+        q = numpy.array(self._quat)
+        q.setflags(write=False)
+        return q
+
+    @cached_property
+    def r(self):
+        return Rotation.from_quat(self._quat)
 
     @property
     def w(self) -> float:
-        return self.q[3]
+        return self._quat[3]
 
     @property
     def x(self) -> float:
-        return self.q[0]
+        return self._quat[0]
 
     @property
     def y(self) -> float:
-        return self.q[1]
+        return self._quat[1]
 
     @property
     def z(self) -> float:
-        return self.q[2]
+        return self._quat[2]
 
     @property
     def yaw(self) -> float:
@@ -309,7 +447,7 @@ class Orientation:
     @cached_property
     def eulerAngles(self) -> typing.Tuple[float, float, float]:
         """Global intrinsic Euler angles yaw, pitch, roll."""
-        return self.r.as_euler("ZXY", degrees=False)
+        return numpy.array(_quatToEuler(self._quat))
 
     def _trimeshEulerAngles(self):
         return self.r.as_euler("xyz", degrees=False)
@@ -319,7 +457,8 @@ class Orientation:
 
     @cached_property
     def inverse(self) -> Orientation:
-        return Orientation(self.r.inv())
+        x, y, z, w = self._quat
+        return Orientation._fromQuat((-x, -y, -z, w))
 
     @cached_property
     def _inverseRotation(self):
@@ -342,7 +481,7 @@ class Orientation:
             return other
         if other == globalOrientation:
             return self
-        return Orientation(self.r * other.r)
+        return Orientation._fromQuat(_quatMultiply(self._quat, other._quat))
 
     @distributionMethod
     def __add__(self, other) -> Orientation:
@@ -364,7 +503,8 @@ class Orientation:
         return f"Orientation.fromEuler{tuple(self.eulerAngles)!r}"
 
     def __hash__(self):
-        return hash(tuple(self.q)) + hash(tuple(-self.q))
+        x, y, z, w = self._quat
+        return hash(self._quat) + hash((-x, -y, -z, -w))
 
     @distributionFunction
     def localAnglesFor(self, orientation) -> typing.Tuple[float, float, float]:
@@ -373,8 +513,11 @@ class Orientation:
         That is, considering ``self`` as the parent orientation, find the Euler angles
         expressing the given orientation.
         """
-        local = self.inverse * orientation
-        return local.eulerAngles
+        if not isinstance(orientation, Orientation):
+            raise TypeError(f"expected an Orientation, got {orientation!r}")
+        return numpy.array(
+            _quatToEuler(_quatMultiply(self.inverse._quat, orientation._quat))
+        )
 
     @distributionFunction
     def globalToLocalAngles(self, yaw, pitch, roll) -> typing.Tuple[float, float, float]:
@@ -382,30 +525,35 @@ class Orientation:
 
         Equivalent to `localAnglesFor` but takes Euler angles as input.
         """
-        orientation = Orientation.fromEuler(yaw, pitch, roll)
+        orientation = Orientation._fromEuler(yaw, pitch, roll)
         return self.localAnglesFor(orientation)
 
     def __eq__(self, other):
         if not isinstance(other, Orientation):
             return NotImplemented
-        return numpy.array_equal(self.q, other.q) or numpy.array_equal(self.q, -other.q)
+        q, (x, y, z, w) = self._quat, other._quat
+        return q == (x, y, z, w) or q == (-x, -y, -z, -w)
 
     def approxEq(self, other, tol=1e-10):
         if not isinstance(other, Orientation):
             return NotImplemented
-        return abs(numpy.dot(self.q, other.q)) > 1 - tol
+        ax, ay, az, aw = self._quat
+        bx, by, bz, bw = other._quat
+        return abs(ax * bx + ay * by + az * bz + aw * bw) > 1 - tol
 
     @classmethod
     def encodeTo(cls, orientation, stream):
-        stream.write(struct.pack("<dddd", *orientation.q))
+        stream.write(struct.pack("<dddd", *orientation._quat))
 
     @classmethod
     def decodeFrom(cls, stream):
-        # Quaternion constructor does not roundtrip so we manually
-        # construct a rotation and pass that in.
-        quaternion = struct.unpack("<dddd", stream.read(32))
-        rotation = Rotation(quaternion, normalize=False)
-        return cls(rotation)
+        # Bypass normalization so that the quaternion roundtrips exactly.
+        return cls._fromQuat(struct.unpack("<dddd", stream.read(32)))
+
+
+@functools.lru_cache(maxsize=headingCacheSize)
+def _cachedHeadingOrientation(heading):
+    return Orientation._fromQuat(_quatFromHeading(float(heading)))
 
 
 globalOrientation = Orientation.fromEuler(0, 0, 0)
@@ -425,9 +573,20 @@ def alwaysGlobalOrientation(orientation):
 class Vector(Samplable, collections.abc.Sequence):
     """A 3D vector, whose coordinates can be distributions."""
 
+    # Defaults for constant vectors; see `__init__`.
+    _dependencies = ()
+    _requiredProperties = ()
+    _needsSampling = _needsLazyEval = _isLazy = False
+
     def __init__(self, x, y, z=0):
         self.coordinates = (x, y, z)
-        super().__init__(self.coordinates)
+        plain = _plainNumberTypes
+        if type(x) in plain and type(y) in plain and type(z) in plain:
+            # Fast path for constant vectors: the class attributes above already
+            # record that the vector has no dependencies.
+            self._conditioned = self
+        else:
+            super().__init__(self.coordinates)
 
     @property
     def x(self) -> float:
@@ -542,6 +701,8 @@ class Vector(Samplable, collections.abc.Sequence):
 
     @scalarOperator
     def norm(self) -> float:
+        if not self._isLazy:
+            return math.hypot(*self.coordinates)
         return hypot(*self.coordinates)
 
     @scalarOperator
@@ -572,30 +733,36 @@ class Vector(Samplable, collections.abc.Sequence):
 
     @zeroIdentityVectorOperator
     def __add__(self, other) -> Vector:
-        return Vector(self[0] + other[0], self[1] + other[1], self[2] + other[2])
+        x, y, z = self.coordinates
+        return Vector(x + other[0], y + other[1], z + other[2])
 
     @zeroIdentityVectorOperator
     def __radd__(self, other) -> Vector:
-        return Vector(self[0] + other[0], self[1] + other[1], self[2] + other[2])
+        x, y, z = self.coordinates
+        return Vector(x + other[0], y + other[1], z + other[2])
 
     @zeroIdentityVectorOperator
     def __sub__(self, other) -> Vector:
-        return Vector(self[0] - other[0], self[1] - other[1], self[2] - other[2])
+        x, y, z = self.coordinates
+        return Vector(x - other[0], y - other[1], z - other[2])
 
     @vectorOperator
     def __rsub__(self, other) -> Vector:
-        return Vector(other[0] - self[0], other[1] - self[1], other[2] - self[2])
+        x, y, z = self.coordinates
+        return Vector(other[0] - x, other[1] - y, other[2] - z)
 
     @vectorOperator
     def __mul__(self, other) -> Vector:
-        return Vector(*(coord * other for coord in self.coordinates))
+        x, y, z = self.coordinates
+        return Vector(x * other, y * other, z * other)
 
     def __rmul__(self, other) -> Vector:
         return self.__mul__(other)
 
     @vectorOperator
     def __truediv__(self, other) -> Vector:
-        return Vector(*(coord / other for coord in self.coordinates))
+        x, y, z = self.coordinates
+        return Vector(x / other, y / other, z / other)
 
     def __len__(self):
         return len(self.coordinates)
@@ -679,34 +846,106 @@ class VectorField:
             This is an upper bound: more steps will be taken as needed to ensure that no
             single step is longer than this value, but if the distance to travel is small
             then the steps may be smaller.
+        followMethod (str): Default integration method for `followFrom`; default
+            ``"euler"``.
     """
 
-    def __init__(self, name, value, minSteps=4, defaultStepSize=5):
+    def __init__(self, name, value, minSteps=4, defaultStepSize=5, followMethod="euler"):
         self.name = name
         self.value = value
         self.valueType = Orientation
         self.minSteps = minSteps
         self.defaultStepSize = defaultStepSize
+        self.followMethod = followMethod
 
     @distributionMethod
     def __getitem__(self, pos) -> Orientation:
         val = self.value(pos)
         if isinstance(val, numbers.Real):  # fast path
             return Orientation._fromHeading(val)
+        return self._toOrientation(val)
+
+    def _toOrientation(self, val):
         if isLazy(val):
             raise ValueError(f"value function of {self.name} returned lazy value")
         return toOrientation(
             val, f"value function of {self.name} returned non-orientation"
         )
 
+    ## Batch evaluation
+
+    def valuesAt(self, points):
+        """Evaluate the field's value function at many points at once.
+
+        Subclasses may override this to avoid a Python-level loop over the points.
+
+        Arguments:
+            points: a sequence of points, or an array of shape ``(N, 2)`` or ``(N, 3)``.
+
+        Returns:
+            A list of the raw values (headings or orientations) at each point.
+        """
+        return [self.value(Vector(*point)) for point in _pointArray(points)]
+
+    def headingsAt(self, points):
+        """Get the headings (yaw angles) of the field at many points at once.
+
+        Arguments:
+            points: a sequence of points, or an array of shape ``(N, 2)`` or ``(N, 3)``.
+
+        Returns:
+            An array of shape ``(N,)``. Like the yaw of ``field[point]``, the
+            headings are normalized to lie between -π and π.
+        """
+        headings = numpy.array(
+            [
+                val if isinstance(val, numbers.Real) else self._toOrientation(val).yaw
+                for val in self.valuesAt(points)
+            ],
+            dtype=float,
+        )
+        return _normalizeAngles(headings)
+
+    def orientationsAt(self, points):
+        """Get the orientations of the field at many points at once.
+
+        Arguments:
+            points: a sequence of points, or an array of shape ``(N, 2)`` or ``(N, 3)``.
+
+        Returns:
+            A list of `Orientation` objects.
+        """
+        values = self.valuesAt(points)
+        numeric = [i for i, val in enumerate(values) if isinstance(val, numbers.Real)]
+        orientations = [None] * len(values)
+        headings = numpy.array([values[i] for i in numeric], dtype=float)
+        for i, orientation in zip(numeric, Orientation._fromHeadings(headings)):
+            orientations[i] = orientation
+        for i, val in enumerate(values):
+            if orientations[i] is None:
+                orientations[i] = self._toOrientation(val)
+        return orientations
+
     @vectorDistributionMethod
-    def followFrom(self, pos, dist, steps=None, stepSize=None):
+    def followFrom(
+        self, pos, dist, steps=None, stepSize=None, method=None, tolerance=1e-3
+    ):
         """Follow the field from a point for a given distance.
 
-        Uses the forward Euler approximation, covering the given distance with
-        equal-size steps. The number of steps can be given manually, or computed
+        By default, uses the forward Euler approximation, covering the given distance
+        with equal-size steps. The number of steps can be given manually, or computed
         automatically from a desired step size.
 
+        The following integration methods are available:
+
+        * ``"euler"``: forward Euler, as above.
+        * ``"rk4"``: the classical fourth-order Runge-Kutta method, with the same steps.
+        * ``"adaptive"``: fourth-order Runge-Kutta with step doubling, adjusting the
+          step size to keep the estimated error of each step below **tolerance**. The
+          step size computed as above is used as the initial step size.
+        * ``"exact"``: follow the field exactly, for fields which support it (e.g.
+          `PolygonalVectorField`).
+
         Arguments:
             pos (`Vector`): point to start from.
             dist (float): distance to travel.
@@ -714,7 +953,12 @@ class VectorField:
                 steps based on the distance (default :obj:`None`).
             stepSize (float): length used to compute how many steps to take, or
                 :obj:`None` to use the field's default step size.
+            method (str): integration method, or :obj:`None` to use the field's
+                **followMethod**.
+            tolerance (float): maximum error per step for the ``"adaptive"`` method.
         """
+        if method is None:
+            method = self.followMethod
         if steps is None:
             steps = self.minSteps
             stepSize = self.defaultStepSize if stepSize is None else stepSize
@@ -722,13 +966,57 @@ class VectorField:
                 steps = max(steps, math.ceil(dist / stepSize))
 
         stepSize = dist / steps
-        step = numpy.array([0, stepSize, 0])
-        for i in range(steps):
-            rot = self[pos].getRotation()
-            pos += rot.apply(step)
+        pos = numpy.array(pos, dtype=float)
+        if method == "euler":
+            for i in range(steps):
+                pos += stepSize * self._directionAt(pos)
+        elif method == "rk4":
+            for i in range(steps):
+                pos = self._rk4Step(pos, stepSize)
+        elif method == "adaptive":
+            pos = self._followAdaptive(pos, dist, stepSize, tolerance)
+        elif method == "exact":
+            pos = self._followExact(pos, dist, stepSize)
+        else:
+            raise ValueError(f"unknown integration method {method!r}")
 
         return Vector(*pos)
 
+    def _directionAt(self, pos):
+        """Unit vector pointing along the field at the given point (an array)."""
+        val = self.value(Vector(*pos))
+        if isinstance(val, numbers.Real):  # fast path avoiding a SciPy rotation
+            return numpy.array([-math.sin(val), math.cos(val), 0])
+        return self._toOrientation(val).getRotation().apply((0, 1, 0))
+
+    def _rk4Step(self, pos, h):
+        k1 = self._directionAt(pos)
+        k2 = self._directionAt(pos + (h / 2) * k1)
+        k3 = self._directionAt(pos + (h / 2) * k2)
+        k4 = self._directionAt(pos + h * k3)
+        return pos + (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    def _followAdaptive(self, pos, dist, stepSize, tolerance):
+        remaining = abs(dist)
+        sign = 1 if dist >= 0 else -1
+        h = abs(stepSize) if stepSize else remaining
+        minStep = 1e-9 * max(1, remaining)
+        while remaining > minStep:
+            h = min(h, remaining)
+            full = self._rk4Step(pos, sign * h)
+            half = self._rk4Step(pos, sign * h / 2)
+            halves = self._rk4Step(half, sign * h / 2)
+            error = numpy.linalg.norm(halves - full) / 15
+            if error <= tolerance or h <= minStep:
+                pos = halves + (halves - full) / 15  # Richardson extrapolation
+                remaining -= h
+            factor = 5 if error == 0 else 0.9 * (tolerance / error) ** 0.2
+            h *= min(5, max(0.2, factor))
+        return pos
+
+    def _followExact(self, pos, dist, stepSize):
+        raise ValueError(f"{self} does not support exact integration")
+
     @staticmethod
     def forUnionOf(regions, tolerance=0):
         """Creates a `PiecewiseVectorField` from the union of the given regions.
@@ -747,6 +1035,11 @@ class VectorField:
 class PolygonalVectorField(VectorField):
     """A piecewise-constant vector field defined over polygonal cells.
 
+    Since the field is constant within each cell, it supports the ``"exact"``
+    integration method of `followFrom`: this moves in a straight line to the boundary
+    of each cell in turn, only taking numerical steps in cells whose headings are
+    given by **headingFunction**. Like other fields, it uses Euler steps by default.
+
     Arguments:
         name (str): name for debugging.
         cells: a sequence of cells, with each cell being a pair consisting of a Shapely
@@ -756,9 +1049,17 @@ class PolygonalVectorField(VectorField):
             specified headings, if any (default :obj:`None`).
         defaultHeading: heading for points not contained in any cell (default
             :obj:`None`, meaning reject such points).
+        followMethod (str): default integration method for `followFrom` (default
+            ``"euler"``).
     """
 
-    def __init__(self, name, cells, headingFunction=None, defaultHeading=None):
+    #: Distance by which `followFrom` steps past a cell boundary, so that the next
+    #: cell is found unambiguously.
+    boundaryNudge = 1e-7
+
+    def __init__(
+        self, name, cells, headingFunction=None, defaultHeading=None, followMethod="euler"
+    ):
         self.cells = tuple(cells)
         if headingFunction is None and defaultHeading is not None:
             headingFunction = lambda pos: defaultHeading
@@ -768,7 +1069,26 @@ class PolygonalVectorField(VectorField):
                 raise RuntimeError(f"missing heading for cell of PolygonalVectorField")
         self.defaultHeading = defaultHeading
         self.rtree = shapely.STRtree([cell[0] for cell in self.cells])
-        super().__init__(name, self.valueAt)
+        super().__init__(name, self.valueAt, followMethod=followMethod)
+
+    @cached_property
+    def _cellHeadings(self):
+        """Headings of the cells, with NaN for cells without a specified heading."""
+        return numpy.array(
+            [numpy.nan if heading is None else heading for _, heading in self.cells],
+            dtype=float,
+        )
+
+    def _cellsAt(self, points):
+        """Index of the first cell containing each point, or ``len(cells)`` if none."""
+        query = shapely.points(points[:, :2])
+        pointIndices, cellIndices = self.rtree.query(query, predicate="intersects")
+        first = numpy.full(len(points), len(self.cells))
+        numpy.minimum.at(first, pointIndices, cellIndices)
+        missing = first == len(self.cells)
+        if self.defaultHeading is None and missing.any():
+            raise RejectionException(f"evaluated PolygonalVectorField at undefined point")
+        return first, missing
 
     def valueAt(self, pos):
         point = makeShapelyPoint(pos)
@@ -781,6 +1101,96 @@ class PolygonalVectorField(VectorField):
             return self.defaultHeading
         raise RejectionException(f"evaluated PolygonalVectorField at undefined point")
 
+    def _followExact(self, pos, dist, stepSize):
+        sign = 1 if dist >= 0 else -1
+        remaining = abs(dist)
+        stalled = False
+        while remaining > 0:
+            first, missing = self._cellsAt(pos[numpy.newaxis])
+            index = first[0]
+            heading = self.defaultHeading if missing[0] else self.cells[index][1]
+            if not isinstance(heading, numbers.Real):
+                # Heading varies within the cell: take a numerical step instead.
+                h = min(abs(stepSize), remaining) if stepSize else remaining
+                pos = self._rk4Step(pos, sign * h)
+                remaining -= h
+                continue
+            direction = sign * numpy.array([-math.sin(heading), math.cos(heading), 0])
+            travel = self._distanceInCell(pos, direction, index, remaining)
+            if travel <= 2 * self.boundaryNudge:
+                if stalled:
+                    # Adjacent cells point into each other, so there is no exact flow
+                    # to follow; take an ordinary Euler step across the boundary.
+                    travel = min(abs(stepSize), remaining)
+                stalled = True
+            else:
+                stalled = False
+            pos = pos + travel * direction
+            remaining -= travel
+        return pos
+
+    def _distanceInCell(self, pos, direction, index, limit):
+        """Distance along a ray before the cell governing the field changes.
+
+        Points are governed by the first cell containing them, so the governing cell
+        changes when the ray leaves cell **index** or enters an earlier cell.
+        """
+        start = pos[:2]
+        ray = shapely.geometry.LineString([start, start + limit * direction[:2]])
+        travel = limit
+        for other in self.rtree.query(ray, predicate="intersects"):
+            if other > index:
+                continue
+            overlap = self.cells[other][0].intersection(ray)
+            for part in shapely.get_parts(overlap):
+                coords = numpy.asarray(part.coords)[:, :2]
+                offsets = (coords - start) @ direction[:2]
+                low, high = offsets.min(), offsets.max()
+                if other == index:
+                    if low <= self.boundaryNudge:
+                        travel = min(travel, high)
+                elif low > 0 and high - low > self.boundaryNudge:
+                    travel = min(travel, low)
+        return min(limit, max(travel, 0) + self.boundaryNudge)
+
+    def valuesAt(self, points):
+        points = _pointArray(points)
+        first, missing = self._cellsAt(points)
+        values = []
+        for point, index, isMissing in zip(points, first, missing):
+            if isMissing:
+                values.append(self.defaultHeading)
+                continue
+            heading = self.cells[index][1]
+            if heading is None:
+                heading = self.headingFunction(Vector(*point))
+            values.append(heading)
+        return values
+
+    def headingsAt(self, points):
+        points = _pointArray(points)
+        first, missing = self._cellsAt(points)
+        headings = numpy.empty(len(points))
+        headings[~missing] = self._cellHeadings[first[~missing]]
+        # Fall back to the general path for points needing the heading function
+        # or the default heading, which may not be plain numbers.
+        slow = missing | numpy.isnan(headings)
+        if slow.any():
+            rest = numpy.flatnonzero(slow)
+            values = [
+                (
+                    self.defaultHeading
+                    if missing[i]
+                    else self.headingFunction(Vector(*points[i]))
+                )
+                for i in rest
+            ]
+            headings[rest] = [
+                val if isinstance(val, numbers.Real) else self._toOrientation(val).yaw
+                for val in values
+            ]
+        return _normalizeAngles(headings)
+
 
 class PiecewiseVectorField(VectorField):
     """A vector field defined by patching together several regions.
@@ -792,6 +1202,9 @@ class PiecewiseVectorField(VectorField):
     to find a region "containing" the point, then we return the **defaultHeading**, if
     any, and otherwise reject the scene.
 
+    Regions with bounded extent are indexed by their bounding boxes in the XY plane,
+    so that only regions near the point need to be checked.
+
     Arguments:
         name (str): name for debugging.
         regions (sequence of `Region` objects): the regions making up the field.
@@ -807,18 +1220,150 @@ class PiecewiseVectorField(VectorField):
         self.defaultHeading = defaultHeading
         super().__init__(name, self.valueAt)
 
+    @cached_property
+    def _index(self):
+        """STRtree over the bounded regions, plus the indices of unbounded ones.
+
+        Returns a triple ``(tree, indexed, unbounded)``, where ``indexed`` maps
+        positions in the tree to indices into `regions`.
+        """
+        boxes, indexed, unbounded = [], [], []
+        for i, region in enumerate(self.regions):
+            bounds = self._boundsOf(region)
+            if bounds is None:
+                unbounded.append(i)
+            else:
+                boxes.append(shapely.box(*bounds))
+                indexed.append(i)
+        return shapely.STRtree(boxes), numpy.array(indexed, dtype=int), tuple(unbounded)
+
+    @staticmethod
+    def _boundsOf(region):
+        try:
+            (xmin, ymin, _), (xmax, ymax, _) = region.AABB
+        except (TypeError, ValueError, NotImplementedError):
+            return None
+        bounds = (xmin, ymin, xmax, ymax)
+        if not all(isinstance(b, numbers.Real) and math.isfinite(b) for b in bounds):
+            return None
+        return bounds
+
+    def _candidates(self, point, distance=0):
+        """Indices of regions which may be within the given distance of a point."""
+        tree, indexed, unbounded = self._index
+        x, y = point[0], point[1]
+        query = shapely.box(x - distance, y - distance, x + distance, y + distance)
+        hits = indexed[tree.query(query)]
+        if unbounded:
+            hits = numpy.concatenate((hits, unbounded))
+        hits.sort()
+        return hits
+
     def valueAt(self, point):
-        for region in self.regions:
+        point = toVector(point)
+        for i in self._candidates(point):
+            region = self.regions[i]
             if region.containsPoint(point):
                 return region.orientation[point]
         if self.tolerance > 0:
-            for region in self.regions:
+            for i in self._candidates(point, self.tolerance):
+                region = self.regions[i]
                 if region.distanceTo(point) <= self.tolerance:
                     return region.orientation[point]
         if self.defaultHeading is not None:
             return self.defaultHeading
         raise RejectionException(f"evaluated PiecewiseVectorField at undefined point")
 
+    def valuesAt(self, points):
+        """Evaluate the field at many points at once.
+
+        Equivalent to calling `valueAt` on each point, but queries the spatial index
+        in bulk and uses batch containment tests for regions which support them.
+
+        Arguments:
+            points: a sequence of points, or an array of shape ``(N, 2)`` or ``(N, 3)``.
+
+        Returns:
+            A list of the values at each point.
+        """
+        points = _pointArray(points)
+        values = [None] * len(points)
+        unresolved = numpy.ones(len(points), dtype=bool)
+
+        def resolve(distance, test):
+            tree, indexed, unbounded = self._index
+            x, y = points[:, 0], points[:, 1]
+            queries = shapely.box(x - distance, y - distance, x + distance, y + distance)
+            pointIndices, treeIndices = tree.query(queries)
+            regionIndices = indexed[treeIndices]
+            order = numpy.argsort(regionIndices, kind="stable")
+            regionIndices, pointIndices = regionIndices[order], pointIndices[order]
+            starts = numpy.searchsorted(regionIndices, numpy.arange(len(self.regions)))
+            ends = numpy.searchsorted(
+                regionIndices, numpy.arange(len(self.regions)), side="right"
+            )
+            allPoints = numpy.arange(len(points))
+            unbounded = set(unbounded)
+            for i, region in enumerate(self.regions):
+                if i in unbounded:
+                    candidates = allPoints
+                else:
+                    candidates = pointIndices[starts[i] : ends[i]]
+                candidates = candidates[unresolved[candidates]]
+                if len(candidates) == 0:
+                    continue
+                hits = candidates[test(region, points[candidates])]
+                for j in hits:
+                    values[j] = region.orientation[Vector(*points[j])]
+                unresolved[hits] = False
+
+        resolve(0, _containsPoints)
+        if self.tolerance > 0 and unresolved.any():
+            resolve(
+                self.tolerance,
+                lambda region, pts: _distancesTo(region, pts) <= self.tolerance,
+            )
+        if unresolved.any():
+            if self.defaultHeading is None:
+                raise RejectionException(
+                    f"evaluated PiecewiseVectorField at undefined point"
+                )
+            for j in numpy.flatnonzero(unresolved):
+                values[j] = self.defaultHeading
+        return values
+
+
+def _normalizeAngles(angles):
+    """Apply `normalizeAngle` to an array of angles, in place."""
+    outside = numpy.abs(angles) > math.pi
+    if outside.any():
+        angles[outside] = [normalizeAngle(angle) for angle in angles[outside]]
+    return angles
+
+
+def _pointArray(points):
+    """Convert a sequence of points to an array of shape ``(N, 3)``."""
+    if isinstance(points, numpy.ndarray):
+        points = numpy.asarray(points, dtype=float)
+    else:
+        points = numpy.array([toVector(p).coordinates for p in points], dtype=float)
+    points = points.reshape(len(points), -1)
+    if points.shape[1] == 2:
+        points = numpy.column_stack((points, numpy.zeros(len(points))))
+    return points
+
+
+def _containsPoints(region, points):
+    if hasattr(region, "containsPoints"):
+        return numpy.asarray(region.containsPoints(points), dtype=bool)
+    return numpy.array([region.containsPoint(Vector(*p)) for p in points], dtype=bool)
+
+
+def _distancesTo(region, points):
+    if hasattr(region, "distancesTo"):
+        return numpy.asarray(region.distancesTo(points), dtype=float)
+    return numpy.array([region.distanceTo(Vector(*p)) for p in points], dtype=float)
+
 
 class PolyhedronVectorField(VectorField):
     pass
@@ -26,6 +26,7 @@ from typing import FrozenSet, List, Optional, Sequence, Tuple, Union
 import weakref
 
 import attr
+import numpy
 import shapely
 from shapely.geometry import MultiPolygon, Polygon
 
@@ -39,7 +40,7 @@ from scenic.core.object_types import Point
 from scenic.core.regions import PolygonalRegion, PolylineRegion
 import scenic.core.type_support as type_support
 import scenic.core.utils as utils
-from scenic.core.vectors import Orientation, Vector, VectorField
+from scenic.core.vectors import Orientation, PolygonalVectorField, Vector, VectorField
 import scenic.syntax.veneer as veneer
 from scenic.syntax.veneer import verbosePrint
 
@@ -341,6 +342,74 @@ class LinearElement(NetworkElement):
         start, end = self.centerline.nearestSegmentTo(point)
         return start.angleTo(end)
 
+    def _headingCells(self):
+        """Split this element into cells on which `_defaultHeadingAt` is constant.
+
+        Returns a list of pairs of Shapely polygons and headings, one or more for each
+        segment of the centerline. The cells are bounded by rays from the vertices of the
+        centerline: on the inside of a turn we use the angle bisector, and on the outside
+        the normal of the following segment (points there project onto the vertex, which
+        `PolylineRegion.nearestSegmentTo` assigns to the earlier segment). If these rays
+        cross before leaving the element, as can happen on sharp curves, the cell is
+        given heading :obj:`None` so that the heading is computed exactly instead.
+
+        :meta private:
+        """
+        points = numpy.array(self.centerline.lineString.coords)[:, :2]
+        distinct = numpy.any(points[1:] != points[:-1], axis=1)
+        points = points[numpy.concatenate(((True,), distinct))]
+        if len(points) < 2:
+            return []
+        polygon = self.polygon
+        segments = points[1:] - points[:-1]
+        headings = numpy.arctan2(segments[:, 1], segments[:, 0]) - (math.pi / 2)
+        tangents = segments / numpy.linalg.norm(segments, axis=1)[:, numpy.newaxis]
+        normals = numpy.stack((-tangents[:, 1], tangents[:, 0]), axis=1)
+
+        # Rays must be long enough to reach every point of the element.
+        boundary = shapely.points(shapely.get_coordinates(polygon.boundary))
+        reach = 2 * max(1, shapely.distance(self.centerline.lineString, boundary).max())
+
+        leftRays = numpy.empty_like(points)
+        rightRays = numpy.empty_like(points)
+        leftRays[0], rightRays[0] = normals[0], -normals[0]
+        leftRays[-1], rightRays[-1] = normals[-1], -normals[-1]
+        for i in range(1, len(points) - 1):
+            bisector = normals[i - 1] + normals[i]
+            norm = numpy.linalg.norm(bisector)
+            bisector = normals[i] if norm < 1e-9 else bisector / norm
+            before, after = tangents[i - 1], tangents[i]
+            if before[0] * after[1] - before[1] * after[0] > 0:  # turning left
+                leftRays[i], rightRays[i] = bisector, -normals[i]
+            else:
+                leftRays[i], rightRays[i] = normals[i], -bisector
+        leftRays *= reach
+        rightRays *= reach
+
+        cells = []
+        for i, heading in enumerate(headings):
+            a, b = points[i], points[i + 1]
+            wedge = Polygon(
+                (
+                    a + leftRays[i],
+                    a,
+                    a + rightRays[i],
+                    b + rightRays[i + 1],
+                    b,
+                    b + leftRays[i + 1],
+                )
+            )
+            if wedge.is_valid:
+                heading = geometry.normalizeAngle(float(heading))
+            else:
+                wedge = shapely.make_valid(wedge)
+                heading = None
+            piece = wedge.intersection(polygon)
+            for cell in getattr(piece, "geoms", (piece,)):
+                if isinstance(cell, Polygon) and not cell.is_empty:
+                    cells.append((cell, heading))
+        return cells
+
     @distributionFunction
     def flowFrom(
         self,
@@ -949,14 +1018,18 @@ class Network:
                     edges.append(road.backwardLanes.curb)
             self.curbRegion = PolylineRegion.unionAll(edges)
 
-        if self.roadDirection is None:
-            # TODO replace with a PolygonalVectorField for better pruning
-            self.roadDirection = VectorField("roadDirection", self._defaultRoadDirection)
-
         # Build R-tree for faster lookup of roads, etc. at given points
         self._uidForIndex = tuple(self.elements)
         self._rtree = shapely.STRtree([elem.polygons for elem in self.elements.values()])
 
+        if self.roadDirection is None:
+            self.roadDirection = PolygonalVectorField(
+                "roadDirection",
+                self._roadDirectionCells(),
+                headingFunction=self._defaultRoadDirection,
+                defaultHeading=0,
+            )
+
     def _defaultRoadDirection(self, point):
         """Default value for the `roadDirection` vector field.
 
@@ -966,6 +1039,32 @@ class Network:
         road = self.roadAt(point)
         return 0 if road is None else road.orientation[point]
 
+    def _roadDirectionCells(self):
+        """Cells of the `PolygonalVectorField` used for `roadDirection`.
+
+        The cells of each road are listed in the same order as `allRoads`, so that where
+        roads overlap (e.g. in intersections) we pick the same road as `roadAt`. Within
+        a road, lane sections are split up using `LinearElement._headingCells`; the
+        road's own polygon comes last, with no fixed heading, to cover any points not in
+        a lane (and roads whose orientation has been customized). Points within
+        `tolerance` of a road are handled by a final such cell.
+
+        :meta private:
+        """
+        cells = []
+        for road in self.allRoads:
+            elems = itertools.chain((road,), road.laneGroups, road.lanes)
+            if all(elem.orientation.value == elem._defaultHeadingAt for elem in elems):
+                for lane in road.lanes:
+                    for section in lane.sections:
+                        cells.extend(section._headingCells())
+            cells.extend((poly, None) for poly in road.polygons.geoms)
+        if self.tolerance > 0:
+            for road in self.allRoads:
+                nearby = road.buffer(self.tolerance).polygons
+                cells.extend((poly, None) for poly in nearby.geoms)
+        return cells
+
     #: File extension for cached versions of processed networks.
     pickledExt = ".snet"
 
@@ -981,7 +1080,7 @@ class Network:
 
         :meta private:
         """
-        return 33
+        return 34
 
     class DigestMismatchError(Exception):
         """Exception raised when loading a cached map not matching the original file."""
@@ -3,31 +3,27 @@
 from cmath import atan, pi, tan
 import math
 from math import copysign, degrees, radians, sin
+import operator
 import os
 import pathlib
 import statistics
 import time
 
-from PIL import Image
 import numpy as np
-
-import scenic.core.errors as errors  # isort: skip
-
-if errors.verbosityLevel == 0:  # suppress pygame advertisement at zero verbosity
-    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
-import pygame
 import shapely
 
+import scenic.core.errors as errors
 from scenic.core.geometry import allChains, findMinMax
 from scenic.core.regions import toPolygon
 from scenic.core.simulators import SimulationCreationError
-from scenic.core.vectors import Orientation, Vector
+from scenic.core.vectors import Orientation, Vector, toVector
 from scenic.domains.driving.controllers import (
     PIDLateralController,
     PIDLongitudinalController,
 )
 from scenic.domains.driving.roads import Network
 from scenic.domains.driving.simulators import DrivingSimulation, DrivingSimulator
+from scenic.simulators.utils.video import openVideoWriter
 from scenic.syntax.veneer import verbosePrint
 
 current_dir = pathlib.Path(__file__).parent.absolute()
@@ -45,12 +41,33 @@ SIDEWALK_COLOR = (0, 128, 255)
 SHOULDER_COLOR = (96, 96, 96)
 
 
+def _importPygame():
+    # pygame is slow to import and only needed for rendering, so load it on demand.
+    if errors.verbosityLevel == 0:  # suppress pygame advertisement at zero verbosity
+        os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+    import pygame
+
+    return pygame
+
+
+_getControls = operator.attrgetter("throttle", "brake", "hand_brake", "reverse", "steer")
+
+
 class NewtonianSimulator(DrivingSimulator):
     """Implementation of `Simulator` for the Newtonian simulator.
 
     Args:
         network (Network): road network to display in the background, if any.
         render (bool): whether to render the simulation in a window.
+        debug_render (bool): whether to draw the bounding boxes of cars as well.
+        export_gif (bool): whether to save the rendered simulation to the file
+            :file:`simulation.gif` (if **render** is true).
+        headless (bool): whether to render into an offscreen surface instead of a
+            window. Headless simulations run as fast as possible, rather than being
+            slowed down to real time.
+        video (str): path of a GIF (:file:`.gif`) or MP4 (:file:`.mp4`) file to which
+            the rendered simulation should be saved; implies **render**. Frames are
+            written as they are rendered, so long simulations do not use more memory.
 
     .. versionchanged:: 3.0
 
@@ -59,34 +76,70 @@ class NewtonianSimulator(DrivingSimulator):
         when not otherwise specified is still 0.1 seconds.
     """
 
-    def __init__(self, network=None, render=False, debug_render=False, export_gif=False):
+    def __init__(
+        self,
+        network=None,
+        render=False,
+        debug_render=False,
+        export_gif=False,
+        headless=False,
+        video=None,
+    ):
         super().__init__()
         self.export_gif = export_gif
         self.render = render
         self.debug_render = debug_render
         self.network = network
+        self.headless = headless
+        self.video = video
 
     def createSimulation(self, scene, **kwargs):
-        simulation = NewtonianSimulation(
-            scene, self.network, self.render, self.export_gif, self.debug_render, **kwargs
+        return NewtonianSimulation(
+            scene,
+            self.network,
+            self.render,
+            self.export_gif,
+            self.debug_render,
+            headless=self.headless,
+            video=self.video,
+            **kwargs,
         )
-        if self.export_gif and self.render:
-            simulation.generate_gif("simulation.gif")
-        return simulation
 
 
 class NewtonianSimulation(DrivingSimulation):
-    """Implementation of `Simulation` for the Newtonian simulator."""
+    """Implementation of `Simulation` for the Newtonian simulator.
+
+    The dynamic state of all objects (positions, velocities, headings, and speeds) is
+    stored in NumPy arrays with one row per object, so that each time step updates every
+    object with a few vectorized operations. The Scenic objects only see this state
+    through `getProperties`; changes made to them by actions (e.g. `SetVelocityAction`)
+    are copied back into the arrays at the start of the next step.
+    """
 
     def __init__(
-        self, scene, network, render, export_gif, debug_render, timestep, **kwargs
+        self,
+        scene,
+        network,
+        render,
+        export_gif,
+        debug_render,
+        timestep,
+        headless=False,
+        video=None,
+        **kwargs,
     ):
+        if video is None and export_gif and render:
+            video = "simulation.gif"
         self.export_gif = export_gif
-        self.render = render
+        self.render = render or video is not None
+        self.headless = headless
+        self.video = video
         self.network = network
         self.screen = None
-        self.frames = []
+        self.pygame = None  # imported in setup if rendering
+        self._videoWriter = None
         self.debug_render = debug_render
+        self._objectIndices = None  # state arrays are built once the objects exist
 
         if timestep is None:
             timestep = 0.1
@@ -95,17 +148,24 @@ class NewtonianSimulation(DrivingSimulation):
 
     def setup(self):
         super().setup()
+        self._loadState()
 
         if self.render:
             # determine window size
             min_x, max_x = findMinMax(obj.x for obj in self.objects)
             min_y, max_y = findMinMax(obj.y for obj in self.objects)
 
-            pygame.init()
-            pygame.font.init()
-            self.screen = pygame.display.set_mode(
-                (WIDTH, HEIGHT), pygame.HWSURFACE | pygame.DOUBLEBUF
-            )
+            self.pygame = pygame = _importPygame()
+            if self.headless:
+                self.screen = pygame.Surface((WIDTH, HEIGHT))
+            else:
+                pygame.init()
+                pygame.font.init()
+                self.screen = pygame.display.set_mode(
+                    (WIDTH, HEIGHT), pygame.HWSURFACE | pygame.DOUBLEBUF
+                )
+            if self.video is not None:
+                self._videoWriter = openVideoWriter(self.video, fps=1 / self.timestep)
             self.screen.fill((255, 255, 255))
             x, y, _ = self.objects[0].position
             self.min_x, self.max_x = min_x - 40, max_x + 40
@@ -190,43 +250,120 @@ class NewtonianSimulation(DrivingSimulation):
         if hasattr(obj, "elevation"):
             obj.elevation = 0.0
 
+        # Make sure the new object gets a row in the state arrays.
+        self._objectIndices = None
+
+    def _loadState(self):
+        """Build the state arrays from the current properties of all objects."""
+        objects = self.objects
+        n = len(objects)
+        self._objectIndices = {id(obj): i for i, obj in enumerate(objects)}
+        self._positions = np.array(
+            [tuple(toVector(obj.position)) for obj in objects], dtype=float
+        ).reshape(n, 3)
+        self._velocities = np.array(
+            [tuple(toVector(obj.velocity)) for obj in objects], dtype=float
+        ).reshape(n, 3)
+        self._headings = np.fromiter((obj.heading for obj in objects), float, n)
+        self._angularSpeeds = np.fromiter((obj.angularSpeed for obj in objects), float, n)
+        self._speeds = np.fromiter((obj.speed for obj in objects), float, n)
+        # Objects with controls (throttle, steering, etc.) as opposed to ones which
+        # simply move with constant velocity.
+        self._controlled = np.array(
+            [i for i, obj in enumerate(objects) if hasattr(obj, "hand_brake")], dtype=int
+        )
+        self._lengths = np.array(
+            [objects[i].length for i in self._controlled], dtype=float
+        )
+        self._positionViews = [obj.position for obj in objects]
+        self._velocityViews = [obj.velocity for obj in objects]
+        self._exportState()
+
+    def _syncState(self):
+        """Copy any changes made to the objects since the last step into the arrays."""
+        if self._objectIndices is None:
+            self._loadState()
+            return
+        objects = self.objects
+        positions, velocities = self._positions, self._velocities
+        positionViews, velocityViews = self._positionViews, self._velocityViews
+        for i, obj in enumerate(objects):
+            # Properties which still hold the values we provided cannot have changed.
+            if obj.position is not positionViews[i]:
+                positions[i] = tuple(toVector(obj.position))
+                positionViews[i] = obj.position
+            if obj.velocity is not velocityViews[i]:
+                velocities[i] = tuple(toVector(obj.velocity))
+                velocityViews[i] = obj.velocity
+        n = len(objects)
+        self._headings = np.fromiter((obj.heading for obj in objects), float, n)
+        self._angularSpeeds = np.fromiter((obj.angularSpeed for obj in objects), float, n)
+
+    def _exportState(self):
+        # Convert the arrays to lists of Python floats once per step, rather than
+        # indexing into them (and creating NumPy scalars) once per object.
+        self._positionList = self._positions.tolist()
+        self._velocityList = self._velocities.tolist()
+        self._headingList = self._headings.tolist()
+        self._speedList = self._speeds.tolist()
+        self._angularSpeedList = self._angularSpeeds.tolist()
+
     def isOnScreen(self, x, y):
         return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
 
     def step(self):
-        for obj in self.objects:
-            current_speed = obj.velocity.norm()
-            if hasattr(obj, "hand_brake"):
-                forward = obj.velocity.dot(Vector(0, 1).rotatedBy(obj.heading)) >= 0
-                signed_speed = current_speed if forward else -current_speed
-                if obj.hand_brake or obj.brake > 0:
-                    braking = MAX_BRAKING * max(obj.hand_brake, obj.brake)
-                    acceleration = braking * self.timestep
-                    if acceleration >= current_speed:
-                        signed_speed = 0
-                    elif forward:
-                        signed_speed -= acceleration
-                    else:
-                        signed_speed += acceleration
-                else:
-                    acceleration = obj.throttle * MAX_ACCELERATION
-                    if obj.reverse:
-                        acceleration *= -1
-                    signed_speed += acceleration * self.timestep
-
-                obj.velocity = Vector(0, signed_speed).rotatedBy(obj.heading)
-                if obj.steer:
-                    turning_radius = obj.length / sin(obj.steer * math.pi / 2)
-                    obj.angularSpeed = -signed_speed / turning_radius
-                else:
-                    obj.angularSpeed = 0
-                obj.speed = abs(signed_speed)
-            else:
-                obj.speed = current_speed
-            obj.position += obj.velocity * self.timestep
-            obj.heading += obj.angularSpeed * self.timestep
+        self._syncState()
+        dt = self.timestep
+        velocities, headings = self._velocities, self._headings
+        speeds = np.linalg.norm(velocities, axis=1)
+
+        controlled = self._controlled
+        if len(controlled):
+            objects = self.objects
+            controls = np.array(
+                [_getControls(objects[i]) for i in controlled], dtype=float
+            ).reshape(-1, 5)
+            throttle, brake, handBrake, reverse, steer = controls.T
+            heading = headings[controlled]
+            speed = speeds[controlled]
+            forwardX, forwardY = -np.sin(heading), np.cos(heading)
+            velocity = velocities[controlled]
+            forward = velocity[:, 0] * forwardX + velocity[:, 1] * forwardY >= 0
+            signedSpeed = np.where(forward, speed, -speed)
+
+            # Braking (which takes precedence over the throttle) slows the object down
+            # until it stops; the throttle accelerates it forwards or in reverse.
+            deceleration = MAX_BRAKING * np.maximum(handBrake, brake) * dt
+            braked = np.where(
+                deceleration >= speed,
+                0.0,
+                np.where(forward, signedSpeed - deceleration, signedSpeed + deceleration),
+            )
+            acceleration = np.where(reverse != 0, -throttle, throttle) * MAX_ACCELERATION
+            driven = signedSpeed + acceleration * dt
+            signedSpeed = np.where((handBrake != 0) | (brake > 0), braked, driven)
+
+            velocities[controlled] = np.column_stack(
+                (forwardX * signedSpeed, forwardY * signedSpeed, np.zeros_like(heading))
+            )
+            # Kinematic bicycle model: the turning radius is length / sin(steer * pi/2).
+            self._angularSpeeds[controlled] = np.where(
+                steer != 0,
+                -signedSpeed * np.sin(steer * (math.pi / 2)) / self._lengths,
+                0,
+            )
+            speeds[controlled] = np.abs(signedSpeed)
+
+        self._speeds = speeds
+        self._positions += velocities * dt
+        headings += self._angularSpeeds * dt
+        self._exportState()
 
         if self.render:
+            if self.headless:
+                self.draw_objects()
+                return
+            pygame = self.pygame
             # Handle closing out pygame screen
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -236,58 +373,73 @@ class NewtonianSimulation(DrivingSimulation):
             pygame.event.pump()
 
     def draw_objects(self):
+        pygame = self.pygame
         self.screen.fill((255, 255, 255))
         for screenPoints, color, width in self.network_polygons:
             pygame.draw.lines(self.screen, color, False, screenPoints, width=width)
 
         for i, obj in enumerate(self.objects):
             color = (255, 0, 0) if i == 0 else (0, 0, 255)
+            position = self._positionList[i]
+            heading = self._headingList[i]
 
             if self.debug_render:
-                self.draw_rect(obj, color)
+                self.draw_rect(obj, color, position, heading)
 
             if hasattr(obj, "isCar") and obj.isCar:
-                self.draw_car(obj)
+                self.draw_car(obj, position, heading)
             else:
-                self.draw_rect(obj, color)
+                self.draw_rect(obj, color, position, heading)
 
-        pygame.display.update()
-
-        if self.export_gif:
+        if self._videoWriter:
             frame = pygame.surfarray.array3d(self.screen)
-            frame = np.transpose(frame, (1, 0, 2))
-            self.frames.append(frame)
-
-        time.sleep(self.timestep)
-
-    def draw_rect(self, obj, color):
-        corners = [self.scenicToScreenVal(corner) for corner in obj._corners2D]
+            self._videoWriter.write(np.transpose(frame, (1, 0, 2)))
+
+        if not self.headless:
+            pygame.display.update()
+            time.sleep(self.timestep)
+
+    def draw_rect(self, obj, color, position, heading):
+        pygame = self.pygame
+        x, y, _ = position
+        c, s = math.cos(heading), math.sin(heading)
+        corners = [
+            self.scenicToScreenVal((x + c * dx - s * dy, y + s * dx + c * dy))
+            for dx, dy in (
+                (obj.hw, obj.hl),
+                (-obj.hw, obj.hl),
+                (-obj.hw, -obj.hl),
+                (obj.hw, -obj.hl),
+            )
+        ]
         pygame.draw.polygon(self.screen, color, corners)
 
-    def draw_car(self, obj):
+    def draw_car(self, obj, position, heading):
+        pygame = self.pygame
         car_width = int(obj.width * self.screenScaling)
         car_height = int(obj.height * self.screenScaling)
         scaled_car = pygame.transform.scale(self.car, (car_width, car_height))
-        rotated_car = pygame.transform.rotate(scaled_car, math.degrees(obj.heading))
+        rotated_car = pygame.transform.rotate(scaled_car, math.degrees(heading))
         car_rect = rotated_car.get_rect()
-        car_rect.center = self.scenicToScreenVal(obj.position)
+        car_rect.center = self.scenicToScreenVal(position)
         self.screen.blit(rotated_car, car_rect)
 
-    def generate_gif(self, filename="simulation.gif"):
-        imgs = [Image.fromarray(frame) for frame in self.frames]
-        imgs[0].save(filename, save_all=True, append_images=imgs[1:], duration=50, loop=0)
-
     def getProperties(self, obj, properties):
-        yaw, _, _ = obj.parentOrientation.globalToLocalAngles(obj.heading, 0, 0)
+        if self._objectIndices is None:
+            self._loadState()
+        i = self._objectIndices[id(obj)]
+        position = self._positionViews[i] = Vector(*self._positionList[i])
+        velocity = self._velocityViews[i] = Vector(*self._velocityList[i])
+        yaw, _, _ = obj.parentOrientation.globalToLocalAngles(self._headingList[i], 0, 0)
 
         values = dict(
-            position=obj.position,
+            position=position,
             yaw=yaw,
             pitch=0,
             roll=0,
-            velocity=obj.velocity,
-            speed=obj.speed,
-            angularSpeed=obj.angularSpeed,
+            velocity=velocity,
+            speed=self._speedList[i],
+            angularSpeed=self._angularSpeedList[i],
             angularVelocity=obj.angularVelocity,
         )
         if "elevation" in properties:
@@ -295,8 +447,10 @@ class NewtonianSimulation(DrivingSimulation):
         return values
 
     def destroy(self):
-        if self.render:
-            pygame.quit()
+        if self._videoWriter:
+            self._videoWriter.close()
+        if self.render and not self.headless:
+            self.pygame.quit()
 
     def getLaneFollowingControllers(self, agent):
         dt = self.timestep
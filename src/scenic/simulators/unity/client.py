@@ -7,7 +7,6 @@ from scenic.core.vectors import Vector
 from scenic.core.vectors import Orientation
 from numpy.linalg import norm
 from typing import Optional, Any, List, TypeVar, Type, cast, Callable
-from scipy.spatial.transform import Rotation
 import sys
 # Language: Python 3
 # Holds client information for Scenic Unity communication
@@ -251,12 +250,10 @@ class UnityMessageServer:
         if rotation[3] == 0:
             yaw, pitch, roll = 0, 0, 0
         else:
-            r = Rotation.from_quat(
+            simOrientation = Orientation.fromQuaternion(
                 [rotation[0], rotation[1], rotation[2], rotation[3]])
-            simOrientation = Orientation(r)
-            simYaw, simPitch, simRoll = simOrientation.eulerAngles   # global Euler angles
-            yaw, pitch, roll = obj.parentOrientation.globalToLocalAngles(
-                simYaw, simPitch, simRoll)   # local Euler angles
+            yaw, pitch, roll = obj.parentOrientation.localAnglesFor(
+                simOrientation)   # local Euler angles
 
         if player:
             # print(gameObject.joint_angles.rightPalm,
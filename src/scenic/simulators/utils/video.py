@@ -0,0 +1,128 @@
+"""Writers for saving rendered simulation frames as animations.
+
+Frames are encoded as soon as they are written, so memory use does not grow with
+the length of the simulation. This is used for example by the Newtonian simulator
+to export GIFs and videos of simulations.
+"""
+
+import os
+
+
+def openVideoWriter(path, fps):
+    """Open a writer for the given file, choosing the format from its extension.
+
+    Args:
+        path: path of the file to write, ending in ``.gif`` or ``.mp4``.
+        fps (float): frame rate of the animation.
+
+    Returns:
+        A `GIFWriter` or `MP4Writer`.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gif":
+        return GIFWriter(path, fps)
+    elif extension == ".mp4":
+        return MP4Writer(path, fps)
+    else:
+        raise ValueError(f'unknown video format "{extension}" (expected .gif or .mp4)')
+
+
+class VideoWriter:
+    """Abstract class for writers of animations.
+
+    Writers can be used as context managers, closing the file when the context exits.
+    """
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self.frameCount = 0
+
+    def write(self, frame):
+        """Encode a frame, given as an RGB array of shape (height, width, 3)."""
+        self.writeFrame(frame)
+        self.frameCount += 1
+
+    def writeFrame(self, frame):
+        raise NotImplementedError
+
+    def close(self):
+        """Finish writing the file. Calling this method more than once has no effect."""
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class GIFWriter(VideoWriter):
+    """Writer for animated GIFs, using Pillow.
+
+    Each frame gets its own color table, so frames may use different colors.
+
+    Args:
+        path: path of the file to write.
+        fps (float): frame rate of the animation.
+        loop (int): number of times to repeat the animation, or 0 to repeat forever.
+    """
+
+    def __init__(self, path, fps, loop=0):
+        super().__init__(path, fps)
+        # GIF frame delays are in hundredths of a second; Pillow takes milliseconds.
+        self.duration = 10 * max(1, round(100 / fps))
+        self.loop = loop
+        self._file = open(path, "wb")
+
+    def writeFrame(self, frame):
+        from PIL import GifImagePlugin, Image
+
+        image = Image.fromarray(frame).quantize(method=Image.Quantize.FASTOCTREE)
+        if self.frameCount == 0:
+            info = {"loop": self.loop, "duration": self.duration}
+            header, _ = GifImagePlugin.getheader(image, info=info)
+            self._file.writelines(header)
+        chunks = GifImagePlugin.getdata(
+            image, duration=self.duration, include_color_table=True
+        )
+        self._file.writelines(chunks)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.frameCount > 0:
+            self._file.write(b";")  # GIF trailer
+        self._file.close()
+
+
+class MP4Writer(VideoWriter):
+    """Writer for MP4 videos, using OpenCV.
+
+    Args:
+        path: path of the file to write.
+        fps (float): frame rate of the video.
+    """
+
+    def __init__(self, path, fps):
+        super().__init__(path, fps)
+        self._writer = None
+        self._closed = False
+
+    def writeFrame(self, frame):
+        import cv2
+
+        if self._writer is None:
+            height, width, _ = frame.shape
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            self._writer = cv2.VideoWriter(self.path, fourcc, self.fps, (width, height))
+            if not self._writer.isOpened():
+                raise RuntimeError(f"unable to open video file {self.path} for writing")
+        self._writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._writer.release()
@@ -452,6 +452,10 @@ class ScenicLexer(BetterPythonLexer):
         "VerifaiRange",
         "VerifaiDiscreteRange",
         "VerifaiOptions",
+        "QMCParameter",
+        "QMCRange",
+        "QMCDiscreteRange",
+        "QMCOptions",
     )
     exceptions = ("GuardViolation", "PreconditionViolation", "InvariantViolation")
     builtin_names = (
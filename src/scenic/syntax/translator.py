@@ -363,6 +363,7 @@ dumpScenicAST = False
 dumpFinalAST = False
 dumpASTPython = False
 usePruning = True
+pruningWorkers = None  # if None, use pruning.PRUNING_WORKERS
 
 ## Preamble
 # (included at the beginning of every module to be translated;
@@ -685,7 +686,7 @@ def constructScenarioFrom(namespace, scenarioName=None):
 
     # Prune infeasible parts of the space
     if usePruning:
-        pruning.prune(scenario, verbosity=errors.verbosityLevel)
+        pruning.prune(scenario, verbosity=errors.verbosityLevel, workers=pruningWorkers)
 
     # Validate scenario
     scenario.validate()
@@ -120,6 +120,10 @@ __all__ = (
     "VerifaiRange",
     "VerifaiDiscreteRange",
     "VerifaiOptions",
+    "QMCParameter",
+    "QMCRange",
+    "QMCDiscreteRange",
+    "QMCOptions",
     # Constructible types
     "Point",
     "OrientedPoint",
@@ -199,6 +203,10 @@ from scenic.core.dynamics.guards import (
 from scenic.core.dynamics.invocables import BlockConclusion, runTryInterrupt
 from scenic.core.dynamics.scenarios import DynamicScenario
 from scenic.core.external_params import (
+    QMCDiscreteRange,
+    QMCOptions,
+    QMCParameter,
+    QMCRange,
     VerifaiDiscreteRange,
     VerifaiOptions,
     VerifaiParameter,
@@ -0,0 +1,111 @@
+import functools
+import inspect
+import json
+
+import pytest
+
+import scenic
+from scenic.core.batch import (
+    generateToFile,
+    readReplayShard,
+    readSceneShard,
+    simulateToFile,
+)
+from scenic.core.distributions import RejectionException
+from scenic.core.simulators import DummySimulator
+from tests.utils import compileScenic
+
+code = """
+    ego = new Object at Range(-5, 5) @ Range(-5, 5)
+    other = new Object at Range(-5, 5) @ Range(-5, 5)
+    require (distance to other) < 3
+"""
+
+
+def test_batch_jsonl(tmp_path):
+    scenario = compileScenic(code)
+    path = tmp_path / "scenes.jsonl"
+    stats = generateToFile(scenario, 10, path, seed=42)
+    assert stats.scenes == 10
+    assert stats.iterations >= 10
+    assert sum(stats.rejections.values()) == stats.iterations - 10
+    lines = path.read_text().splitlines()
+    assert len(lines) == 10
+    for line in lines:
+        data = json.loads(line)
+        ego, other = data["objects"]
+        assert ego["class"] == "Object"
+        assert len(ego["position"]) == 3
+        assert ego["dimensions"] == [1, 1, 1]
+        dx, dy, _ = (a - b for a, b in zip(ego["position"], other["position"]))
+        assert (dx**2 + dy**2) ** 0.5 < 3
+
+
+@pytest.mark.slow
+def test_batch_parallel(tmp_path):
+    scenario = compileScenic(code)
+    serial, parallel = tmp_path / "serial.bin", tmp_path / "parallel.bin"
+    generateToFile(scenario, 20, serial, seed=42)
+    stats = generateToFile(scenario, 20, parallel, workers=3, seed=42)
+    assert stats.scenes == 20
+    assert serial.read_bytes() == parallel.read_bytes()
+    scenes = list(readSceneShard(scenario, parallel))
+    assert len(scenes) == 20
+    for scene in scenes:
+        assert scene.egoObject.distanceTo(scene.objects[1]) < 3
+
+    # Workers can also compile the scenario themselves
+    factory = functools.partial(scenic.scenarioFromString, inspect.cleandoc(code))
+    compiled = tmp_path / "compiled.bin"
+    generateToFile(scenario, 20, compiled, workers=2, seed=42, scenarioFactory=factory)
+    assert compiled.read_bytes() == serial.read_bytes()
+
+
+simCode = """
+    import scenic
+    simulator scenic.core.simulators.DummySimulator()
+    behavior Foo():
+        while True:
+            take 1
+    ego = new Object with behavior Foo
+    record final ego.position.x as x
+    terminate when Range(0, 1) < 0.1
+"""
+
+
+@pytest.mark.parametrize("workers", (1, pytest.param(2, marks=pytest.mark.slow)))
+def test_simulation_farm(workers, tmp_path):
+    scenario = compileScenic(simCode)
+    path, replayPath = tmp_path / "results.jsonl", tmp_path / "replays.bin"
+    stats = simulateToFile(
+        scenario, 10, path, workers=workers, seed=7, replayPath=replayPath, maxSteps=5
+    )
+    assert stats.simulations == 10
+    assert stats.failedSimulations == 0
+    assert sum(stats.terminations.values()) == 10
+    results = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(results) == 10
+    assert stats.steps == sum(result["steps"] for result in results)
+    for result in results:
+        assert result["terminationType"] in ("timeLimit", "scenarioComplete")
+        assert result["records"] == {"x": 0}
+        if result["terminationType"] == "timeLimit":
+            assert result["steps"] == 5
+    replays = list(readReplayShard(replayPath))
+    assert len(replays) == 10
+    scenario.simulationFromBytes(replays[0], DummySimulator(), maxSteps=5)
+
+
+def test_simulation_farm_failures(tmp_path):
+    scenario = compileScenic(
+        """
+        import scenic
+        simulator scenic.core.simulators.DummySimulator()
+        behavior Foo():
+            require False
+            take 1
+        ego = new Object with behavior Foo
+        """
+    )
+    with pytest.raises(RejectionException, match="failed to run 2 simulations"):
+        simulateToFile(scenario, 2, tmp_path / "results.jsonl", maxFailures=3)
@@ -0,0 +1,54 @@
+import pytest
+from rv_ltl import B4
+
+from scenic.core.propositions import Always, Atomic, Eventually, PropositionMonitor, Until
+
+T, PT, PF, F = B4.TRUE, B4.PRESUMABLY_TRUE, B4.PRESUMABLY_FALSE, B4.FALSE
+
+
+def atomic(values, syntax_id):
+    """An atomic proposition taking the given values at successive steps."""
+    values = iter(values)
+    return Atomic(lambda: next(values), syntax_id)
+
+
+def monitorResults(proposition, steps, publicAPI):
+    monitor = proposition.create_monitor()
+    if publicAPI:
+        # Simulate a version of rv_ltl without the internals we use
+        monitor._nodes = None
+        monitor._atomics = tuple(
+            (closure, ap.identifier) for closure, ap in monitor._atomics
+        )
+    return [monitor.update() for _ in range(steps)]
+
+
+@pytest.fixture(params=[False, True], ids=["internal", "public"])
+def publicAPI(request):
+    return request.param
+
+
+def test_always(publicAPI):
+    prop = Always(atomic([True, True, False, True], 0))
+    assert monitorResults(prop, 4, publicAPI) == [PT, PT, F, F]
+
+
+def test_eventually(publicAPI):
+    prop = Eventually(atomic([False, False, True, False], 0))
+    assert monitorResults(prop, 4, publicAPI) == [PF, PF, T, T]
+
+
+def test_until(publicAPI):
+    prop = Until(atomic([True, True, False], 0), atomic([False, False, True], 1))
+    assert monitorResults(prop, 3, publicAPI) == [PF, PF, T]
+    prop = Until(atomic([True, False, False], 0), atomic([False, False, True], 1))
+    assert monitorResults(prop, 3, publicAPI) == [PF, PF, F]
+
+
+def test_fallback_detection():
+    class OpaqueMonitor:
+        pass
+
+    assert PropositionMonitor._monitorNodes(OpaqueMonitor()) is None
+    prop = Always(atomic([True], 0))
+    assert PropositionMonitor._monitorNodes(prop.ltl_node.create_monitor())
@@ -0,0 +1,105 @@
+import gc
+import pickle
+
+import numpy
+import pytest
+
+import scenic.core.recording as recording
+from scenic.core.recording import TimeSeries, Trajectory
+from scenic.core.vectors import Vector
+
+
+def test_time_series_numeric():
+    series = TimeSeries()
+    for i in range(100):
+        series.append((i, i * 0.5))
+    assert series.columnar
+    assert len(series) == 100
+    assert series[3] == (3, 1.5)
+    assert series[-1] == (99, 49.5)
+    assert series[:2] == [(0, 0.0), (1, 0.5)]
+    assert series == [(i, i * 0.5) for i in range(100)]
+    assert numpy.array_equal(series.times, numpy.arange(100))
+    assert numpy.array_equal(series.values, numpy.arange(100) * 0.5)
+    with pytest.raises(IndexError):
+        series[100]
+
+
+def test_time_series_vectors():
+    series = TimeSeries([(0, Vector(1, 2, 3)), (1, Vector(4, 5))])
+    assert series.columnar
+    assert series[1] == (1, Vector(4, 5, 0))
+    assert type(series[1][1]) is Vector
+    assert series.values.shape == (2, 3)
+
+
+def test_time_series_fallback():
+    series = TimeSeries([(0, 1), (1, 2)])
+    assert series.columnar
+    series.append((2, "foo"))
+    assert not series.columnar
+    assert series == [(0, 1), (1, 2), (2, "foo")]
+    assert series.values == [1, 2, "foo"]
+
+    series = TimeSeries([(0, 1), (1, 2**80)])
+    assert not series.columnar
+    assert series[1] == (1, 2**80)
+
+
+def test_trajectory():
+    states = [
+        (Vector(0, 0, 0), Vector(1, 0, 0)),
+        (Vector(0, 1, 0), Vector(1, 1, 0), Vector(5, 5, 5)),
+        (Vector(0, 2, 0),),
+    ]
+    trajectory = Trajectory(states)
+    assert trajectory.columnar
+    assert trajectory == states
+    assert trajectory[-1] == states[-1]
+    assert trajectory.positions.shape == (3, 3, 3)
+    assert numpy.array_equal(trajectory.counts, [2, 3, 1])
+    assert numpy.isnan(trajectory.positions[0, 2]).all()
+
+    trajectory.append("custom state")
+    assert not trajectory.columnar
+    assert trajectory == states + ["custom state"]
+    with pytest.raises(TypeError):
+        trajectory.positions
+
+
+def test_freeze():
+    states = [(Vector(0, 0, 0), Vector(1, 2, 3)), (Vector(0, 1, 0),)]
+    trajectory = Trajectory(states)
+    assert trajectory == tuple(states)
+    assert list(trajectory) == [trajectory[i] for i in range(2)]
+    with pytest.raises(TypeError):
+        hash(trajectory)
+    trajectory.freeze()
+    assert hash(trajectory) == hash(tuple(states))
+    assert {trajectory: 1}[tuple(states)] == 1
+    with pytest.raises(TypeError):
+        trajectory.append(states[0])
+
+    series = TimeSeries([(0, 1.5), (1, 2.5)])
+    series.freeze()
+    assert hash(series) == hash(((0, 1.5), (1, 2.5)))
+
+
+def test_spill(tmp_path, monkeypatch):
+    monkeypatch.setattr(recording, "spillThreshold", 1000)
+    monkeypatch.setattr(recording, "spillDirectory", str(tmp_path))
+    states = [(Vector(i, 2 * i, 0), Vector(-i, 0, 1)) for i in range(200)]
+    trajectory = Trajectory(states)
+    assert trajectory._positions.spilled
+    assert any(tmp_path.iterdir())
+    assert trajectory == states
+
+    clone = pickle.loads(pickle.dumps(trajectory))
+    assert not clone._positions.spilled
+    assert clone == states
+    clone.append((Vector(0, 0, 0),))
+    assert len(clone) == 201
+
+    del trajectory, clone
+    gc.collect()
+    assert not any(tmp_path.iterdir())
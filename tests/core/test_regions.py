@@ -1,12 +1,14 @@
 import math
 from pathlib import Path
+import pickle
+import random
 
 import fcl
 import pytest
 import shapely.geometry
 import trimesh.voxel
 
-from scenic.core.distributions import RandomControlFlowError, Range
+from scenic.core.distributions import RandomControlFlowError, Range, Samplable
 from scenic.core.object_types import Object, OrientedPoint
 from scenic.core.regions import *
 from scenic.core.shapes import ConeShape, MeshShape
@@ -338,6 +340,18 @@ def test_mesh_volume_region_sampling():
         assert -1 <= z <= 1
 
 
+def test_mesh_volume_region_sampling_nonconvex():
+    # An L-shaped slab, which is not star-shaped around its centroid
+    r = BoxRegion(dimensions=(4, 4, 1)).difference(
+        BoxRegion(dimensions=(2, 2, 2), position=(0.5, 0.5, 0))
+    )
+    pts = r.uniformPoints(5000)
+    assert pts.shape == (5000, 3)
+    assert all(r.mesh.contains(pts))
+    # The part of the L with x < -0.5 has half of the total volume
+    assert numpy.mean(pts[:, 0] < -0.5) == pytest.approx(0.5, abs=0.03)
+
+
 def test_mesh_surface_region_sampling():
     r = BoxRegion(position=(0, 0, 0), dimensions=(2, 2, 2)).getSurfaceRegion()
     pts = [r.uniformPointInner() for _ in range(100)]
@@ -345,6 +359,42 @@ def test_mesh_surface_region_sampling():
     for x, y, z in pts:
         assert x == 1 or x == -1 or y == 1 or y == -1 or z == 1 or z == -1
 
+    pts = r.uniformPoints(100)
+    assert pts.shape == (100, 3)
+    assert numpy.all(numpy.max(numpy.abs(pts), axis=1) == pytest.approx(1))
+
+
+def test_mesh_surface_region_sampling_reproducible():
+    r = BoxRegion(dimensions=(2, 2, 2)).getSurfaceRegion()
+
+    def sample():
+        random.seed(42)
+        numpy.random.seed(42)
+        Samplable.sampleAll(())  # start a new sampling epoch
+        return [r.uniformPointInner() for _ in range(50)]
+
+    assert sample() == sample()
+
+
+def test_mesh_batch_queries():
+    r = BoxRegion(dimensions=(4, 4, 1)).difference(
+        BoxRegion(dimensions=(2, 2, 2), position=(0.5, 0.5, 0))
+    )
+    pts = numpy.array([(-1, -1, 0), (1, 1, 0), (3, 0, 0), (-1, -1, 0.5), (-1, -1, 2)])
+    assert list(r.containsPoints(pts)) == [True, False, False, True, False]
+    assert list(r.containsPoints(pts)) == [r.containsPoint(pt) for pt in pts]
+    assert r.distancesTo(pts) == pytest.approx([0, 0.5, 1, 0, 1.5])
+
+    s = r.getSurfaceRegion()
+    assert list(s.containsPoints(pts)) == [False, False, False, True, False]
+    assert s.distancesTo(pts) == pytest.approx([0.5, 0.5, 1, 0, 1.5])
+    assert s.distanceTo((-1, -1, 0)) == pytest.approx(0.5)
+
+    # The index is rebuilt after pickling
+    r.containsPoint((0, 0, 0))
+    r2 = pickle.loads(pickle.dumps(r))
+    assert list(r2.containsPoints(pts)) == [True, False, False, True, False]
+
 
 def test_mesh_intersects():
     r1 = BoxRegion(dimensions=(1, 1, 1))
@@ -803,6 +853,57 @@ def test_mesh_voxelization(getAssetPath):
         assert vr.containsPoint(sampled_pt)
 
 
+def test_voxel_region_queries():
+    r = BoxRegion(dimensions=(4, 4, 1)).difference(
+        BoxRegion(dimensions=(2, 2, 2), position=(0.5, 0.5, 0))
+    )
+    vr = r.voxelized(0.1)
+    pts = numpy.array([(-1, -1, 0), (1, 1, 0), (3, 0, 0), (-1, -1, 0.5), (-1, -1, 2)])
+    assert list(vr.containsPoints(pts)) == [True, False, False, True, False]
+    assert list(vr.containsPoints(pts)) == [vr.containsPoint(pt) for pt in pts]
+    # The voxelization extends 0.05 beyond the original region
+    assert vr.distancesTo(pts) == pytest.approx([0, 0.45, 0.95, 0, 1.45])
+    assert vr.distanceTo((-1, -1, 2)) == pytest.approx(1.45)
+
+    def objectAt(pos, size):
+        scene = sampleSceneFrom(
+            f"ego = new Object at {pos}, with width {size}, with length {size}"
+        )
+        return scene.egoObject
+
+    assert vr.containsObject(objectAt((-1, -1, 0), 0.5))
+    assert vr.containsObject(objectAt((0, -1.4, 0), 0.5))
+    assert not vr.containsObject(objectAt((1, 1, 0), 0.5))
+    assert not vr.containsObject(objectAt((-0.5, -0.5, 0), 1))
+    assert not vr.containsObject(objectAt((-1.9, -1.9, 0), 0.5))
+
+
+def test_voxel_cache(tmp_path, monkeypatch):
+    import scenic.core.regions as regions
+
+    monkeypatch.setattr(regions, "voxelCacheDirectory", str(tmp_path))
+    box = BoxRegion(dimensions=(2, 2, 2))
+    eroded = box._erodeOverapproximate(0.5, 0.05)
+    dilated = box._bufferOverapproximate(0.2, 0.05)
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # Cached results are loaded, and identical to the originals
+    monkeypatch.setattr(VoxelRegion, "dilation", None)
+    assert numpy.array_equal(
+        box._erodeOverapproximate(0.5, 0.05).voxelGrid.matrix, eroded.voxelGrid.matrix
+    )
+    cached = BoxRegion(dimensions=(2, 2, 2))._bufferOverapproximate(0.2, 0.05)
+    assert numpy.array_equal(cached.voxelGrid.matrix, dilated.voxelGrid.matrix)
+    assert numpy.array_equal(cached.voxelGrid.transform, dilated.voxelGrid.transform)
+
+    # Eroding away everything is cached too
+    monkeypatch.undo()
+    monkeypatch.setattr(regions, "voxelCacheDirectory", str(tmp_path))
+    assert isinstance(box._erodeOverapproximate(5, 0.05), EmptyRegion)
+    monkeypatch.setattr(VoxelRegion, "dilation", None)
+    assert isinstance(box._erodeOverapproximate(5, 0.05), EmptyRegion)
+
+
 def test_voxel_to_mesh():
     orig_mesh = BoxRegion(rotation=(math.pi / 4, math.pi / 4, 0), position=(1, 1, 1))
     voxel = orig_mesh.voxelized(max(orig_mesh.mesh.extents) / 10)
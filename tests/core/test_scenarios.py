@@ -1,6 +1,11 @@
+import io
+import json
+import random
+
 import pytest
 
 from scenic.core.distributions import Range
+from scenic.core.sample_checking import BasicChecker
 from tests.utils import compileScenic
 
 
@@ -59,3 +64,92 @@ def test_condition_scenario_params_2():
     assert all(0.5 <= x <= 0.51 for x in xs)
     assert any(0.505 <= x for x in xs)
     assert any(x < 0.505 for x in xs)
+
+
+def test_requirement_profile(tmp_path):
+    program = """
+        ego = new Object at Range(0, 10) @ 0
+        other = new Object at Range(0, 10) @ 0
+        for i in range(3):
+            require ego.position.x > 2 * i
+        require other.position.x > 5
+    """
+    path = tmp_path / "profile.json"
+    scenario = compileScenic(program)
+    assert scenario.checker.profile() == {}
+    random.seed(0)
+    for i in range(10):
+        scenario.generate(maxIterations=1000)
+    # The heap always reflects the current costs of the requirements
+    for cost, _, req in scenario.checker._heap:
+        assert cost == scenario.checker.getRequirementCost(req)
+    profile = scenario.checker.profile()
+    assert "line 4 #0" in profile and "line 4 #2" in profile
+    assert "line 5 #0" in profile
+    assert all(0 <= acc <= 1 and time >= 0 for acc, time in profile.values())
+    scenario.saveRequirementProfile(path)
+
+    # Profiles for other scenarios are kept
+    other = compileScenic("ego = new Object\nrequire ego.position.x == 0")
+    other.saveRequirementProfile(path)
+    assert len(json.loads(path.read_text())) == 2
+
+    seeded = compileScenic(program)
+    seeded.loadRequirementProfile(path)
+    assert seeded.checker.profile() == pytest.approx(profile)
+    assert seeded.checker.sortedRequirements() == [
+        seeded.checker.requirements[scenario.checker.requirements.index(req)]
+        for req in scenario.checker.sortedRequirements()
+    ]
+
+    # The checking order does not affect which scenes are generated
+    random.seed(1)
+    expected = [scenario.generate(maxIterations=1000)[0].egoObject.x for i in range(5)]
+    random.seed(1)
+    assert [seeded.generate(maxIterations=1000)[0].egoObject.x for i in range(5)] == (
+        expected
+    )
+
+    # Missing files or scenarios are ignored
+    fresh = compileScenic("ego = new Object at Range(0, 10) @ 0")
+    fresh.loadRequirementProfile(path)
+    fresh.loadRequirementProfile(tmp_path / "missing.json")
+    assert fresh.checker.profile() == {}
+
+
+@pytest.mark.parametrize("basic", (False, True))
+def test_profiling(basic):
+    program = """
+        param p = Range(0, 1)
+        ego = new Object at Range(0, 10) @ 0
+        other = new Object at Range(0, 10) @ 5
+        require ego.position.x > 5
+    """
+    scenario = compileScenic(program)
+    stats = scenario.enableProfiling()
+    assert scenario.generationStats is stats
+    if basic:
+        # Profiling carries over to newly-installed checkers
+        scenario.setSampleChecker(BasicChecker(True))
+    random.seed(0)
+    iterations = scenario.generateBatch(5, maxIterations=1000)[1]
+    assert stats.scenes == 5
+    assert stats.iterations == iterations
+    assert 0 < stats.samplingTime <= stats.time
+    names = {"Object #0 (ego)", "Object #1", 'param "p"'}
+    assert names <= set(stats.dependencyTimes) <= names | {"requirements"}
+    req = stats.requirements["line 4 #0"]
+    assert req.evaluations == iterations
+    assert req.rejections == iterations - 5
+    assert 0 < req.rejectionRate < 1
+    assert stats.checkingTime >= req.time > 0
+    assert stats.pruningStats is scenario.pruningStats
+    stream = io.StringIO()
+    stats.report(stream)
+    assert "line 4 #0: rejected" in stream.getvalue()
+
+    # Profiling does not affect which scenes are generated
+    scenario.disableProfiling()
+    random.seed(0)
+    assert scenario.generateBatch(5, maxIterations=1000)[1] == iterations
+    assert stats.scenes == 5
@@ -13,7 +13,12 @@ import sys
 import numpy
 import pytest
 
-from scenic.core.serialization import SerializationError, Serializer
+from scenic.core.serialization import (
+    ReplayReader,
+    ReplayWriter,
+    SerializationError,
+    Serializer,
+)
 from scenic.core.simulators import DivergenceError, DummySimulator
 from tests.utils import (
     areEquivalent,
@@ -468,6 +473,85 @@ class TestSimulationReplay:
         assert a2[0] == a1[0]
         assert a2[1] != a1[0]
 
+    def test_streamed_replay(self, tmp_path):
+        scene = sampleSceneFrom(
+            """
+            behavior Foo():
+                while True:
+                    take Range(0, 1)
+            ego = new Object with behavior Foo
+            new Object at (10, 0)
+        """
+        )
+        path = tmp_path / "replay.bin"
+        simulator = DummySimulator(drift=1.0)
+        sim1 = simulator.simulate(
+            scene, maxSteps=20, replayFile=path, enableDivergenceCheck=True
+        )
+        with pytest.raises(RuntimeError):
+            sim1.getReplay()
+        actions = getEgoActionsFrom(sim1)
+        sim2 = simulator.replay(scene, str(path), maxSteps=20)
+        assert getEgoActionsFrom(sim2) == actions
+        with ReplayReader(path) as reader:
+            sim3 = DummySimulator(drift=1.1).replay(
+                scene, reader, maxSteps=20, continueAfterDivergence=True
+            )
+        assert getEgoActionsFrom(sim3)[0] == actions[0]
+        with ReplayReader(path) as reader, pytest.raises(DivergenceError):
+            DummySimulator(drift=1.1).replay(scene, reader, maxSteps=20)
+
+    def test_streamed_replay_rejection(self):
+        scene = sampleSceneFrom(
+            """
+            behavior Foo():
+                x = Range(0, 1)
+                require x > 0.5
+                take x
+            ego = new Object with behavior Foo
+        """
+        )
+        stream = io.BytesIO()
+        simulator = DummySimulator()
+        sim1 = simulator.simulate(scene, maxSteps=1, maxIterations=100, replayFile=stream)
+        stream.seek(0)
+        with ReplayReader(stream) as reader:
+            sim2 = simulator.replay(scene, reader, maxSteps=1)
+        assert getEgoActionsFrom(sim1) == getEgoActionsFrom(sim2)
+
+    def test_streamed_replay_retry(self):
+        scene = sampleSceneFrom(
+            """
+            behavior Foo():
+                while True:
+                    x = Range(0, 1)
+                    require x > 0.2
+                    take x
+            ego = new Object with behavior Foo
+        """
+        )
+        stream = io.BytesIO()
+        simulator = DummySimulator()
+        sim1 = simulator.simulate(scene, maxSteps=1, maxIterations=100, replayFile=stream)
+        actions = getEgoActionsFrom(sim1)
+        # Once the replay runs out, later steps are random and may be rejected; each
+        # retry must replay the stream from the start.
+        for _ in range(5):
+            stream.seek(0)
+            with ReplayReader(stream) as reader:
+                sim2 = simulator.replay(scene, reader, maxSteps=20, maxIterations=1000)
+            assert getEgoActionsFrom(sim2)[0] == actions[0]
+
+        class UnseekableStream(io.BytesIO):
+            def seekable(self):
+                return False
+
+        with ReplayReader(UnseekableStream(stream.getvalue())) as reader:
+            with pytest.raises(ValueError):
+                simulator.replay(scene, reader, maxSteps=20, maxIterations=2)
+            sim3 = simulator.replay(scene, reader, maxSteps=1, maxIterations=1)
+        assert getEgoActionsFrom(sim3) == actions
+
     def test_combined_serialization(self):
         scenario = compileScenic(
             """
@@ -482,3 +566,41 @@ class TestSimulationReplay:
         data = scenario.simulationToBytes(sim1)
         sim2 = scenario.simulationFromBytes(data, simulator, maxSteps=1)
         assert getEgoActionsFrom(sim1) == getEgoActionsFrom(sim2)
+
+
+class TestStreamedReplays:
+    def writeChunks(self, stream, steps, close=True):
+        writer = ReplayWriter(stream, chunkSize=100)
+        for step in range(steps):
+            writer.beginStep(step)
+            writer.write(bytes([step]) * 30)
+        if close:
+            writer.close()
+        return writer
+
+    def test_chunks(self):
+        stream = io.BytesIO()
+        writer = self.writeChunks(stream, 20)
+        assert [step for step, _ in writer.chunks] == [0, 4, 8, 12, 16]
+        stream.seek(0)
+        reader = ReplayReader(stream)
+        assert reader.chunks == writer.chunks
+        data = reader.read()
+        assert data == b"".join(bytes([step]) * 30 for step in range(20))
+        assert reader.read() == b""
+        assert reader.seekStep(10) == 8
+        assert reader.read(5) == bytes([8]) * 5
+        with pytest.raises(ValueError):
+            reader.seekStep(-1)
+
+    def test_unclosed(self):
+        stream = io.BytesIO()
+        writer = self.writeChunks(stream, 20, close=False)
+        stream.seek(0)
+        reader = ReplayReader(stream)
+        assert reader.chunks == writer.chunks
+        assert len(reader.read()) == 16 * 30
+
+    def test_not_a_replay(self):
+        with pytest.raises(SerializationError):
+            ReplayReader(io.BytesIO(b"foo"))
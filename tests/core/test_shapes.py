@@ -3,8 +3,10 @@ from pathlib import Path
 
 import pytest
 
+from scenic.core.object_types import ScaledShapeCache, scaledShapeCache
 from scenic.core.regions import BoxRegion
 from scenic.core.shapes import BoxShape, CylinderShape, MeshShape
+from tests.utils import compileScenic, sampleScene
 
 
 def test_shape_fromFile(getAssetPath):
@@ -34,3 +36,42 @@ def test_interiorPoint():
     pt = s._interiorPoint
     assert all(-0.5 <= coord <= 0.5 for coord in pt)
     assert not all(-0.05 <= coord <= 0.05 for coord in pt)
+
+
+def test_scaled_shape_cache():
+    cache = ScaledShapeCache(maxsize=2)
+    shape = BoxShape()
+    r1 = cache.get(shape, 1, 2, 3)
+    assert cache.get(shape, 1, 2, 3 + 1e-12) is r1
+    assert cache.get(BoxShape(), 1, 2, 3) is not r1
+    assert cache.hits == 1 and cache.misses == 2
+    assert len(cache) == 2
+    assert cache.get(shape, 4, 5, 6) is not r1
+    assert cache.get(shape, 1, 2, 3) is not r1  # evicted
+
+    scaledShapeCache.clear()
+    scenario = compileScenic(
+        """
+        ego = new Object with width Uniform(1, 2), with length 3
+        other = new Object at 10@0, with width Uniform(1, 2), with length 3
+        """
+    )
+    spaces = set()
+    for _ in range(10):
+        scene = sampleScene(scenario, maxIterations=100)
+        for obj in scene.objects:
+            assert obj.occupiedSpace.mesh.extents == pytest.approx((obj.width, 3, 1))
+            spaces.add(id(obj.occupiedSpace._scaledShape))
+    assert len(spaces) == 2
+    assert scaledShapeCache.hitRate >= 0.9
+
+    # Continuous dimensions never recur, so they are not cached
+    scaledShapeCache.clear()
+    scenario = compileScenic("ego = new Object with width Range(1, 2)")
+    for _ in range(5):
+        scene = sampleScene(scenario, maxIterations=100)
+        assert scene.egoObject.occupiedSpace.mesh.extents[0] == pytest.approx(
+            scene.egoObject.width
+        )
+    assert len(scaledShapeCache) == 0
+    assert scaledShapeCache.hits == scaledShapeCache.misses == 0
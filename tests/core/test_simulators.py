@@ -66,6 +66,25 @@ def test_simulator_set_property():
     assert result.records["test_val_2"] == result.records["test_val_3"] == "bar"
 
 
+def test_simulator_columnar_records():
+    scenario = compileScenic(
+        """
+        ego = new Object
+        other = new Object at 10@0
+        record ego.position.x as x
+        record other.position as pos
+    """
+    )
+    scene, _ = scenario.generate(maxIterations=1)
+    result = DummySimulator().simulate(scene, maxSteps=3).result
+    assert result.trajectory.positions.shape == (4, 2, 3)
+    assert result.finalState == result.trajectory[-1]
+    assert result.finalState[1] == (10, 0, 0)
+    assert list(result.records["x"].times) == [0, 1, 2, 3]
+    assert result.records["pos"].values.shape == (4, 3)
+    assert result.records["pos"][0] == (0, (10, 0, 0))
+
+
 def test_simulator_bad_scheduler():
     class TestSimulation(DummySimulation):
         def scheduleForAgents(self):
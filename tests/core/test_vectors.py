@@ -1,12 +1,25 @@
+import copyreg
+import math
+import pickle
+
+import numpy
 import pytest
+import shapely
 
-from scenic.core.distributions import Options, underlyingFunction
+from scenic.core.distributions import (
+    Options,
+    RejectionException,
+    Samplable,
+    underlyingFunction,
+)
 from scenic.core.lazy_eval import (
     DelayedArgument,
     LazilyEvaluable,
+    isLazy,
     needsLazyEvaluation,
     valueInContext,
 )
+import scenic.core.vectors as vectors
 from scenic.core.vectors import *
 
 
@@ -69,3 +82,246 @@ def test_distribution_method_encapsulation_lazy():
     assert not needsLazyEvaluation(evpt)
     assert isinstance(evpt, VectorMethodDistribution)
     assert evpt.method is underlyingFunction(vf.followFrom)
+
+
+def test_piecewise_vector_field():
+    from scenic.core.regions import AllRegion, PolygonalRegion
+
+    def square(i):
+        x = 2 * i
+        points = ((x - 0.75, -0.5), (x + 0.75, -0.5), (x + 0.75, 0.5), (x - 0.75, 0.5))
+        return PolygonalRegion(points, orientation=VectorField("", lambda p: 0.01 * i))
+
+    field = PiecewiseVectorField("Union", [square(i) for i in range(50)], tolerance=0.5)
+    assert field[Vector(0, 0)].yaw == 0
+    assert field[Vector(2.7, 0)].yaw == pytest.approx(0.01)
+    assert field[Vector(20, 0.7)].yaw == pytest.approx(0.1)  # within tolerance
+    with pytest.raises(RejectionException):
+        field[Vector(20, 5)]
+
+    points = [(i + 0.2, 0.3 * (i % 4)) for i in range(99)]
+    values = field.valuesAt(numpy.array(points))
+    assert [v.yaw for v in values] == pytest.approx([field[p].yaw for p in points])
+    with pytest.raises(RejectionException):
+        field.valuesAt([(0, 0), (20, 5)])
+
+    # Unbounded regions are checked in order along with the indexed ones
+    bounded = square(50)
+    fallback = AllRegion("all", orientation=VectorField("", lambda p: 2))
+    field = PiecewiseVectorField("Union", [fallback, bounded])
+    assert field[Vector(100, 0)].yaw == pytest.approx(2)
+    field = PiecewiseVectorField("Union", [bounded, fallback])
+    assert field[Vector(100, 0)].yaw == pytest.approx(0.5)
+    assert field[Vector(0, 0)].yaw == pytest.approx(2)
+    assert [v.yaw for v in field.valuesAt([(100, 0), (0, 0)])] == pytest.approx([0.5, 2])
+
+
+def test_vector_field_batch():
+    field = VectorField("Foo", lambda pos: 0.1 * pos.x)
+    points = numpy.array([(0, 0), (1, 2), (3, 4)])
+    assert field.headingsAt(points) == pytest.approx([0, 0.1, 0.3])
+    orientations = field.orientationsAt(points)
+    assert [o.yaw for o in orientations] == pytest.approx([0, 0.1, 0.3])
+
+    field = VectorField("Bar", lambda pos: (0.1 * pos.x, 0.5, 0))
+    assert field.headingsAt([(1, 0, 0)]) == pytest.approx([0.1])
+    assert field.orientationsAt([(1, 0, 0)])[0].approxEq(field[Vector(1, 0, 0)])
+
+    cells = [
+        (shapely.geometry.box(0, 0, 1, 1), 0.2),
+        (shapely.geometry.box(0, 0, 2, 2), None),
+    ]
+    field = PolygonalVectorField("Baz", cells, headingFunction=lambda pos: 0.3)
+    assert field.headingsAt([(0.5, 0.5), (1.5, 1.5)]) == pytest.approx([0.2, 0.3])
+    with pytest.raises(RejectionException):
+        field.headingsAt([(0.5, 0.5), (5, 5)])
+    field = PolygonalVectorField("Qux", cells[:1], defaultHeading=0.4)
+    assert field.headingsAt([(0.5, 0.5), (5, 5)]) == pytest.approx([0.2, 0.4])
+    assert field.valuesAt([(0.5, 0.5), (5, 5)]) == [0.2, 0.4]
+
+
+def test_vector_field_batch_normalized():
+    # Headings outside [-pi, pi] are normalized as by field[point]
+    points = [(0, 0), (1, 0), (2, 0), (3, 0)]
+    raw = [4, -4, 10, math.pi / 2]
+    field = VectorField("Foo", lambda pos: raw[int(pos.x)])
+    cells = [(shapely.geometry.box(i, -1, i + 1, 1), h) for i, h in enumerate(raw)]
+    poly = PolygonalVectorField("Bar", cells, defaultHeading=7)
+    for f, pts in ((field, points), (poly, [(0.5, 0), (1.5, 0), (2.5, 0), (9, 9)])):
+        bulk = f.headingsAt(pts)
+        assert all(-math.pi <= h <= math.pi for h in bulk)
+        assert bulk == pytest.approx([f[Vector(*pt)].yaw for pt in pts])
+
+
+def test_follow_methods():
+    # Circular flow around the origin: following it for a quarter turn from (1, 0)
+    # should end at (0, 1).
+    field = VectorField("Circle", lambda pos: math.atan2(pos.y, pos.x))
+    start, dist = Vector(1, 0), math.pi / 2
+    euler = field.followFrom(start, dist, steps=4)
+    rk4 = field.followFrom(start, dist, steps=4, method="rk4")
+    adaptive = field.followFrom(start, dist, method="adaptive", tolerance=1e-8)
+    error = lambda pt: math.hypot(pt.x, pt.y - 1)
+    assert error(euler) > 0.1
+    assert error(rk4) < 1e-3
+    assert error(adaptive) < 1e-6
+    with pytest.raises(ValueError):
+        field.followFrom(start, dist, method="exact")
+    with pytest.raises(ValueError):
+        field.followFrom(start, dist, method="foo")
+
+
+def test_follow_polygonal():
+    # North in the lower cell, then east in the upper one.
+    cells = [
+        (shapely.geometry.box(0, 0, 10, 10), 0),
+        (shapely.geometry.box(0, 10, 20, 20), -math.pi / 2),
+    ]
+    field = PolygonalVectorField("Foo", cells, followMethod="exact")
+    pt = field.followFrom(Vector(5, 5, 1), 10)
+    assert tuple(pt) == pytest.approx((10, 10, 1))
+    pt = field.followFrom(Vector(15, 15), -10)
+    assert tuple(pt) == pytest.approx((5, 15, 0))
+    pt = field.followFrom(Vector(5, 5), 10, method="euler", steps=4)
+    assert tuple(pt) == pytest.approx((7.5, 12.5, 0))
+    # Euler steps are still the default, so existing results do not change.
+    default = PolygonalVectorField("Foo", cells).followFrom(Vector(5, 5), 10, steps=4)
+    assert tuple(default) == pytest.approx((7.5, 12.5, 0))
+    with pytest.raises(RejectionException):
+        field.followFrom(Vector(5, 5), 30)
+
+    # Earlier cells take precedence over later ones which contain them.
+    cells = [
+        (shapely.geometry.box(0, 4, 10, 6), -math.pi / 2),
+        (shapely.geometry.box(-100, -100, 100, 100), 0),
+    ]
+    field = PolygonalVectorField("Bar", cells, followMethod="exact")
+    pt = field.followFrom(Vector(5, 0), 10)
+    assert tuple(pt) == pytest.approx((10, 5, 0), abs=1e-6)
+
+    # Cells without fixed headings are integrated numerically.
+    cells = [(shapely.geometry.box(-10, -10, 10, 10), None)]
+    field = PolygonalVectorField(
+        "Baz", cells, headingFunction=lambda pos: math.atan2(pos.y, pos.x)
+    )
+    pt = field.followFrom(Vector(1, 0), math.pi / 2, stepSize=0.1, method="exact")
+    assert tuple(pt) == pytest.approx((0, 1, 0), abs=1e-6)
+
+    # Cells pointing into each other fall back to Euler steps at the boundary.
+    cells = [
+        (shapely.geometry.box(0, 0, 10, 10), 0),
+        (shapely.geometry.box(0, 10, 10, 20), math.pi),
+    ]
+    field = PolygonalVectorField("Qux", cells)
+    pt = field.followFrom(Vector(5, 5), 1000, method="exact")
+    assert 5 <= pt.y <= 15
+
+
+def test_constant_vector_fast_path():
+    v = Vector(1.0, 2, numpy.float64(3))
+    assert not isLazy(v)
+    assert v._conditioned is v
+    assert v._dependencies == ()
+    assert v + Vector(1, 1, 1) == Vector(2, 3, 4)
+    assert v - (1, 1, 0) == Vector(0, 1, 3)
+    assert v + (0, 0) is v
+    assert v * 2 == Vector(2, 4, 6)
+    assert v.rotatedBy(math.pi / 2) == pytest.approx(Vector(-2, 1, 3))
+    assert v.norm() == pytest.approx(math.sqrt(14))
+
+    # Vectors with random coordinates still go through the Samplable machinery.
+    x = Options([1, 2])
+    w = Vector(x, 0)
+    assert isLazy(w)
+    assert w._dependencies == (x,)
+    assert isLazy(v + w)
+    assert isLazy(w.norm())
+    assert isLazy(v * x)
+
+
+def test_vector_arithmetic_fast_path(monkeypatch):
+    a, b = Vector(1.0, 2.0, 3.0), Vector(0.5, 0.25, 0.0)
+
+    def tick(zero):
+        # Typical per-object update from a simulator step
+        velocity = Vector(zero, 2.5).rotatedBy(0.1)
+        return a + velocity * 0.1 - b, velocity.norm()
+
+    # Count uses of the general Samplable machinery
+    calls = []
+    init, needs = Samplable.__init__, vectors.needsSampling
+    monkeypatch.setattr(
+        Samplable, "__init__", lambda self, deps: calls.append(self) or init(self, deps)
+    )
+    monkeypatch.setattr(
+        vectors, "needsSampling", lambda thing: calls.append(thing) or needs(thing)
+    )
+
+    position, speed = tick(0.0)
+    expected = (0.5 - 0.25 * math.sin(0.1), 1.75 + 0.25 * math.cos(0.1), 3)
+    assert tuple(position) == pytest.approx(expected)
+    assert speed == pytest.approx(2.5)
+    assert calls == []
+
+    # Coordinates of unusual numeric types take the general path
+    tick(numpy.float32(0))
+    assert calls
+
+
+def test_orientation_quaternions():
+    from scipy.spatial.transform import Rotation
+
+    rng = numpy.random.default_rng(0)
+    for angles in rng.uniform(-math.pi, math.pi, size=(50, 3)):
+        angles[1] /= 2  # keep pitch in range
+        o = Orientation.fromEuler(*angles)
+        r = Rotation.from_euler("ZXY", angles)
+        assert o.approxEq(Orientation(r))
+        assert o.eulerAngles == pytest.approx(angles)
+        assert o.getRotation().apply((1, 2, 3)) == pytest.approx(r.apply((1, 2, 3)))
+        other = Orientation.fromEuler(*rng.uniform(-1, 1, size=3))
+        assert (o * other).approxEq(Orientation(r * other.getRotation()))
+        assert o.inverse.approxEq(Orientation(r.inv()))
+        local = o.localAnglesFor(other)
+        expected = (r.inv() * other.getRotation()).as_euler("ZXY")
+        assert local == pytest.approx(expected)
+
+    # Gimbal lock: roll is set to zero
+    o = Orientation.fromEuler(0.5, math.pi / 2, 0.25)
+    assert o.eulerAngles == pytest.approx((0.75, math.pi / 2, 0))
+
+    # Orientations for the same heading are shared
+    assert Orientation._fromHeading(0.25) is Orientation._fromHeading(0.25)
+    assert Orientation._fromHeading(0.25).approxEq(Orientation.fromEuler(0.25, 0, 0))
+    assert Orientation.fromQuaternion((0, 0, 0, 2)) == globalOrientation
+
+
+def test_orientation_immutable():
+    # Orientations for the same heading are shared, so their quaternions are read-only
+    o = Orientation._fromHeading(0.25)
+    with pytest.raises(ValueError):
+        o.q[0] = 1
+    with pytest.raises(TypeError):
+        globalOrientation.localAnglesFor((0, 0, 0))
+
+
+def test_orientation_pickle():
+    from scipy.spatial.transform import Rotation
+
+    o = Orientation.fromEuler(0.5, 0.25, 0.125)
+    o.q  # cache the quaternion array
+    copy = pickle.loads(pickle.dumps(o))
+    assert copy == o
+    assert not copy.q.flags.writeable
+
+    # Orientations pickled by Scenic 3.0 stored a Rotation and its quaternion
+    class OldOrientation:
+        def __reduce__(self):
+            r = o.getRotation()
+            args = (Orientation, object, None)
+            return (copyreg._reconstructor, args, {"r": r, "q": r.as_quat()})
+
+    old = pickle.loads(pickle.dumps(OldOrientation()))
+    assert type(old) is Orientation
+    assert old.approxEq(o)
+    assert old.eulerAngles == pytest.approx((0.5, 0.25, 0.125))
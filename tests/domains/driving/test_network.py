@@ -3,6 +3,7 @@ from pathlib import Path
 import pytest
 
 from scenic.core.distributions import RejectionException
+from scenic.core.vectors import PolygonalVectorField, VectorField
 from scenic.domains.driving.roads import Intersection, Network
 from tests.domains.driving.conftest import mapFolder
 
@@ -95,6 +96,31 @@ def test_orientation_consistency(network):
             assert laneSec.orientation[pt] == pytest.approx(d)
 
 
+def test_road_direction(network):
+    field = network.roadDirection
+    assert isinstance(field, PolygonalVectorField)
+    exact = VectorField("exact", network._defaultRoadDirection)
+    region = network.drivableRegion.buffer(2 * network.tolerance)
+    for i in range(100):
+        pt = region.uniformPointInner()
+        assert field[pt].approxEq(exact[pt])
+    constant = [cell for cell, heading in field.cells if heading is not None]
+    assert len(constant) > len(network.allRoads)
+
+
+def test_road_direction_batch(network):
+    field = network.roadDirection
+    region = network.drivableRegion.buffer(2 * network.tolerance)
+    points = [region.uniformPointInner() for i in range(100)]
+    headings = field.headingsAt(points)
+    assert headings.shape == (100,)
+    orientations = field.orientationsAt(points)
+    for pt, heading, orientation in zip(points, headings, orientations):
+        expected = field[pt]
+        assert heading == pytest.approx(expected.yaw)
+        assert orientation.approxEq(expected)
+
+
 def test_linkage(network):
     for road in network.roads:
         assert road.forwardLanes or road.backwardLanes
@@ -4,9 +4,11 @@ from pathlib import Path
 from PIL import Image as IPImage
 import pytest
 
+from scenic.core.vectors import Vector
 from scenic.domains.driving.roads import Network
 from scenic.simulators.newtonian import NewtonianSimulator
-from tests.utils import pickle_test, sampleScene, tryPickling
+from scenic.simulators.newtonian.simulator import MAX_ACCELERATION
+from tests.utils import compileScenic, pickle_test, sampleScene, tryPickling
 
 
 def test_basic(loadLocalScenario):
@@ -51,6 +53,22 @@ def test_gif_creation(loadLocalScenario):
     os.remove(gif_path)
 
 
+@pytest.mark.parametrize("extension", ("gif", "mp4"))
+def test_headless_video(loadLocalScenario, tmp_path, extension):
+    path = tmp_path / f"simulation.{extension}"
+    scenario = loadLocalScenario(
+        "basic.scenic", params={"render": False, "headless": True, "video": str(path)}
+    )
+    scene, _ = scenario.generate(maxIterations=1)
+    simulation = scenario.getSimulator().simulate(scene, maxSteps=5)
+    assert simulation.render and simulation.screen is not None
+    if extension == "gif":
+        with IPImage.open(path) as image:
+            assert image.n_frames == 6  # initial frame plus one per step
+    else:
+        assert path.stat().st_size > 0
+
+
 @pickle_test
 def test_pickle(loadLocalScenario):
     scenario = tryPickling(loadLocalScenario("basic.scenic"))
@@ -59,3 +77,38 @@ def test_pickle(loadLocalScenario):
     simulation = simulator.simulate(scene, maxSteps=100)
     egoPos, otherPos = simulation.result.trajectory[-1]
     assert egoPos.distanceTo(otherPos) < 1
+
+
+def test_vectorized_step(getAssetPath):
+    mapPath = getAssetPath("maps/CARLA/Town01.xodr")
+    scenario = compileScenic(
+        f"""
+        param map = r'{mapPath}'
+        model scenic.simulators.newtonian.driving_model
+        behavior Accelerate(reverse):
+            take SetReverseAction(reverse), SetThrottleAction(1)
+        behavior Brake():
+            take SetBrakeAction(1)
+        ego = new Car on road, with behavior Accelerate(False)
+        reverser = new Car on road, with behavior Accelerate(True)
+        braker = new Car on road, with behavior Brake, with velocity (0, 1)
+        new Object on road, with velocity (3, 0)
+        record final ego.speed as egoSpeed
+        record final reverser.speed as reverserSpeed
+        record final braker.speed as brakerSpeed
+        terminate after 5 steps
+        """,
+        mode2D=True,
+    )
+    scene = sampleScene(scenario, maxIterations=1000)
+    simulation = NewtonianSimulator().simulate(scene, maxSteps=5)
+    records = simulation.result.records
+    assert records["egoSpeed"] == pytest.approx(5 * MAX_ACCELERATION * 0.1)
+    assert records["reverserSpeed"] == pytest.approx(5 * MAX_ACCELERATION * 0.1)
+    assert records["brakerSpeed"] == 0
+    trajectory = simulation.result.trajectory
+    start, end = trajectory[0], trajectory[-1]
+    egoHeading = scene.egoObject.heading
+    expected = start[0].offsetRotated(egoHeading, Vector(0, sum(range(1, 6)) * 0.056))
+    assert end[0] == pytest.approx(expected)
+    assert end[3] == pytest.approx(start[3] + Vector(1.5, 0))
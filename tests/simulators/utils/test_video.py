@@ -0,0 +1,49 @@
+from PIL import Image
+import cv2
+import numpy
+import pytest
+
+from scenic.simulators.utils.video import GIFWriter, MP4Writer, openVideoWriter
+
+
+def frames(count, width=64, height=48):
+    for i in range(count):
+        frame = numpy.zeros((height, width, 3), dtype=numpy.uint8)
+        frame[:, :, 0] = 10 * i
+        frame[8:16, i : i + 8] = (0, 0, 255)
+        yield frame
+
+
+def test_gif(tmp_path):
+    path = tmp_path / "test.gif"
+    with openVideoWriter(str(path), fps=20) as writer:
+        assert isinstance(writer, GIFWriter)
+        for frame in frames(12):
+            writer.write(frame)
+    writer.close()  # closing twice is harmless
+    with Image.open(path) as image:
+        assert image.n_frames == 12
+        assert image.size == (64, 48)
+        assert image.info["duration"] == 50
+        assert image.info["loop"] == 0
+        image.seek(5)
+        pixels = numpy.asarray(image.convert("RGB"))
+        assert tuple(pixels[0, 0]) == (50, 0, 0)
+        assert tuple(pixels[10, 7]) == (0, 0, 255)
+
+
+def test_mp4(tmp_path):
+    path = tmp_path / "test.mp4"
+    with openVideoWriter(str(path), fps=10) as writer:
+        assert isinstance(writer, MP4Writer)
+        for frame in frames(12):
+            writer.write(frame)
+    video = cv2.VideoCapture(str(path))
+    assert video.get(cv2.CAP_PROP_FRAME_COUNT) == 12
+    assert video.get(cv2.CAP_PROP_FPS) == 10
+    video.release()
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        openVideoWriter(str(tmp_path / "test.avi"), fps=10)
@@ -1,6 +1,7 @@
 import inspect
 import signal
 import sys
+import types
 
 import pytest
 
@@ -189,7 +190,7 @@ def test_behavior_no_actions():
         )
 
 
-@pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="need SIGALRM")
+@pytest.mark.skipif(not hasattr(signal, "pthread_kill"), reason="need pthread_kill")
 @pytest.mark.slow
 def test_behavior_stuck(monkeypatch):
     scenario = compileScenic(
@@ -206,6 +207,43 @@ def test_behavior_stuck(monkeypatch):
         sampleResultOnce(scenario)
 
 
+@pytest.mark.skipif(not hasattr(signal, "pthread_kill"), reason="need pthread_kill")
+@pytest.mark.slow
+def test_compose_stuck(monkeypatch):
+    scenario = compileScenic(
+        """
+        import time
+        scenario Main():
+            setup:
+                ego = new Object
+            compose:
+                time.sleep(1.5)
+                wait
+        """
+    )
+    monkeypatch.setattr(dynamics, "stuckBehaviorWarningTimeout", 1)
+    with pytest.warns(dynamics.StuckBehaviorWarning, match="compose block"):
+        sampleResultOnce(scenario)
+
+
+def test_stuck_watchdog_nested(monkeypatch):
+    # Nested steps must not reset the time of the enclosing step
+    from scenic.core.dynamics import utils
+
+    now = 0
+    monkeypatch.setattr(utils, "time", types.SimpleNamespace(monotonic=lambda: now))
+    watchdog = utils.StuckBehaviorWatchdog(1)
+    watchdog.watch("outer")
+    for _ in range(3):
+        watchdog.watch("inner")
+        now += 0.4
+        watchdog.unwatch()
+    stuck = watchdog._stuckEntry()
+    assert stuck is not None and stuck[0] == "outer"
+    watchdog.unwatch()
+    assert watchdog._stuckEntry() is None
+
+
 def test_behavior_create_object():
     with pytest.raises(InvalidScenarioError):
         scenario = compileScenic(
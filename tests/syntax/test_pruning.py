@@ -4,8 +4,10 @@ import random
 import pytest
 
 from scenic.core.errors import InconsistentScenarioError
+import scenic.core.pruning as pruning
 from scenic.core.vectors import Vector
-from tests.utils import compileScenic, sampleEgo, sampleParamP
+import scenic.syntax.translator as translator
+from tests.utils import compileScenic, sampleEgo, sampleParamP, sampleScene
 
 
 def test_containment_in():
@@ -258,3 +260,44 @@ def test_visibility_pruning_cyclical():
     )
 
     sampleEgo(scenario, maxIterations=100)
+
+
+@pytest.mark.parametrize("workers", (1, 4))
+def test_containment_parallel(workers, monkeypatch):
+    """Test pruning several objects with a pool of workers, and the pruning stats."""
+    monkeypatch.setattr(translator, "pruningWorkers", workers)
+    scenario = compileScenic(
+        """
+        workspace = Workspace(PolygonalRegion([0@0, 2@0, 2@2, 0@2]))
+        ego = new Object in workspace
+        for i in range(5):
+            new Object in workspace, with allowCollisions True
+        """
+    )
+    stats = scenario.pruningStats
+    assert stats.workers == workers
+    assert set(stats.passTimes) == {"containment", "relativeHeading", "visibility"}
+    assert stats.totalTime >= 0
+    assert [obj for _, obj, _ in stats.pruned] == list(scenario.objects)
+    for name, _, percentage in stats.pruned:
+        assert name == "containment"
+        assert percentage == pytest.approx(75)
+    scene = sampleScene(scenario, maxIterations=1)
+    for obj in scene.objects:
+        assert 0.5 <= obj.position.x <= 1.5 and 0.5 <= obj.position.y <= 1.5
+
+
+def test_pruning_report(capsys):
+    scenario = compileScenic(
+        """
+        workspace = Workspace(PolygonalRegion([0@0, 2@0, 2@2, 0@2]))
+        ego = new Object in workspace
+        """
+    )
+    capsys.readouterr()
+    stats = pruning.prune(scenario, verbosity=1, workers=2)
+    assert stats.workers == 2
+    assert scenario.pruningStats is stats
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("  Pruned scenario in ")
+    assert len(lines) == 1 + len(stats.pruned)
@@ -0,0 +1,102 @@
+import collections
+import random
+
+import numpy as np
+import pytest
+
+from scenic.core.external_params import QMCSampler
+from tests.utils import compileScenic, sampleEgo, sampleParamP
+
+## Particular samplers
+
+
+@pytest.mark.parametrize("samplerType", ("sobol", "halton"))
+def test_qmc_range(samplerType):
+    scenario = compileScenic(
+        f'param qmcSamplerType = "{samplerType}"\n'
+        "ego = new Object at QMCRange(5, 15) @ QMCRange(-1, 1)"
+    )
+    assert isinstance(scenario.externalSampler, QMCSampler)
+    positions = [sampleEgo(scenario).position for i in range(64)]
+    xs = [pos.x for pos in positions]
+    assert all(5 <= x <= 15 for x in xs)
+    assert all(-1 <= pos.y <= 1 for pos in positions)
+    assert all(type(x) is float for x in xs)
+    # Low-discrepancy sequences cover the range much more evenly than uniform sampling
+    counts, _ = np.histogram(xs, bins=8, range=(5, 15))
+    assert all(7 <= count <= 9 for count in counts)
+
+
+def test_qmc_discrete_range():
+    scenario = compileScenic("param p = QMCDiscreteRange(1, 4)")
+    values = [sampleParamP(scenario) for i in range(64)]
+    assert all(type(value) is int for value in values)
+    assert collections.Counter(values) == {1: 16, 2: 16, 3: 16, 4: 16}
+
+
+def test_qmc_options():
+    scenario = compileScenic("param p = QMCOptions({'a': 1, 'b': 3})")
+    values = [sampleParamP(scenario) for i in range(64)]
+    assert collections.Counter(values) == {"a": 16, "b": 48}
+
+
+def test_qmc_unscrambled():
+    scenario = compileScenic(
+        "param qmcScramble = False\n" "ego = new Object at QMCRange(0, 8) @ 0"
+    )
+    xs = [sampleEgo(scenario).position.x for i in range(4)]
+    assert xs == [0, 4, 6, 2]  # the first points of the Sobol sequence
+
+
+def test_qmc_determinism():
+    program = "ego = new Object at QMCRange(0, 1) @ QMCRange(0, 1)"
+
+    def sample():
+        scenario = compileScenic(program)
+        return [sampleEgo(scenario).position for i in range(5)]
+
+    random.seed(12345)
+    first = sample()
+    random.seed(12345)
+    assert sample() == first
+
+    scenario = compileScenic("param qmcSeed = 7\n" + program)
+    first = [sampleEgo(scenario).position for i in range(5)]
+    scenario.resetExternalSampler()
+    assert [sampleEgo(scenario).position for i in range(5)] == first
+
+
+@pytest.mark.parametrize("samplerType", ("sobol", "halton"))
+def test_qmc_checkpoint(samplerType):
+    program = (
+        f'param qmcSamplerType = "{samplerType}"\n'
+        "param qmcBatchSize = 8\n"
+        "ego = new Object at QMCRange(0, 1) @ QMCRange(0, 1)"
+    )
+    scenario = compileScenic(program)
+    for i in range(13):
+        sampleEgo(scenario)
+    checkpoint = scenario.externalSampler.checkpoint()
+    assert checkpoint["index"] == 13
+    expected = [sampleEgo(scenario).position for i in range(10)]
+
+    scenario.externalSampler.restore(checkpoint)
+    assert [sampleEgo(scenario).position for i in range(10)] == expected
+
+    resumed = compileScenic(program, params={"qmcCheckpoint": checkpoint})
+    assert [sampleEgo(resumed).position for i in range(10)] == expected
+
+
+def test_qmc_checkpoint_mismatch():
+    scenario = compileScenic("ego = new Object at QMCRange(0, 1) @ QMCRange(0, 1)")
+    checkpoint = scenario.externalSampler.checkpoint()
+    other = compileScenic("ego = new Object at QMCRange(0, 1) @ 0")
+    with pytest.raises(RuntimeError):
+        other.externalSampler.restore(checkpoint)
+
+
+def test_qmc_bad_sampler_type():
+    with pytest.raises(RuntimeError):
+        compileScenic(
+            'param qmcSamplerType = "foo"\n' "ego = new Object at QMCRange(0, 1) @ 0"
+        )
@@ -0,0 +1,42 @@
+"""Tests that heavy dependencies are only imported when needed."""
+
+import subprocess
+import sys
+
+import pytest
+
+# Mark all tests in this file as slow, since they require spawning a subprocess
+pytestmark = pytest.mark.slow
+
+## Utilities
+
+
+def importedModules(statement):
+    code = f"import sys\n{statement}\nprint(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+## Tests
+
+
+def test_import_scenic():
+    modules = importedModules("import scenic")
+    for heavy in ("scenic.syntax.translator", "trimesh", "fcl", "pygame"):
+        assert heavy not in modules
+    modules = importedModules("from scenic import scenarioFromString")
+    assert "scenic.syntax.translator" in modules
+
+
+def test_import_distributions():
+    modules = importedModules("import scenic.core.distributions")
+    assert "trimesh" not in modules
+    assert "fcl" not in modules
+
+
+def test_import_newtonian():
+    pytest.importorskip("pygame")
+    modules = importedModules("import scenic.simulators.newtonian.simulator")
+    assert "pygame" not in modules
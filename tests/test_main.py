@@ -1,6 +1,7 @@
 """Tests for the 'scenic' command-line tool."""
 
 import inspect
+import json
 import os
 import re
 import subprocess
@@ -106,3 +107,74 @@ def test_time(runAndGetRecordR):
         options=["--time", "5"],
     )
     assert r == "10"
+
+
+def test_batch(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    output = os.path.join(tmpdir, "scenes.jsonl")
+    options = ["--batch", "5", "--output", output, "--workers", "2", "--seed", "1"]
+    lines = run(path, "ego = new Object at Range(0, 1) @ 0", options)
+    assert any("Generated 5 scenes" in line for line in lines)
+    with open(output) as f:
+        assert len(f.readlines()) == 5
+
+
+def test_requirement_profile(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    profile = os.path.join(tmpdir, "profile.json")
+    program = "ego = new Object at Range(0, 1) @ 0\nrequire ego.position.x > 0.5"
+    options = ["--gather-stats", "5", "--requirement-profile", profile]
+    run(path, program, options)
+    with open(profile) as f:
+        (stats,) = json.load(f).values()
+    assert "line 3 #0" in stats  # run() adds a blank first line
+    run(path, program, options)  # loads the existing profile
+
+
+def test_profile_generation(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    program = "ego = new Object at Range(0, 1) @ 0\nrequire ego.position.x > 0.5"
+    lines = run(path, program, ["--gather-stats", "5", "--profile-generation"])
+    assert any("Generated 5 scenes" in line for line in lines)
+    assert any("line 3 #0: rejected" in line for line in lines)
+
+
+def test_pruning_workers(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    program = "workspace = Workspace(RectangularRegion(0@0, 0, 4, 4))\nego = new Object in workspace"
+    lines = run(path, program, ["--gather-stats", "1", "--pruning-workers", "2"])
+    assert any(line.startswith("  Pruned scenario in ") for line in lines)
+
+
+def test_output_requires_batch(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    with open(path, "w") as f:
+        f.write("ego = new Object")
+    args = ["scenic", path, "--output", os.path.join(tmpdir, "out.jsonl")]
+    result = subprocess.run(args, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "--output requires --batch or --simulate" in result.stderr
+
+
+def test_requirement_profile_workers(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    with open(path, "w") as f:
+        f.write("ego = new Object")
+    output = os.path.join(tmpdir, "scenes.jsonl")
+    profile = os.path.join(tmpdir, "profile.json")
+    options = ["--batch", "2", "--output", output, "--workers", "2"]
+    args = ["scenic", path, *options, "--requirement-profile", profile]
+    result = subprocess.run(args, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "--requirement-profile cannot be used with multiple workers" in result.stderr
+    assert not os.path.exists(profile)
+
+
+def test_workers_requires_batch(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    with open(path, "w") as f:
+        f.write("ego = new Object")
+    args = ["scenic", path, "--gather-stats", "1", "--workers", "2"]
+    result = subprocess.run(args, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "--workers requires --batch or --simulate" in result.stderr